@@ -1,5 +1,7 @@
 """Core configuration and settings for the FastAPI application."""
 
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 
@@ -24,6 +26,100 @@ class Settings(BaseSettings):
     cors_allow_methods: list[str] = ["*"]
     cors_allow_headers: list[str] = ["*"]
 
+    # Start-up settings
+    # Import app.services.<tag> packages on the first call of their endpoints
+    lazy_service_imports: bool = False
+    # Service packages to import during start-up (e.g. ["app.services.text"])
+    warm_up_services: list[str] = []
+
+    # Text generation settings
+    # "rule_based" (templates, no model) or "transformers" (local causal LM)
+    text_backend: str = "rule_based"
+    # Hugging Face model id or local path ("tiny-random" builds a random GPT-2 offline)
+    text_model_name: str = "gpt2"
+    text_model_device: str = "cpu"
+    # Threads of the dedicated inference executor (off the event loop)
+    text_generation_workers: int = 1
+    # Load the model and run one generation during start-up (transformers only)
+    text_warm_up: bool = True
+    # Micro-batching of concurrent generate requests with the same parameters
+    text_batching: bool = False
+    text_batch_max_size: int = 8
+    # How long the first request of a batch waits for others (milliseconds)
+    text_batch_wait_ms: float = 10.0
+    # Accepted (waiting or running) requests before answering 503
+    text_batch_max_queue: int = 64
+    # Result cache for temperature-0 (or "cache": true) generate requests
+    text_cache_enabled: bool = True
+    text_cache_max_entries: int = 1024
+    text_cache_max_bytes: int = 16 * 1024 * 1024
+    text_cache_ttl_seconds: float = 300.0
+    # Reuse past key/values of shared prompt prefixes (transformers only)
+    text_prefix_cache_enabled: bool = True
+    text_prefix_cache_max_entries: int = 64
+    text_prefix_cache_max_bytes: int = 256 * 1024 * 1024
+    # Shorter common prefixes are recomputed instead of copied
+    text_prefix_cache_min_tokens: int = 16
+    # Inference server shared by uvicorn workers (TEXT_BACKEND=remote)
+    text_inference_address: str = "/tmp/localllm-inference.sock"
+    # Forked inference processes sharing one model copy (0 = CPU count)
+    text_inference_workers: int = 0
+    # Optional shared secret for the IPC connection
+    text_inference_authkey: str = ""
+
+    # External API settings
+    # YAML file with the external_apis upstreams (relative to main.py)
+    external_config_path: str = "config.yaml"
+    # Overrides mock_mode of every upstream when set
+    external_mock_mode: Optional[bool] = None
+    # API keys by upstream name (e.g. {"weather": "..."}), preferred over config.yaml
+    external_api_keys: dict[str, str] = {}
+    # Defaults for upstreams that do not set their own values in config.yaml
+    external_timeout_seconds: float = 5.0
+    external_connect_timeout_seconds: float = 2.0
+    # Connection pool limits of each upstream (one shared client per host)
+    external_max_connections: int = 20
+    external_max_keepalive_connections: int = 10
+    external_keepalive_expiry_seconds: float = 30.0
+    # Negotiate HTTP/2 when h2 is installed (poetry install -E http2)
+    external_http2: bool = True
+    # Response cache of the weather/quote/fact endpoints (stale-while-revalidate)
+    external_cache_enabled: bool = True
+    external_cache_max_entries: int = 4096
+    external_cache_max_bytes: int = 4 * 1024 * 1024
+    # Defaults for upstreams without cache_ttl_seconds/cache_stale_seconds
+    external_cache_ttl_seconds: float = 60.0
+    external_cache_stale_seconds: float = 300.0
+    # Circuit breaker: consecutive failures that open it, seconds before a trial call
+    external_breaker_failure_threshold: int = 5
+    external_breaker_reset_seconds: float = 30.0
+    # Bulkhead: concurrent calls per upstream before rejecting immediately
+    external_max_concurrent: int = 20
+    # Send a hedged request after this latency percentile (e.g. 0.95, None = off)
+    external_hedge_percentile: Optional[float] = None
+    # Answer with mock data when an upstream is unavailable and nothing is cached
+    external_fallback_to_mock: bool = True
+    # Items of one POST /api/v1/external/batch request fetched at the same time
+    external_batch_concurrency: int = 8
+    # Mock upstream: none, fixed:<ms> or lognormal:<median ms>:<p99 ms> latency
+    # (None = 100ms weather / 50ms others; config.yaml mock_latency per upstream)
+    external_mock_latency: Optional[str] = None
+    # Seed for reproducible mock data and latencies (None = random)
+    external_mock_seed: Optional[int] = None
+    # YAML/JSON file replacing built-in quotes/facts/jokes/weather_descriptions
+    external_mock_data_path: Optional[str] = None
+
+    # OpenAPI settings
+    # Served as-is when its paths match the running routes (relative to main.py)
+    openapi_prebuilt_path: str = "docs/generated/openapi.json"
+
+    # Documentation settings
+    # Serve scripts/generated/docs/{swagger,redoc}.html as cached static bytes
+    serve_prerendered_docs: bool = False
+    prerendered_docs_dir: str = "scripts/generated/docs"
+    # Cache-Control max-age (seconds) for pre-rendered pages
+    static_cache_max_age: int = 86400
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,115 @@
+"""事前シリアライズしたOpenAPIドキュメント
+
+/openapi.json のスキーマを起動時に一度だけJSONへシリアライズ・圧縮し、
+以降のリクエストには保持済みのbytesをETag付きで返します。
+生成済みの docs/generated/openapi.json が実行中のルートと一致する場合は、
+get_openapi()でのスキーマ構築も省略してそのファイルを使用します。
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+
+from app.core.precompressed import PrecompressedAsset
+
+try:
+    # FastAPIの新しいバージョンではinclude_routerしたルーターが入れ子のまま保持される
+    from fastapi.routing import iter_route_contexts
+except ImportError:  # app.routesがフラットなバージョン
+    iter_route_contexts = None
+
+HTTP_METHODS = {"get", "post", "put", "delete", "patch", "head", "options", "trace"}
+
+
+def route_signature(app: FastAPI) -> set[tuple[str, str]]:
+    """スキーマに含まれるルートの (パス, メソッド) の集合を返します。"""
+    if iter_route_contexts is None:
+        routes = [(route, route.path) for route in app.routes]
+    else:
+        routes = [
+            (context.original_route, context.path_format)
+            for context in iter_route_contexts(app.routes)
+        ]
+    return {
+        (path, method.lower())
+        for route, path in routes
+        if isinstance(route, APIRoute) and route.include_in_schema
+        for method in route.methods
+    }
+
+
+def schema_signature(schema: dict[str, Any]) -> set[tuple[str, str]]:
+    """OpenAPIスキーマに記述された (パス, メソッド) の集合を返します。"""
+    return {
+        (path, method.lower())
+        for path, operations in schema.get("paths", {}).items()
+        for method in operations
+        if method.lower() in HTTP_METHODS
+    }
+
+
+def serialize_schema(schema: dict[str, Any]) -> bytes:
+    """FastAPIのJSONResponseと同じ形式（コンパクト・非ASCIIそのまま）でエンコードします。"""
+    return json.dumps(
+        schema, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class OpenAPIDocument:
+    """アプリケーションのOpenAPIドキュメントを事前エンコードして保持します。"""
+
+    def __init__(
+        self,
+        app: FastAPI,
+        customize: Callable[[dict[str, Any]], dict[str, Any]],
+        prebuilt_path: Optional[Path] = None,
+    ):
+        self.app = app
+        self.customize = customize
+        self.prebuilt_path = prebuilt_path
+        self.source = ""
+        self._asset: Optional[PrecompressedAsset] = None
+        self._lock = threading.Lock()
+
+    def _load_prebuilt(self) -> Optional[dict[str, Any]]:
+        """生成済みのスキーマが実行中のルートと一致すれば読み込みます。"""
+        if self.prebuilt_path is None or not self.prebuilt_path.exists():
+            return None
+        try:
+            with open(self.prebuilt_path, encoding="utf-8") as f:
+                schema = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if schema_signature(schema) != route_signature(self.app):
+            return None
+        return schema
+
+    def build(self) -> PrecompressedAsset:
+        """スキーマを構築（または読み込み）し、シリアライズ・圧縮します。"""
+        prebuilt = self._load_prebuilt()
+        if prebuilt is not None:
+            self.app.openapi_schema = self.customize(prebuilt)
+            self.source = str(self.prebuilt_path)
+            last_modified = self.prebuilt_path.stat().st_mtime
+        else:
+            self.source = "routes"
+            last_modified = None
+        schema = self.app.openapi()
+        return PrecompressedAsset.from_bytes(
+            serialize_schema(schema), "application/json", last_modified
+        )
+
+    @property
+    def asset(self) -> PrecompressedAsset:
+        """事前エンコード済みのドキュメント（未構築なら初回アクセス時に構築）"""
+        asset = self._asset
+        if asset is None:
+            with self._lock:
+                if self._asset is None:
+                    self._asset = self.build()
+                asset = self._asset
+        return asset
@@ -0,0 +1,139 @@
+"""事前エンコード・事前圧縮したレスポンス
+
+起動時に一度だけボディをbytesへ変換し、gzip（brotliがインストールされていればbrotliも）
+の圧縮結果とETagを保持します。リクエスト時はAccept-Encodingに応じて保持済みの
+bytesを返すだけで、シリアライズや圧縮は行いません。
+"""
+
+import gzip
+import hashlib
+import time
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Optional
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # brotliは任意依存（poetry install -E compression）
+    brotli = None
+
+# 優先するContent-Encoding（先頭ほど優先）
+PREFERRED_ENCODINGS = ("br", "gzip")
+
+
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    """Accept-Encodingヘッダーを {エンコーディング: q値} に変換します。"""
+    accepted: dict[str, float] = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    return accepted
+
+
+@dataclass(frozen=True)
+class PrecompressedAsset:
+    """圧縮済みのバリアントとETagを持つ不変のレスポンスボディ"""
+
+    media_type: str
+    body: bytes
+    digest: str
+    last_modified: str
+    last_modified_at: int
+    # Content-Encoding -> 圧縮済みボディ（元より小さくなったものだけを保持）
+    variants: dict[str, bytes]
+
+    @classmethod
+    def from_bytes(
+        cls, body: bytes, media_type: str, last_modified: Optional[float] = None
+    ) -> "PrecompressedAsset":
+        """ボディを圧縮し、ETagを計算したアセットを作成します。"""
+        variants = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants["br"] = brotli.compress(body, quality=11)
+        modified_at = int(last_modified if last_modified is not None else time.time())
+        return cls(
+            media_type=media_type,
+            body=body,
+            digest=hashlib.sha256(body).hexdigest()[:32],
+            last_modified=formatdate(modified_at, usegmt=True),
+            last_modified_at=modified_at,
+            variants={
+                name: data for name, data in variants.items() if len(data) < len(body)
+            },
+        )
+
+    @classmethod
+    def from_file(cls, path: Path, media_type: str) -> "PrecompressedAsset":
+        """ファイルを読み込んでアセットを作成します（Last-Modifiedはファイルの更新時刻）。"""
+        return cls.from_bytes(path.read_bytes(), media_type, path.stat().st_mtime)
+
+    def etag(self, encoding: Optional[str] = None) -> str:
+        """表現ごとの強いETagを返します（圧縮バリアントはサフィックス付き）。"""
+        if encoding is None:
+            return f'"{self.digest}"'
+        return f'"{self.digest}-{encoding}"'
+
+    def select_encoding(self, accept_encoding: str) -> Optional[str]:
+        """Accept-Encodingに合う、保持しているバリアントを選択します。"""
+        if not accept_encoding:
+            return None
+        accepted = parse_accept_encoding(accept_encoding)
+        for encoding in PREFERRED_ENCODINGS:
+            if encoding not in self.variants:
+                continue
+            quality = accepted.get(encoding, accepted.get("*", 0.0))
+            if quality > 0:
+                return encoding
+        return None
+
+    def is_not_modified(self, request: Request) -> bool:
+        """条件付きリクエスト（If-None-Match / If-Modified-Since）を評価します。"""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            if if_none_match.strip() == "*":
+                return True
+            known = {self.etag(), *(self.etag(name) for name in self.variants)}
+            candidates = {
+                tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+            }
+            return bool(known & candidates)
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return self.last_modified_at <= since
+        return False
+
+    def response(self, request: Request, cache_control: str = "no-cache") -> Response:
+        """リクエストに応じたレスポンス（304または圧縮済みボディ）を返します。"""
+        encoding = self.select_encoding(request.headers.get("accept-encoding", ""))
+        headers = {
+            "ETag": self.etag(encoding),
+            "Last-Modified": self.last_modified,
+            "Cache-Control": cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if self.is_not_modified(request):
+            return Response(status_code=304, headers=headers)
+
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+            body = self.variants[encoding]
+        else:
+            body = self.body
+        return Response(content=body, media_type=self.media_type, headers=headers)
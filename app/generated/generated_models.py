@@ -4,7 +4,7 @@ OpenAPI YAML仕様から自動生成されたPydanticモデル
 """
 
 from datetime import datetime
-from typing import Any, Optional
+from typing import Annotated, Any, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -23,9 +23,23 @@ class DetailedHealthResponse(BaseModel):
 
 class GenerateTextRequest(BaseModel):
     prompt: str = Field(description="テキスト生成用のプロンプト")
-    max_length: int = Field(description="生成テキストの最大長", ge=1, le=1000)
+    max_length: int = Field(
+        default=100,
+        description="生成するトークン数の上限（生成ループ内で打ち切り）",
+        ge=1,
+        le=1000,
+    )
     temperature: float = Field(
-        description="テキスト生成の温度パラメータ", ge=0.0, le=2.0
+        default=0.7, description="テキスト生成の温度パラメータ", ge=0.0, le=2.0
+    )
+    cache: bool = Field(
+        default=False,
+        description="温度が0より大きくても結果キャッシュを使う（温度0では常に使用）",
+    )
+    stop: Optional[list[Annotated[str, Field(min_length=1)]]] = Field(
+        default=None,
+        description="生成を打ち切る文字列（出力には含めない）",
+        max_length=4,
     )
 
 
@@ -35,6 +49,27 @@ class GenerateTextResponse(BaseModel):
     metadata: Optional[dict[str, Any]] = None
 
 
+class GenerateTextStreamEvent(BaseModel):
+    """ストリーミング生成の1イベント（tokenの後にdoneかerrorを1回）"""
+
+    event: Literal["token", "done", "error"] = Field(description="イベント種別")
+    index: Optional[int] = Field(
+        default=None, description="トークンの通し番号（tokenイベント）"
+    )
+    token: Optional[str] = Field(
+        default=None, description="新たに生成されたテキスト（tokenイベント）"
+    )
+    generated_text: Optional[str] = Field(
+        default=None, description="生成されたテキスト全体（doneイベント）"
+    )
+    metadata: Optional[dict[str, Any]] = Field(
+        default=None, description="生成メタデータ（doneイベント）"
+    )
+    detail: Optional[str] = Field(
+        default=None, description="エラーの詳細（errorイベント）"
+    )
+
+
 class EchoTextRequest(BaseModel):
     text: str = Field(description="エコー対象のテキスト")
 
@@ -45,8 +80,47 @@ class EchoTextResponse(BaseModel):
     timestamp: datetime = Field(description="処理時刻")
 
 
+class EchoTextBatchRequest(BaseModel):
+    texts: list[Annotated[str, Field(max_length=10000)]] = Field(
+        description="分析対象のテキスト（1件あたり最大10000文字）",
+        min_length=1,
+        max_length=10000,
+    )
+
+
+class EchoTextBatchResponse(BaseModel):
+    results: list[dict[str, Any]] = Field(
+        description="各テキストの分析結果（EchoTextResponse.analysisと同じ形式、入力順）"
+    )
+    timestamp: datetime = Field(description="処理時刻")
+
+
 class WeatherRequest(BaseModel):
     city: str = Field(description="都市名")
+    country_code: Optional[str] = Field(
+        default=None,
+        description="国コード（ISO 3166-1 alpha-2、同名の都市を区別する）",
+        pattern="^[A-Za-z]{2}$",
+    )
+
+
+class ExternalBatchItem(BaseModel):
+    """一括取得の1件のリクエスト"""
+
+    id: Optional[str] = Field(
+        default=None,
+        description="結果と対応付けるための任意の識別子（そのまま結果に含める）",
+    )
+    operation: Literal["weather", "quote", "fact", "joke"] = Field(
+        description="取得するデータ"
+    )
+    weather: Optional[WeatherRequest] = None
+
+
+class ExternalBatchRequest(BaseModel):
+    requests: list[ExternalBatchItem] = Field(
+        description="取得するリクエスト（並行して実行）", min_length=1, max_length=50
+    )
 
 
 class WeatherResponse(BaseModel):
@@ -54,26 +128,51 @@ class WeatherResponse(BaseModel):
     temperature: float = Field(description="気温（摂氏）")
     humidity: float = Field(description="湿度（%）")
     description: str = Field(description="天気の説明")
-    is_mock: bool = Field(description="モックデータかどうか")
+    is_mock: bool = Field(default=True, description="モックデータかどうか")
 
 
 class QuoteResponse(BaseModel):
     quote: str = Field(description="名言")
     author: str = Field(description="著者")
-    category: Optional[str] = Field(description="カテゴリ")
+    category: Optional[str] = Field(default=None, description="カテゴリ")
 
 
 class FactResponse(BaseModel):
     fact: str = Field(description="興味深い豆知識")
-    source: Optional[str] = Field(description="豆知識の出典")
+    source: Optional[str] = Field(default=None, description="豆知識の出典")
 
 
 class JokeResponse(BaseModel):
     joke: str = Field(description="プログラミングジョーク")
-    type: str = Field(description="ジョークのタイプ")
+    type: Literal["programming", "dev", "tech"] = Field(description="ジョークのタイプ")
+
+
+class ExternalBatchResult(BaseModel):
+    """一括取得の1件の結果（operationに対応する項目か、errorのどちらか）"""
+
+    id: Optional[str] = Field(default=None, description="リクエストの識別子")
+    operation: Literal["weather", "quote", "fact", "joke"] = Field(
+        description="取得したデータ"
+    )
+    status: int = Field(description="個別のエンドポイントを呼んだ場合のHTTPステータス")
+    weather: Optional[WeatherResponse] = None
+    quote: Optional[QuoteResponse] = None
+    fact: Optional[FactResponse] = None
+    joke: Optional[JokeResponse] = None
+    error: Optional[str] = Field(
+        default=None, description="エラーの詳細（失敗した場合）"
+    )
+
+
+class ExternalBatchResponse(BaseModel):
+    results: list[ExternalBatchResult] = Field(
+        description="各リクエストの結果（入力順）"
+    )
+    succeeded: int = Field(description="成功した件数")
+    failed: int = Field(description="失敗した件数")
 
 
 class ErrorResponse(BaseModel):
     detail: str = Field(description="エラーの詳細")
-    error_code: Optional[str] = Field(description="エラーコード")
-    timestamp: Optional[datetime] = Field(description="エラー発生時刻")
+    error_code: Optional[str] = Field(default=None, description="エラーコード")
+    timestamp: Optional[datetime] = Field(default=None, description="エラー発生時刻")
@@ -3,37 +3,55 @@ OpenAPI YAML仕様から自動生成されたFastAPIルーター
 手動で編集しないでください。source/openapi.yamlを編集してから再生成してください。
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
 
 # ruff: noqa: F401
 from app.generated.generated_models import (
     DetailedHealthResponse,
+    EchoTextBatchRequest,
+    EchoTextBatchResponse,
     EchoTextRequest,
     EchoTextResponse,
     ErrorResponse,
+    ExternalBatchItem,
+    ExternalBatchRequest,
+    ExternalBatchResponse,
+    ExternalBatchResult,
     FactResponse,
     GenerateTextRequest,
     GenerateTextResponse,
+    GenerateTextStreamEvent,
     HealthResponse,
     JokeResponse,
     QuoteResponse,
     WeatherRequest,
     WeatherResponse,
 )
-from app.services.external import (
-    get_programming_joke_impl,
-    get_random_fact_impl,
-    get_random_quote_impl,
-    get_weather_impl,
+from app.utils.lazy_import import lazy_impl
+
+# サービス層の_impl関数（遅延モードでは初回呼び出し時にimport）
+get_detailed_health_check_impl = lazy_impl(
+    "app.services.health", "get_detailed_health_check_impl"
+)
+get_health_check_impl = lazy_impl("app.services.health", "get_health_check_impl")
+post_echo_text_batch_impl = lazy_impl("app.services.text", "post_echo_text_batch_impl")
+post_echo_text_impl = lazy_impl("app.services.text", "post_echo_text_impl")
+post_generate_text_impl = lazy_impl("app.services.text", "post_generate_text_impl")
+post_generate_text_legacy_impl = lazy_impl(
+    "app.services.text", "post_generate_text_legacy_impl"
+)
+post_generate_text_stream_impl = lazy_impl(
+    "app.services.text", "post_generate_text_stream_impl"
 )
-from app.services.health import (
-    get_detailed_health_check_impl,
-    get_health_check_impl,
+get_programming_joke_impl = lazy_impl(
+    "app.services.external", "get_programming_joke_impl"
 )
-from app.services.text import (
-    post_echo_text_impl,
-    post_generate_text_impl,
-    post_generate_text_legacy_impl,
+get_random_fact_impl = lazy_impl("app.services.external", "get_random_fact_impl")
+get_random_quote_impl = lazy_impl("app.services.external", "get_random_quote_impl")
+get_weather_impl = lazy_impl("app.services.external", "get_weather_impl")
+post_fetch_external_batch_impl = lazy_impl(
+    "app.services.external", "post_fetch_external_batch_impl"
 )
 
 # タグ別にルーターを分割（prefixは相対パスのみ、main.pyで/api/v1が追加される）
@@ -61,27 +79,48 @@ async def generate_text(request: GenerateTextRequest) -> GenerateTextResponse:
     return await post_generate_text_impl(request)
 
 
+@text_router.post(
+    "/generate/stream",
+    summary="テキスト生成（ストリーミング）",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}, "application/x-ndjson": {}}}},
+)
+async def generate_text_stream(
+    request: GenerateTextRequest, http_request: Request
+) -> StreamingResponse:
+    """生成したトークンを逐次送信し、最後にメタデータを送信（SSE / NDJSON）"""
+    return await post_generate_text_stream_impl(
+        request, accept=http_request.headers.get("accept", "")
+    )
+
+
 @text_router.post("/echo", summary="テキストエコーと分析")
 async def echo_text(request: EchoTextRequest) -> EchoTextResponse:
     """入力テキストの分析とメタデータ付きレスポンス"""
     return await post_echo_text_impl(request)
 
 
+@text_router.post("/echo/batch", summary="テキスト分析（バッチ）")
+async def echo_text_batch(request: EchoTextBatchRequest) -> EchoTextBatchResponse:
+    """複数テキストの言語・単語数・感情をまとめて分析（入力順に返す）"""
+    return await post_echo_text_batch_impl(request)
+
+
 @external_router.post("/weather", summary="天気情報取得")
 async def get_weather(request: WeatherRequest) -> WeatherResponse:
-    """指定された都市の天気情報（モックデータ）"""
+    """指定された都市の天気情報（mock_modeではモックデータ）"""
     return await get_weather_impl(request)
 
 
 @external_router.get("/quote", summary="ランダム名言取得")
 async def get_random_quote() -> QuoteResponse:
-    """インスピレーション名言の取得（モックデータ）"""
+    """インスピレーション名言の取得（mock_modeではモックデータ）"""
     return await get_random_quote_impl()
 
 
 @external_router.get("/fact", summary="ランダム豆知識取得")
 async def get_random_fact() -> FactResponse:
-    """興味深い豆知識の取得（モックデータ）"""
+    """興味深い豆知識の取得（mock_modeではモックデータ）"""
     return await get_random_fact_impl()
 
 
@@ -91,6 +130,12 @@ async def get_programming_joke() -> JokeResponse:
     return await get_programming_joke_impl()
 
 
+@external_router.post("/batch", summary="外部データの一括取得")
+async def fetch_external_batch(request: ExternalBatchRequest) -> ExternalBatchResponse:
+    """天気・名言・豆知識・ジョークの複数のリクエストを1回で並行して取得（失敗した項目は項目ごとのエラー）"""
+    return await post_fetch_external_batch_impl(request)
+
+
 @legacy_router.post("/generate", summary="テキスト生成（後方互換）")
 async def generate_text_legacy(request: GenerateTextRequest) -> GenerateTextResponse:
     """既存コードとの後方互換性のためのエンドポイント"""
@@ -3,3 +3,4 @@ from .get_programming_joke_impl import get_programming_joke_impl
 from .get_random_fact_impl import get_random_fact_impl
 from .get_random_quote_impl import get_random_quote_impl
 from .get_weather_impl import get_weather_impl
+from .post_fetch_external_batch_impl import post_fetch_external_batch_impl
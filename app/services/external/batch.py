@@ -0,0 +1,74 @@
+"""外部データの一括取得（ファンアウト）
+
+POST /api/v1/external/batch の複数のリクエストを並行して実行します。各項目は個別の
+エンドポイントと同じ経路（応答キャッシュ・single-flight・ブレーカー）を通るため、
+同じ都市の天気などの重複は1回の上流呼び出しにまとまります。同時に実行する項目数は
+EXTERNAL_BATCH_CONCURRENCY で制限し、上流ごとのバルクヘッドを使い切らないようにします。
+
+一部の項目が失敗しても全体は200を返し、失敗した項目には個別のエンドポイントを
+呼んだ場合のステータスとエラーの詳細を入れます。結果は入力と同じ順番です。
+"""
+
+import asyncio
+from collections.abc import Awaitable
+from typing import Callable
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.generated.generated_models import (
+    ExternalBatchItem,
+    ExternalBatchRequest,
+    ExternalBatchResponse,
+    ExternalBatchResult,
+)
+from app.services.external.cache import get_fact, get_quote, get_weather
+from app.services.external.providers import fetch_joke, upstream_http_exception
+from app.services.external.resilience import UpstreamError
+
+
+def _operation(item: ExternalBatchItem) -> Callable[[], Awaitable]:
+    """項目のoperationに対応する取得処理（不正な項目はHTTPException）
+
+    operationの値はExternalBatchItemのLiteralで検証済み（不明な値はリクエスト全体が422）。
+    """
+    if item.operation == "weather":
+        if item.weather is None:
+            raise HTTPException(
+                status_code=422, detail="weather にはリクエストの weather が必要です"
+            )
+        weather = item.weather
+        return lambda: get_weather(weather)
+    operations = {"quote": get_quote, "fact": get_fact, "joke": fetch_joke}
+    return operations[item.operation]
+
+
+async def _run_item(
+    item: ExternalBatchItem, semaphore: asyncio.Semaphore
+) -> ExternalBatchResult:
+    result = ExternalBatchResult(id=item.id, operation=item.operation, status=200)
+    try:
+        fetch = _operation(item)
+        async with semaphore:
+            response = await fetch()
+        setattr(result, item.operation, response)
+    except HTTPException as e:
+        result.status, result.error = e.status_code, str(e.detail)
+    except UpstreamError as e:
+        error = upstream_http_exception(e)
+        result.status, result.error = error.status_code, str(error.detail)
+    except Exception as e:  # 1件の想定外の失敗で全体を失敗させない
+        result.status, result.error = 500, f"内部エラー: {e}"
+    return result
+
+
+async def run_batch(request: ExternalBatchRequest) -> ExternalBatchResponse:
+    """全項目を並行して実行し、項目ごとの結果（成功または失敗）を返します。"""
+    semaphore = asyncio.Semaphore(settings.external_batch_concurrency)
+    results = await asyncio.gather(
+        *(_run_item(item, semaphore) for item in request.requests)
+    )
+    failed = sum(1 for result in results if result.error is not None)
+    return ExternalBatchResponse(
+        results=list(results), succeeded=len(results) - failed, failed=failed
+    )
@@ -0,0 +1,113 @@
+"""外部データの応答キャッシュ（stale-while-revalidate）
+
+天気・名言・豆知識の応答を上流ごとのLRU+TTLキャッシュ（app.utils.ttl_cache）に保存します。
+有効期間（config.yaml の cache_ttl_seconds）内は上流を呼ばずに保存済みの応答を返し、
+期間を過ぎてから cache_stale_seconds の間は古い応答をすぐに返しつつ、裏で1回だけ
+上流を呼んで置き換えます。同じキーの同時のミス・更新は1回の呼び出しにまとめます。
+天気のキーは正規化した都市名と国コードで、表記揺れ（大文字小文字・全角・空白）は
+同じエントリになります。統計は GET /api/v1/health/detailed の services.caches で
+確認できます。
+
+上流が利用できない場合（接続エラー・タイムアウト・5xx・ブレーカーやバルクヘッドの拒否）は、
+古い値を返せる期間内ならキャッシュの値を、それもなければモックの上流
+（mock.py）のデータを返します（EXTERNAL_FALLBACK_TO_MOCK=false ではエラー応答）。
+"""
+
+import unicodedata
+from collections.abc import Awaitable, Hashable
+from typing import Callable, Optional, TypeVar
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.generated.generated_models import (
+    FactResponse,
+    QuoteResponse,
+    WeatherRequest,
+    WeatherResponse,
+)
+from app.services.external.mock import get_mock
+from app.services.external.providers import (
+    fetch_fact,
+    fetch_quote,
+    fetch_weather,
+    upstream_http_exception,
+)
+from app.services.external.resilience import UpstreamError
+from app.services.external.upstream import UpstreamConfig, get_clients
+from app.utils.single_flight import SingleFlight
+from app.utils.ttl_cache import TTLCache
+
+ResponseT = TypeVar("ResponseT", bound=BaseModel)
+
+_caches: dict[str, TTLCache] = {}
+# キャッシュが無効な場合も、同じキーの同時の呼び出しは1回の上流呼び出しにまとめる
+_flights: SingleFlight = SingleFlight()
+
+
+def get_cache(upstream: str) -> Optional[TTLCache]:
+    """上流ごとの応答キャッシュ（無効な場合はNone）"""
+    if not settings.external_cache_enabled:
+        return None
+    cache = _caches.get(upstream)
+    if cache is None:
+        config = get_clients().configs.get(upstream) or UpstreamConfig(
+            upstream,
+            base_url="",
+            cache_ttl=settings.external_cache_ttl_seconds,
+            cache_stale_ttl=settings.external_cache_stale_seconds,
+        )
+        cache = _caches[upstream] = TTLCache(
+            f"external_{upstream}",
+            max_entries=settings.external_cache_max_entries,
+            max_bytes=settings.external_cache_max_bytes,
+            ttl=config.cache_ttl,
+            sizeof=lambda response: len(response.model_dump_json()),
+            stale_ttl=config.cache_stale_ttl,
+        )
+    return cache
+
+
+def weather_cache_key(request: WeatherRequest) -> tuple[str, str]:
+    """都市名（Unicode正規化・大文字小文字・空白を無視）と国コードのキー"""
+    city = " ".join(unicodedata.normalize("NFKC", request.city).casefold().split())
+    return city, (request.country_code or "").upper()
+
+
+async def _cached(
+    upstream: str,
+    key: Hashable,
+    compute: Callable[[], Awaitable[ResponseT]],
+    fallback: Callable[[], Awaitable[ResponseT]],
+) -> ResponseT:
+    cache = get_cache(upstream)
+    try:
+        if cache is None:
+            response, _ = await _flights.do((upstream, key), compute)
+        else:
+            response, _ = await cache.get_or_compute(key, compute)
+        return response
+    except UpstreamError as e:
+        if not (settings.external_fallback_to_mock and e.unavailable):
+            raise upstream_http_exception(e)
+        guard = get_clients().guards.get(upstream)
+        if guard is not None:
+            guard.record_fallback()
+        return await fallback()
+
+
+async def get_weather(request: WeatherRequest) -> WeatherResponse:
+    return await _cached(
+        "weather",
+        weather_cache_key(request),
+        lambda: fetch_weather(request),
+        lambda: get_mock().get_weather(request.city, request.country_code),
+    )
+
+
+async def get_quote() -> QuoteResponse:
+    return await _cached("quotes", "random", fetch_quote, get_mock().get_random_quote)
+
+
+async def get_fact() -> FactResponse:
+    return await _cached("facts", "random", fetch_fact, get_mock().get_random_fact)
@@ -1,12 +1,11 @@
 """
-externalサービス: get_programming_joke_impl の自動生成スタブ
+externalサービス: get_programming_joke_impl
 """
 
-from typing import Any
+from app.generated.generated_models import JokeResponse
+from app.services.external.providers import fetch_joke
 
-from app.generated.generated_models import Any, JokeResponse
 
-
-async def get_programming_joke_impl(request: Any = None) -> JokeResponse:
-    """TODO: 実装してください"""
-    return {"message": "get_programming_joke_impl not implemented"}
+async def get_programming_joke_impl() -> JokeResponse:
+    """組み込みのデータからプログラミングジョークを返します。"""
+    return await fetch_joke()
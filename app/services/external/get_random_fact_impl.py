@@ -1,12 +1,11 @@
 """
-externalサービス: get_random_fact_impl の自動生成スタブ
+externalサービス: get_random_fact_impl
 """
 
-from typing import Any
+from app.generated.generated_models import FactResponse
+from app.services.external.cache import get_fact
 
-from app.generated.generated_models import Any, FactResponse
 
-
-async def get_random_fact_impl(request: Any = None) -> FactResponse:
-    """TODO: 実装してください"""
-    return {"message": "get_random_fact_impl not implemented"}
+async def get_random_fact_impl() -> FactResponse:
+    """上流の豆知識API（モックモードではモックデータ）の豆知識をキャッシュ付きで返します。"""
+    return await get_fact()
@@ -1,12 +1,11 @@
 """
-externalサービス: get_random_quote_impl の自動生成スタブ
+externalサービス: get_random_quote_impl
 """
 
-from typing import Any
+from app.generated.generated_models import QuoteResponse
+from app.services.external.cache import get_quote
 
-from app.generated.generated_models import Any, QuoteResponse
 
-
-async def get_random_quote_impl(request: Any = None) -> QuoteResponse:
-    """TODO: 実装してください"""
-    return {"message": "get_random_quote_impl not implemented"}
+async def get_random_quote_impl() -> QuoteResponse:
+    """上流の名言API（モックモードではモックデータ）の名言をキャッシュ付きで返します。"""
+    return await get_quote()
@@ -1,10 +1,11 @@
 """
-externalサービス: get_weather_impl の自動生成スタブ
+externalサービス: get_weather_impl
 """
 
 from app.generated.generated_models import WeatherRequest, WeatherResponse
+from app.services.external.cache import get_weather
 
 
 async def get_weather_impl(request: WeatherRequest) -> WeatherResponse:
-    """TODO: 実装してください"""
-    return {"message": "get_weather_impl not implemented"}
+    """上流の天気API（モックモードではモックデータ）の天気情報をキャッシュ付きで返します。"""
+    return await get_weather(request)
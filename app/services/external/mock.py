@@ -0,0 +1,346 @@
+"""モックの上流（組み込み・ファイルのデータと応答時間の分布）
+
+mock_mode の上流（と上流APIのないジョーク）が返すデータを生成します。
+名言・豆知識・ジョークは起動時に応答モデルまで作成したタプルとして保持し、
+1件の取得はタプルの添字1回です（返す応答は共有のため変更しないこと）。
+EXTERNAL_MOCK_DATA_PATH のYAML/JSONファイル（quotes・facts・jokes・
+weather_descriptions のうち置き換えるもの）で組み込みのデータを置き換えられます。
+
+EXTERNAL_MOCK_SEED を指定すると、データセットごとの乱数が固定され、同じ順番の
+呼び出しは毎回同じ応答（と応答時間）になります。
+
+応答時間は上流ごとに config.yaml の mock_latency（省略時は EXTERNAL_MOCK_LATENCY、
+それもなければ天気100ミリ秒・ほか50ミリ秒の固定）で指定します:
+
+- "none": 待たずに返す（自分たちのサーバーの負荷試験用。モックがボトルネックにならない）
+- "fixed:100": 常に100ミリ秒
+- "lognormal:20:200": 中央値20ミリ秒・p99が200ミリ秒の対数正規分布
+"""
+
+import asyncio
+import math
+import random
+from collections.abc import Sequence
+from pathlib import Path
+from statistics import NormalDist
+from typing import Any, Generic, Optional, TypeVar, Union
+
+import yaml
+
+from app.core.config import settings
+from app.generated.generated_models import (
+    FactResponse,
+    JokeResponse,
+    QuoteResponse,
+    WeatherResponse,
+)
+from app.services.external.upstream import PROJECT_ROOT, get_clients
+
+T = TypeVar("T")
+
+# 上流ごとの既定の応答時間（以前のExternalAPIServiceの固定の待ち時間）
+DEFAULT_LATENCIES = {
+    "weather": "fixed:100",
+    "quotes": "fixed:50",
+    "facts": "fixed:50",
+    "jokes": "fixed:50",
+}
+# 標準正規分布の99パーセンタイル（p99から対数正規分布のσを求める）
+_Z99 = NormalDist().inv_cdf(0.99)
+
+DEFAULT_DATA: dict[str, list[Any]] = {
+    "quotes": [
+        {
+            "quote": "The only way to do great work is to love what you do.",
+            "author": "Steve Jobs",
+            "category": "motivation",
+        },
+        {
+            "quote": "Innovation distinguishes between a leader and a follower.",
+            "author": "Steve Jobs",
+            "category": "innovation",
+        },
+        {
+            "quote": "Code is like humor. When you have to explain it, it's bad.",
+            "author": "Cory House",
+            "category": "programming",
+        },
+        {
+            "quote": "First, solve the problem. Then, write the code.",
+            "author": "John Johnson",
+            "category": "programming",
+        },
+        {
+            "quote": "Experience is the name everyone gives to their mistakes.",
+            "author": "Oscar Wilde",
+            "category": "wisdom",
+        },
+        {
+            "quote": "In order to be irreplaceable, one must always be different.",
+            "author": "Coco Chanel",
+            "category": "uniqueness",
+        },
+        {
+            "quote": (
+                "The best time to plant a tree was 20 years ago. "
+                "The second best time is now."
+            ),
+            "author": "Chinese Proverb",
+            "category": "action",
+        },
+    ],
+    "facts": [
+        {
+            "fact": (
+                "Honey never spoils. Archaeologists have found pots of honey "
+                "in ancient Egyptian tombs that are over 3,000 years old and "
+                "still edible."
+            ),
+            "source": "archaeology",
+        },
+        {
+            "fact": "Octopuses have three hearts and blue blood.",
+            "source": "marine biology",
+        },
+        {
+            "fact": "A single cloud can weigh more than a million pounds.",
+            "source": "meteorology",
+        },
+        {
+            "fact": (
+                "There are more possible games of chess than atoms "
+                "in the observable universe."
+            ),
+            "source": "mathematics",
+        },
+        {
+            "fact": "Bananas are berries, but strawberries aren't.",
+            "source": "botany",
+        },
+        {
+            "fact": "A group of flamingos is called a 'flamboyance'.",
+            "source": "zoology",
+        },
+        {
+            "fact": (
+                "The Great Wall of China isn't visible from space "
+                "with the naked eye."
+            ),
+            "source": "geography",
+        },
+    ],
+    "jokes": [
+        {
+            "joke": "Why do programmers prefer dark mode? Because light attracts bugs!",
+            "type": "programming",
+        },
+        {
+            "joke": (
+                "How many programmers does it take to change a light bulb? "
+                "None, that's a hardware problem."
+            ),
+            "type": "programming",
+        },
+        {
+            "joke": "Why did the programmer quit his job? He didn't get arrays.",
+            "type": "programming",
+        },
+        {
+            "joke": "What's a programmer's favorite hangout place? Foo Bar.",
+            "type": "programming",
+        },
+        {
+            "joke": (
+                "Why do Python programmers prefer snakes? "
+                "Because they're easy to wrap around your finger!"
+            ),
+            "type": "programming",
+        },
+    ],
+    "weather_descriptions": [
+        "Sunny",
+        "Cloudy",
+        "Rainy",
+        "Partly cloudy",
+        "Clear sky",
+        "Light rain",
+        "Overcast",
+    ],
+}
+
+
+class Latency:
+    """モックの応答時間の分布（none / fixed / lognormal）"""
+
+    __slots__ = ("distribution", "seconds", "mu", "sigma")
+
+    def __init__(self, distribution: str, seconds: float = 0.0, sigma: float = 0.0):
+        self.distribution = distribution
+        # fixedは待ち時間、lognormalは中央値
+        self.seconds = seconds
+        self.mu = math.log(seconds) if seconds > 0 else 0.0
+        self.sigma = sigma
+
+    @classmethod
+    def parse(cls, spec: str) -> "Latency":
+        """応答時間の指定を解釈します。
+
+        "none"・"fixed:<ミリ秒>"・"lognormal:<中央値のミリ秒>:<p99のミリ秒>"
+        """
+        distribution, *values = spec.strip().lower().split(":")
+        try:
+            milliseconds = [float(value) for value in values]
+        except ValueError:
+            milliseconds = []
+        if distribution == "none" and not values:
+            return cls("none")
+        if distribution == "fixed" and len(milliseconds) == 1 and milliseconds[0] >= 0:
+            return cls("fixed", milliseconds[0] / 1000)
+        if distribution == "lognormal" and len(milliseconds) == 2:
+            median, p99 = milliseconds
+            if 0 < median <= p99:
+                return cls("lognormal", median / 1000, math.log(p99 / median) / _Z99)
+        raise ValueError(
+            f"不正な応答時間の指定です: {spec!r}"
+            "（none / fixed:<ms> / lognormal:<中央値ms>:<p99ms>）"
+        )
+
+    def sample(self, rng: random.Random) -> float:
+        """1回の応答時間（秒）"""
+        if self.distribution == "lognormal":
+            return rng.lognormvariate(self.mu, self.sigma)
+        return self.seconds
+
+
+class MockDataset(Generic[T]):
+    """作成済みのレコードのタプルと、その乱数・応答時間"""
+
+    __slots__ = ("name", "records", "latency", "rng", "latency_rng")
+
+    def __init__(
+        self,
+        name: str,
+        records: Sequence[T],
+        latency: Latency,
+        seed: Optional[int] = None,
+    ):
+        if not records:
+            raise ValueError(f"モックデータ {name} が空です")
+        self.name = name
+        self.records = tuple(records)
+        self.latency = latency
+        # データの選択と応答時間は別の乱数（応答時間の設定で選ばれる順番が変わらない）
+        self.rng = random.Random(None if seed is None else f"{seed}:{name}")
+        self.latency_rng = random.Random(
+            None if seed is None else f"{seed}:{name}:latency"
+        )
+
+    def sample(self) -> T:
+        return self.records[self.rng.randrange(len(self.records))]
+
+    async def delay(self) -> None:
+        """応答時間の分布に従って待ちます（noneや0秒では待たない）。"""
+        seconds = self.latency.sample(self.latency_rng)
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+
+
+def load_mock_data(path: Union[str, Path, None] = None) -> dict[str, list[Any]]:
+    """組み込みのデータを、ファイル（YAML/JSON）にあるデータセットで置き換えて返します。"""
+    data = dict(DEFAULT_DATA)
+    if path is None:
+        return data
+    path = Path(path)
+    if not path.is_absolute():
+        path = PROJECT_ROOT / path
+    with open(path, encoding="utf-8") as f:
+        loaded = yaml.safe_load(f) or {}
+    unknown = set(loaded) - set(DEFAULT_DATA)
+    if unknown:
+        raise ValueError(f"不明なモックデータです: {', '.join(sorted(unknown))}")
+    data.update(loaded)
+    return data
+
+
+class MockUpstream:
+    """mock_modeの上流が返すデータ（天気・名言・豆知識・ジョーク）"""
+
+    __slots__ = ("weather", "quotes", "facts", "jokes")
+
+    def __init__(
+        self,
+        data: Optional[dict[str, list[Any]]] = None,
+        latencies: Optional[dict[str, Latency]] = None,
+        seed: Optional[int] = None,
+    ):
+        data = data or DEFAULT_DATA
+        latencies = latencies or {}
+
+        def dataset(name: str, records: Sequence[Any]) -> MockDataset:
+            latency = latencies.get(name) or Latency.parse(DEFAULT_LATENCIES[name])
+            return MockDataset(name, records, latency, seed)
+
+        self.weather: MockDataset[str] = dataset(
+            "weather",
+            [str(description) for description in data["weather_descriptions"]],
+        )
+        self.quotes: MockDataset[QuoteResponse] = dataset(
+            "quotes", [QuoteResponse(**record) for record in data["quotes"]]
+        )
+        self.facts: MockDataset[FactResponse] = dataset(
+            "facts", [FactResponse(**record) for record in data["facts"]]
+        )
+        self.jokes: MockDataset[JokeResponse] = dataset(
+            "jokes", [JokeResponse(**record) for record in data["jokes"]]
+        )
+
+    async def get_weather(
+        self, city: str, country_code: Optional[str] = None
+    ) -> WeatherResponse:
+        """都市のモックの天気（気温・湿度は乱数、説明はデータセットから選ぶ）"""
+        dataset = self.weather
+        await dataset.delay()
+        return WeatherResponse(
+            city=city.title(),
+            temperature=round(dataset.rng.uniform(-10, 35), 1),
+            humidity=dataset.rng.randint(30, 90),
+            description=dataset.sample(),
+            is_mock=True,
+        )
+
+    async def get_random_quote(self) -> QuoteResponse:
+        await self.quotes.delay()
+        return self.quotes.sample()
+
+    async def get_random_fact(self) -> FactResponse:
+        await self.facts.delay()
+        return self.facts.sample()
+
+    async def get_random_joke(self) -> JokeResponse:
+        await self.jokes.delay()
+        return self.jokes.sample()
+
+
+_mock: Optional[MockUpstream] = None
+
+
+def get_mock() -> MockUpstream:
+    """設定（EXTERNAL_MOCK_* と config.yaml の mock_latency）から作成したモックの上流"""
+    global _mock
+    if _mock is None:
+        latencies = {
+            name: Latency.parse(config.mock_latency)
+            for name, config in get_clients().configs.items()
+            if config.mock_latency
+        }
+        if settings.external_mock_latency:
+            for name in DEFAULT_LATENCIES:
+                latencies.setdefault(
+                    name, Latency.parse(settings.external_mock_latency)
+                )
+        _mock = MockUpstream(
+            load_mock_data(settings.external_mock_data_path),
+            latencies,
+            settings.external_mock_seed,
+        )
+    return _mock
@@ -0,0 +1,13 @@
+"""
+externalサービス: post_fetch_external_batch_impl
+"""
+
+from app.generated.generated_models import ExternalBatchRequest, ExternalBatchResponse
+from app.services.external.batch import run_batch
+
+
+async def post_fetch_external_batch_impl(
+    request: ExternalBatchRequest,
+) -> ExternalBatchResponse:
+    """複数の外部データのリクエストを並行して取得し、項目ごとの結果を返します。"""
+    return await run_batch(request)
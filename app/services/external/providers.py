@@ -0,0 +1,111 @@
+"""外部データの取得（上流APIの呼び出し、モックモードではモックの上流のデータ）
+
+上流の応答は生成モデル（WeatherResponseなど）に変換して返します。上流の呼び出しや
+応答の変換に失敗した場合は UpstreamError を送出します。エンドポイントでは
+upstream_http_exception() でHTTPExceptionに変換します（ブレーカー・バルクヘッドの
+拒否は503、タイムアウトは504、それ以外の接続エラー・エラー応答・不正な応答は502）。
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Optional
+
+from fastapi import HTTPException
+
+from app.generated.generated_models import (
+    FactResponse,
+    JokeResponse,
+    QuoteResponse,
+    WeatherRequest,
+    WeatherResponse,
+)
+from app.services.external.mock import get_mock
+from app.services.external.resilience import (
+    BulkheadFullError,
+    CircuitOpenError,
+    UpstreamError,
+)
+from app.services.external.upstream import UpstreamClients, get_clients
+
+
+@contextmanager
+def malformed_response(upstream: str) -> Iterator[None]:
+    """想定外の形式の応答（変換の失敗）をUpstreamErrorにします。"""
+    try:
+        yield
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        raise UpstreamError(upstream, f"応答の形式が不正です（{e!r}）")
+
+
+def upstream_http_exception(error: UpstreamError) -> HTTPException:
+    """UpstreamErrorをエンドポイントの応答（HTTPException）に変換します。"""
+    if isinstance(error, (CircuitOpenError, BulkheadFullError)):
+        # 上流を呼ばずに拒否した（一時的な利用不可）
+        return HTTPException(
+            status_code=503, detail=str(error), headers={"Retry-After": "1"}
+        )
+    return HTTPException(
+        status_code=504 if error.timeout else 502,
+        detail=f"外部APIの呼び出しに失敗しました: {error}",
+    )
+
+
+async def fetch_weather(
+    request: WeatherRequest, clients: Optional[UpstreamClients] = None
+) -> WeatherResponse:
+    """都市の現在の天気（OpenWeatherMapの /weather）"""
+    clients = clients or get_clients()
+    if clients.is_mock("weather"):
+        return await get_mock().get_weather(request.city, request.country_code)
+    location = request.city
+    if request.country_code:
+        location = f"{request.city},{request.country_code}"
+    data = await clients.get_json(
+        "weather",
+        "/weather",
+        params={
+            "q": location,
+            "appid": clients.configs["weather"].api_key,
+            "units": "metric",
+        },
+    )
+    with malformed_response("weather"):
+        return WeatherResponse(
+            city=data.get("name") or request.city,
+            temperature=data["main"]["temp"],
+            humidity=data["main"]["humidity"],
+            description=data["weather"][0]["description"],
+            is_mock=False,
+        )
+
+
+async def fetch_quote(clients: Optional[UpstreamClients] = None) -> QuoteResponse:
+    """ランダムな名言（quotableの /random）"""
+    clients = clients or get_clients()
+    if clients.is_mock("quotes"):
+        return await get_mock().get_random_quote()
+    data = await clients.get_json("quotes", "/random")
+    with malformed_response("quotes"):
+        tags = data.get("tags") or []
+        return QuoteResponse(
+            quote=data["content"],
+            author=data["author"],
+            category=tags[0] if tags else None,
+        )
+
+
+async def fetch_fact(clients: Optional[UpstreamClients] = None) -> FactResponse:
+    """ランダムな豆知識（uselessfactsの /api/v2/facts/random）"""
+    clients = clients or get_clients()
+    if clients.is_mock("facts"):
+        return await get_mock().get_random_fact()
+    data = await clients.get_json(
+        "facts", "/api/v2/facts/random", params={"language": "en"}
+    )
+    with malformed_response("facts"):
+        return FactResponse(fact=data["text"], source=data.get("source"))
+
+
+async def fetch_joke() -> JokeResponse:
+    """プログラミングジョーク（上流APIはなく、常にモックの上流のデータ）"""
+    return await get_mock().get_random_joke()
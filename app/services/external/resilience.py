@@ -0,0 +1,234 @@
+"""上流呼び出しの耐障害性（サーキットブレーカー・バルクヘッド・ヘッジリクエスト）
+
+上流ごとの UpstreamGuard が、1回の上流呼び出しに以下を適用します
+（config.yaml の上流ごとの設定、省略時は EXTERNAL_* の値）。
+
+- サーキットブレーカー: 連続 failure_threshold 回失敗すると open になり、
+  reset_timeout 秒の間は上流を呼ばずに即座に失敗させる。その後 half_open で
+  1件だけ試し、成功すれば closed に戻る
+- バルクヘッド: 同時呼び出し数を max_concurrent に制限し、超えた分は待たせずに拒否する
+  （遅い上流がイベントループと接続を使い切らないようにする）
+- ヘッジリクエスト: hedge_percentile（例: 0.95）を指定すると、直近の応答時間のその
+  パーセンタイルを過ぎても応答がない場合に同じリクエストをもう1回送り、先に成功した方を使う
+  （冪等なGETのみに使用）
+
+失敗・拒否は UpstreamError として送出し、呼び出し側がキャッシュやモックデータに
+フォールバックします。上流のエラー応答のうち4xxはブレーカーの失敗に数えません。
+"""
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Awaitable
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# ヘッジの遅延の計算に使う直近の応答時間の件数と、ヘッジを始めるまでに必要な件数
+LATENCY_WINDOW = 200
+HEDGE_MIN_SAMPLES = 20
+
+
+class UpstreamError(RuntimeError):
+    """上流APIの呼び出しに失敗した（接続エラー・タイムアウト・エラー応答・拒否）"""
+
+    def __init__(
+        self,
+        upstream: str,
+        message: str,
+        timeout: bool = False,
+        status_code: Optional[int] = None,
+    ):
+        super().__init__(f"{upstream}: {message}")
+        self.upstream = upstream
+        self.timeout = timeout
+        self.status_code = status_code
+
+    @property
+    def unavailable(self) -> bool:
+        """上流が利用できない失敗か（4xxのエラー応答以外）"""
+        return self.status_code is None or self.status_code >= 500
+
+
+class CircuitOpenError(UpstreamError):
+    """サーキットブレーカーが開いているため呼び出さなかった"""
+
+
+class BulkheadFullError(UpstreamError):
+    """同時呼び出し数の上限に達しているため呼び出さなかった"""
+
+
+class CircuitBreaker:
+    """連続した失敗で開き、一定時間後に1件だけ試して閉じるサーキットブレーカー"""
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self.rejected = 0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        """呼び出してよいか（open中、half_openで試行中の場合は拒否を数えてFalse）"""
+        if self.state == OPEN:
+            if self.clock() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                return False
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            if self._trial_in_flight:
+                self.rejected += 1
+                return False
+            self._trial_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if self.state == HALF_OPEN or (
+            self.consecutive_failures >= self.failure_threshold
+        ):
+            if self.state != OPEN:
+                self.trips += 1
+            self.state = OPEN
+            self.opened_at = self.clock()
+
+    def record_cancelled(self) -> None:
+        """呼び出し元のキャンセル（成功・失敗のどちらにも数えない）"""
+        self._trial_in_flight = False
+
+
+class UpstreamGuard:
+    """1つの上流へのブレーカー・バルクヘッド・ヘッジと、その統計"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        max_concurrent: int,
+        hedge_percentile: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout, clock)
+        self.max_concurrent = max_concurrent
+        self.hedge_percentile = hedge_percentile
+        self.in_flight = 0
+        self.bulkhead_rejected = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.fallbacks = 0
+        self._latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    async def call(self, request: Callable[[], Awaitable[T]]) -> T:
+        """ブレーカーとバルクヘッドを通してrequest()を呼び出します。"""
+        if self.in_flight >= self.max_concurrent:
+            self.bulkhead_rejected += 1
+            raise BulkheadFullError(self.name, "同時呼び出し数の上限に達しています")
+        if not self.breaker.allow():
+            raise CircuitOpenError(self.name, "サーキットブレーカーが開いています")
+        self.in_flight += 1
+        try:
+            result = await self._hedged(request)
+        except asyncio.CancelledError:
+            self.breaker.record_cancelled()
+            raise
+        except UpstreamError as e:
+            if e.unavailable:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise
+        except Exception:
+            # 接続の不具合や応答の解析の失敗など、想定外の例外も失敗として数える
+            # （half_openの試行を解放しないとブレーカーが閉じなくなる）
+            self.breaker.record_failure()
+            raise
+        finally:
+            self.in_flight -= 1
+        self.breaker.record_success()
+        return result
+
+    def hedge_delay(self) -> Optional[float]:
+        """ヘッジを送るまでの待ち時間（無効・応答時間の件数が足りない場合はNone）"""
+        if self.hedge_percentile is None or len(self._latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(self.hedge_percentile * len(ordered)))
+        return ordered[index]
+
+    async def _attempt(self, request: Callable[[], Awaitable[T]]) -> T:
+        started_at = time.perf_counter()
+        result = await request()
+        self._latencies.append(time.perf_counter() - started_at)
+        return result
+
+    async def _hedged(self, request: Callable[[], Awaitable[T]]) -> T:
+        delay = self.hedge_delay()
+        if delay is None:
+            return await self._attempt(request)
+        attempts = {asyncio.ensure_future(self._attempt(request))}
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=delay)
+            if done:
+                return done.pop().result()
+            self.hedged += 1
+            hedge = asyncio.ensure_future(self._attempt(request))
+            attempts.add(hedge)
+            pending = set(attempts)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            assert error is not None
+            raise error
+        finally:
+            # 先に成功した方以外（またはキャンセル時は両方）を止める
+            for task in attempts:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()  # 使わなかった失敗も取得済みにする
+
+    def record_fallback(self) -> None:
+        self.fallbacks += 1
+
+    def stats(self) -> dict[str, Any]:
+        """ブレーカーの状態と拒否・ヘッジ・フォールバックの回数"""
+        return {
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "trips": self.breaker.trips,
+            "rejected_open": self.breaker.rejected,
+            "in_flight": self.in_flight,
+            "rejected_bulkhead": self.bulkhead_rejected,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "fallbacks": self.fallbacks,
+        }
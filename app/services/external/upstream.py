@@ -0,0 +1,225 @@
+"""上流の外部APIへの接続（上流ごとに共有するhttpx.AsyncClient）
+
+config.yaml の external_apis に並べた上流（weather・quotes・facts）ごとに
+httpx.AsyncClient を1つだけ作成し、全リクエストで共有します。
+クライアントの接続プールにより、同じホストへの接続はkeep-aliveで再利用され
+（h2がインストールされていればHTTP/2で多重化）、ホストごとの同時接続数と
+タイムアウトは上流ごとに設定できます。
+
+クライアントはアプリのlifespanで作成・クローズします（get_clients / close_clients）。
+mock_mode の上流にはクライアントを作らず、呼び出し側はモックの上流（mock.py）の
+データを返します。
+テストでは base_url をローカルの代役サーバーに向け、mock_mode: false にして
+置き換えます。
+"""
+
+import importlib.util
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import httpx
+import yaml
+
+from app.core.config import settings
+from app.services.external.resilience import UpstreamError, UpstreamGuard
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+# HTTP/2はh2が必要（poetry install -E http2）。なければHTTP/1.1のkeep-aliveのみ
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+@dataclass(frozen=True)
+class UpstreamConfig:
+    """1つの上流APIの接続設定"""
+
+    name: str
+    base_url: str
+    mock_mode: bool = True
+    api_key: str = ""
+    # 1リクエストのタイムアウトと、うち接続確立までのタイムアウト（秒）
+    timeout: float = 5.0
+    connect_timeout: float = 2.0
+    # このホストへの同時接続数と、アイドル状態で保持する接続数
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    # 応答キャッシュの有効期間と、その後も古い値を返しながら更新する期間（秒）
+    cache_ttl: float = 60.0
+    cache_stale_ttl: float = 300.0
+    # サーキットブレーカー・バルクヘッド・ヘッジ（resilience.UpstreamGuard）
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+    max_concurrent: int = 20
+    hedge_percentile: Optional[float] = None
+    # mock_modeの応答時間の分布（mock.Latency.parseの形式、Noneは組み込みの既定値）
+    mock_latency: Optional[str] = None
+
+
+# UpstreamConfigのフィールド -> (config.yamlのキー, 省略時の値を持つsettingsの属性)
+_OPTIONS = {
+    "timeout": ("timeout_seconds", "external_timeout_seconds"),
+    "connect_timeout": (
+        "connect_timeout_seconds",
+        "external_connect_timeout_seconds",
+    ),
+    "max_connections": ("max_connections", "external_max_connections"),
+    "max_keepalive_connections": (
+        "max_keepalive_connections",
+        "external_max_keepalive_connections",
+    ),
+    "cache_ttl": ("cache_ttl_seconds", "external_cache_ttl_seconds"),
+    "cache_stale_ttl": ("cache_stale_seconds", "external_cache_stale_seconds"),
+    "failure_threshold": (
+        "breaker_failure_threshold",
+        "external_breaker_failure_threshold",
+    ),
+    "reset_timeout": ("breaker_reset_seconds", "external_breaker_reset_seconds"),
+    "max_concurrent": ("max_concurrent", "external_max_concurrent"),
+    "hedge_percentile": ("hedge_percentile", "external_hedge_percentile"),
+    "mock_latency": ("mock_latency", "external_mock_latency"),
+}
+
+
+def load_upstream_configs(
+    path: Union[str, Path, None] = None,
+) -> dict[str, UpstreamConfig]:
+    """config.yaml の external_apis を読み込みます。
+
+    EXTERNAL_MOCK_MODE を指定するとすべての上流のmock_modeを上書きし、
+    EXTERNAL_API_KEYS（{"weather": "..."}）の値はconfig.yamlのapi_keyより優先します。
+    """
+    path = Path(path or settings.external_config_path)
+    if not path.is_absolute():
+        path = PROJECT_ROOT / path
+    external_apis: dict[str, Any] = {}
+    if path.exists():
+        with open(path, encoding="utf-8") as f:
+            external_apis = (yaml.safe_load(f) or {}).get("external_apis") or {}
+
+    configs = {}
+    for name, options in external_apis.items():
+        options = options or {}
+        api_key = settings.external_api_keys.get(name) or options.get("api_key")
+        mock_mode = options.get("mock_mode", True)
+        if settings.external_mock_mode is not None:
+            mock_mode = settings.external_mock_mode
+        configs[name] = UpstreamConfig(
+            name=name,
+            base_url=options.get("base_url", ""),
+            mock_mode=bool(mock_mode),
+            api_key=api_key or "",
+            **{
+                field: options.get(key, getattr(settings, setting))
+                for field, (key, setting) in _OPTIONS.items()
+            },
+        )
+    return configs
+
+
+class UpstreamClients:
+    """上流ごとに共有するhttpx.AsyncClientの集合"""
+
+    def __init__(self, configs: dict[str, UpstreamConfig]):
+        self.configs = configs
+        self.http2 = settings.external_http2 and HTTP2_AVAILABLE
+        self._clients = {
+            name: self._create_client(config)
+            for name, config in configs.items()
+            if not config.mock_mode
+        }
+        self.guards = {
+            name: UpstreamGuard(
+                name,
+                config.failure_threshold,
+                config.reset_timeout,
+                config.max_concurrent,
+                config.hedge_percentile,
+            )
+            for name, config in configs.items()
+            if not config.mock_mode
+        }
+
+    def _create_client(self, config: UpstreamConfig) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=config.base_url,
+            http2=self.http2,
+            timeout=httpx.Timeout(config.timeout, connect=config.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=settings.external_keepalive_expiry_seconds,
+            ),
+        )
+
+    def is_mock(self, name: str) -> bool:
+        """モックデータを返す上流か（config.yamlにない上流もモック）"""
+        return name not in self._clients
+
+    async def get_json(
+        self, name: str, path: str, params: Optional[dict[str, Any]] = None
+    ) -> Any:
+        """上流にGETリクエストを送り、JSONの応答を返します。
+
+        ブレーカー・バルクヘッド・ヘッジ（上流ごとのUpstreamGuard）を通して呼び出します。
+        """
+        client = self._clients.get(name)
+        if client is None:
+            raise UpstreamError(name, "モックモードの上流です")
+        return await self.guards[name].call(
+            lambda: self._get_json(client, name, path, params)
+        )
+
+    async def _get_json(
+        self,
+        client: httpx.AsyncClient,
+        name: str,
+        path: str,
+        params: Optional[dict[str, Any]],
+    ) -> Any:
+        try:
+            response = await client.get(path, params=params)
+            response.raise_for_status()
+            return response.json()
+        except httpx.TimeoutException as e:
+            raise UpstreamError(name, f"タイムアウトしました（{e!r}）", timeout=True)
+        except httpx.HTTPStatusError as e:
+            status_code = e.response.status_code
+            raise UpstreamError(
+                name, f"エラー応答 {status_code}", status_code=status_code
+            )
+        except (httpx.HTTPError, ValueError) as e:
+            raise UpstreamError(name, f"呼び出しに失敗しました（{e!r}）")
+
+    def stats(self) -> dict[str, str]:
+        """上流ごとの接続方式（mock / http/1.1 / http/2）"""
+        protocol = "http/2" if self.http2 else "http/1.1"
+        return {
+            name: "mock" if self.is_mock(name) else protocol for name in self.configs
+        }
+
+    def resilience_stats(self) -> dict[str, dict[str, Any]]:
+        """上流ごとのブレーカーの状態と拒否・ヘッジ・フォールバックの回数"""
+        return {name: guard.stats() for name, guard in self.guards.items()}
+
+    async def aclose(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+
+
+_clients: Optional[UpstreamClients] = None
+
+
+def get_clients() -> UpstreamClients:
+    """設定から作成した共有クライアント（lifespanの開始時に作成）"""
+    global _clients
+    if _clients is None:
+        _clients = UpstreamClients(load_upstream_configs())
+    return _clients
+
+
+async def close_clients() -> None:
+    """共有クライアントの接続を閉じます（lifespanの終了時）。"""
+    global _clients
+    clients, _clients = _clients, None
+    if clients is not None:
+        await clients.aclose()
@@ -1,10 +1,32 @@
 """
-healthサービス: get_detailed_health_check_impl の自動生成スタブ
+healthサービス: get_detailed_health_check_impl
 """
 
-from typing import Any
+import platform
+import sys
+import time
+from datetime import datetime
 
+from app.generated.generated_models import DetailedHealthResponse
+from app.services.external.upstream import get_clients
+from app.utils.ttl_cache import cache_stats
 
-async def get_detailed_health_check_impl(request: Any = None) -> Any:
-    """TODO: 実装してください"""
-    return {"message": "get_detailed_health_check_impl not implemented"}
+STARTED_AT = time.time()
+
+
+async def get_detailed_health_check_impl() -> DetailedHealthResponse:
+    """システム情報と、キャッシュ・外部APIのブレーカーなどの統計を返します。"""
+    return DetailedHealthResponse(
+        status="healthy",
+        timestamp=datetime.now(),
+        system_info={
+            "python_version": sys.version,
+            "platform": platform.platform(),
+            "uptime": time.time() - STARTED_AT,
+        },
+        services={
+            "external_apis": get_clients().stats(),
+            "external_resilience": get_clients().resilience_stats(),
+            "caches": cache_stats(),
+        },
+    )
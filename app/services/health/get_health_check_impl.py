@@ -1,10 +1,12 @@
 """
-healthサービス: get_health_check_impl の自動生成スタブ
+healthサービス: get_health_check_impl
 """
 
-from typing import Any
+from datetime import datetime
 
+from app.generated.generated_models import HealthResponse
 
-async def get_health_check_impl(request: Any = None) -> Any:
-    """TODO: 実装してください"""
-    return {"message": "get_health_check_impl not implemented"}
+
+async def get_health_check_impl() -> HealthResponse:
+    """基本ヘルスチェック（推論中もイベントループ上で即座に応答する）"""
+    return HealthResponse(status="healthy", timestamp=datetime.now())
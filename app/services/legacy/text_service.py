@@ -1,7 +1,6 @@
 """Text generation service."""
 
 import random
-import re
 from datetime import datetime
 
 from fastapi import HTTPException
@@ -12,6 +11,7 @@ from app.generated.generated_models import (
     GenerateTextRequest,
     GenerateTextResponse,
 )
+from app.services.text.analysis import analyze_text
 
 
 class TextService:
@@ -110,40 +110,6 @@ async def post_generate(request: GenerateTextRequest) -> GenerateTextResponse:
 
 async def post_text_echo(request: EchoTextRequest) -> EchoTextResponse:
     """テキストエコーと分析エンドポイント用のサービス関数"""
-    # Simple text analysis
-    text = request.text
-    character_count = len(text)
-    word_count = len(text.split())
-
-    # Simple language detection (very basic)
-    if re.search(r"[ひらがなカタカナ漢字]", text):
-        language = "ja"
-    elif re.search(r"[a-zA-Z]", text):
-        language = "en"
-    else:
-        language = "unknown"
-
-    # Simple sentiment analysis (keyword based)
-    positive_words = ["good", "great", "excellent", "良い", "素晴らしい", "最高"]
-    negative_words = ["bad", "terrible", "awful", "悪い", "最悪", "ひどい"]
-
-    sentiment = "neutral"
-    for word in positive_words:
-        if word in text.lower():
-            sentiment = "positive"
-            break
-    for word in negative_words:
-        if word in text.lower():
-            sentiment = "negative"
-            break
-
     return EchoTextResponse(
-        echo=text,
-        analysis={
-            "character_count": character_count,
-            "word_count": word_count,
-            "language": language,
-            "sentiment": sentiment,
-        },
-        timestamp=datetime.now(),
+        echo=request.text, analysis=analyze_text(request.text), timestamp=datetime.now()
     )
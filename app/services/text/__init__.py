@@ -1,4 +1,6 @@
 # ruff: noqa: F401
+from .post_echo_text_batch_impl import post_echo_text_batch_impl
 from .post_echo_text_impl import post_echo_text_impl
 from .post_generate_text_impl import post_generate_text_impl
 from .post_generate_text_legacy_impl import post_generate_text_legacy_impl
+from .post_generate_text_stream_impl import post_generate_text_stream_impl
@@ -0,0 +1,114 @@
+"""テキスト分析エンジン（エコーエンドポイント用）
+
+言語の推定（script_detection）・単語数・キーワードによる感情分析を行います。
+感情分析のキーワードはモジュール読み込み時に1つの複数パターンマッチャーに
+コンパイルしてあるため、キーワードの数によらずテキストの走査は1回で済みます。
+analyze_texts() は複数テキストを連結して、感情分析のキーワードと文字種をそれぞれ
+まとめて照合します（結果は analyze_text() と同じ）。
+"""
+
+import re
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+from app.services.text.script_detection import detect_language, detect_languages
+
+POSITIVE_WORDS = ("good", "great", "excellent", "良い", "素晴らしい", "最高")
+NEGATIVE_WORDS = ("bad", "terrible", "awful", "悪い", "最悪", "ひどい")
+
+# labels_batch()で連結するテキストの区切りと、見つかったキーワードの区切り
+# （どちらもキーワードに含まれない制御文字）
+_TEXT_SEPARATOR = "\x00"
+_MATCH_SEPARATOR = "\x01"
+
+
+class KeywordMatcher:
+    """キーワードとラベルの組をまとめて照合する複数パターンマッチャー
+
+    全キーワードを長い順に並べた1つの正規表現にコンパイルし、casefold()した
+    テキストを1回走査して見つかったキーワードのラベルを返します（大文字小文字を
+    区別しない。re.IGNORECASEより照合が速い）。
+    """
+
+    def __init__(self, labels: Mapping[str, str]):
+        self._labels = {keyword.casefold(): label for keyword, label in labels.items()}
+        alternatives = sorted(self._labels, key=len, reverse=True)
+        self._pattern = re.compile("|".join(map(re.escape, alternatives)))
+        # labels_batch()用: テキストの区切りも照合する
+        self._batch_pattern = re.compile(f"{_TEXT_SEPARATOR}|{self._pattern.pattern}")
+
+    def labels(self, text: str) -> set[str]:
+        """テキストに含まれるキーワードのラベルの集合"""
+        return {
+            self._labels[keyword]
+            for keyword in set(self._pattern.findall(text.casefold()))
+        }
+
+    def labels_batch(self, texts: Sequence[str]) -> list[set[str]]:
+        """複数テキストのラベルの集合を、連結したテキストの1回の走査で求めます。
+
+        区切り文字も照合するパターンで連結全体を findall() し、見つかった
+        キーワードの列を区切りで分割してテキストごとに集計します（C実装の処理のみで、
+        キーワードの出現ごとのPythonのループはありません）。
+        """
+        joined = _TEXT_SEPARATOR.join(texts).casefold()
+        if joined.count(_TEXT_SEPARATOR) != len(texts) - 1:
+            # テキスト自体が区切り文字を含む（または空の入力）
+            return [self.labels(text) for text in texts]
+        found = _MATCH_SEPARATOR.join(self._batch_pattern.findall(joined))
+        return [
+            {
+                self._labels[keyword]
+                for keyword in set(segment.split(_MATCH_SEPARATOR))
+                if keyword
+            }
+            for segment in found.split(_TEXT_SEPARATOR)
+        ]
+
+
+_SENTIMENT = KeywordMatcher(
+    {
+        **dict.fromkeys(POSITIVE_WORDS, "positive"),
+        **dict.fromkeys(NEGATIVE_WORDS, "negative"),
+    }
+)
+
+
+def _sentiment(labels: set[str]) -> str:
+    if "negative" in labels:
+        return "negative"
+    if "positive" in labels:
+        return "positive"
+    return "neutral"
+
+
+def detect_sentiment(text: str) -> str:
+    """否定的なキーワードを含めばnegative、肯定的なキーワードのみならpositive"""
+    return _sentiment(_SENTIMENT.labels(text))
+
+
+def analyze_text(text: str) -> dict[str, Any]:
+    """EchoTextResponse.analysis の形式で1件のテキストを分析します。"""
+    return {
+        "character_count": len(text),
+        "word_count": len(text.split()),
+        "language": detect_language(text),
+        "sentiment": detect_sentiment(text),
+    }
+
+
+def analyze_texts(texts: Sequence[str]) -> list[dict[str, Any]]:
+    """複数のテキストを入力順に分析します（CPU処理のため、非同期のエンドポイントでは
+    run_in_threadpool() などでイベントループの外から呼び出すこと）。
+    """
+    languages = detect_languages(texts)
+    labels = _SENTIMENT.labels_batch(texts)
+    return [
+        {
+            "character_count": len(text),
+            "word_count": len(text.split()),
+            "language": language,
+            "sentiment": _sentiment(text_labels),
+        }
+        for text, language, text_labels in zip(texts, languages, labels)
+    ]
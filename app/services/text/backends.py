@@ -0,0 +1,689 @@
+"""テキスト生成バックエンド
+
+`settings.text_backend` で選択する生成エンジンの実装です。
+
+- rule_based: テンプレートを組み合わせる軽量な生成（モデル不要）
+- transformers: ローカルのHugging Face因果言語モデルによる生成
+- remote: inference_server.py の推論サーバー（モデルを共有する推論プロセス群）への委譲
+
+バックエンドはプロセスごとに一度だけモデルを読み込み、以降は保持したモデルで
+同期的に生成します（イベントループ外での実行は generation.py が担当）。
+transformersバックエンドは prefix_cache.PrefixKVCache で共通の接頭辞のKVを再利用します。
+torch / transformers は transformers バックエンドの読み込み時に初めてimportします。
+"""
+
+import random
+import re
+import threading
+from collections.abc import Sequence
+from dataclasses import dataclass
+from multiprocessing.connection import Client, Connection
+from typing import Any, Callable, Optional
+
+from app.services.text.prefix_cache import PrefixKVCache
+
+# transformersを使わずにテスト用モデルを作成するためのモデル名
+TINY_RANDOM_MODEL = "tiny-random"
+
+# GenerationResult.stop_reason（生成を終えた理由）
+STOP_LENGTH = "length"  # max_length（トークン数の上限）に達した
+STOP_SEQUENCE = "stop_sequence"  # 停止文字列が現れた（出力には含めない）
+STOP_END = "end_of_text"  # モデルが終端トークンを出した・テンプレートの終わり
+STOP_CANCELLED = "cancelled"  # should_stopにより打ち切った（クライアントの切断など）
+
+
+@dataclass(frozen=True)
+class GenerationResult:
+    """バックエンドの生成結果"""
+
+    text: str
+    # レスポンスのmetadata.method（rule_based / llm）
+    method: str
+    # 生成したトークン数（トークン化しないバックエンドではNone）
+    token_count: Optional[int] = None
+    # 生成を終えた理由（STOP_*）
+    stop_reason: Optional[str] = None
+    # 接頭辞KVキャッシュの利用状況（再利用したトークン数と累計のヒット率など）
+    prefix_cache: Optional[dict[str, Any]] = None
+
+
+class TextGenerationBackend:
+    """テキスト生成バックエンドの基底クラス"""
+
+    name = ""
+    method = ""
+
+    def load(self) -> None:
+        """モデルなどの重いリソースを読み込みます（2回目以降は何もしない）。"""
+
+    def generate(
+        self,
+        prompt: str,
+        max_length: int,
+        temperature: float,
+        stop: Sequence[str] = (),
+    ) -> GenerationResult:
+        """最大max_lengthトークンを生成します。
+
+        stopのいずれかの文字列が現れた時点で生成をやめ、その文字列より前を返します。
+        """
+        raise NotImplementedError
+
+    def generate_batch(
+        self,
+        prompts: list[str],
+        max_length: int,
+        temperature: float,
+        stop: Sequence[str] = (),
+    ) -> list[GenerationResult]:
+        """同じ生成パラメータの複数プロンプトを生成します（既定は1件ずつ）。"""
+        return [
+            self.generate(prompt, max_length, temperature, stop) for prompt in prompts
+        ]
+
+    def generate_stream(
+        self,
+        prompt: str,
+        max_length: int,
+        temperature: float,
+        on_text: Callable[[str], None],
+        should_stop: Optional[Callable[[], bool]] = None,
+        stop: Sequence[str] = (),
+    ) -> GenerationResult:
+        """生成したテキストを逐次on_textへ渡し、最後に全体の結果を返します。
+
+        既定では生成後にテキスト全体を1回で渡します。should_stopがTrueを返すと
+        （クライアントの切断など）対応するバックエンドは生成を打ち切ります。
+        """
+        result = self.generate(prompt, max_length, temperature, stop)
+        on_text(result.text)
+        return result
+
+    def warm_up(self) -> None:
+        """モデルを読み込み、短い生成を1回実行して初回呼び出しのコストを払います。"""
+        self.load()
+        self.generate("warm up", max_length=1, temperature=0.0)
+
+
+class RuleBasedBackend(TextGenerationBackend):
+    """テンプレートと続き文をランダムに組み合わせる生成"""
+
+    name = "rule_based"
+    method = "rule_based"
+
+    templates = (
+        "Based on your prompt '{prompt}', here are some thoughts: ",
+        "Continuing from '{prompt}', we could explore: ",
+        "Your idea about '{prompt}' reminds me of: ",
+        "Building on '{prompt}', consider this: ",
+        "In response to '{prompt}', I would suggest: ",
+    )
+    continuations = (
+        "the importance of creativity in problem-solving.",
+        "how technology shapes our daily experiences.",
+        "the value of continuous learning and adaptation.",
+        "the interconnectedness of all things in nature.",
+        "the power of collaboration and teamwork.",
+        "the beauty found in simplicity and minimalism.",
+        "the significance of sustainable practices.",
+        "the impact of positive thinking on outcomes.",
+        "the role of innovation in progress.",
+        "the wisdom gained through diverse perspectives.",
+    )
+
+    def __init__(self, seed: Optional[int] = None):
+        self._random = random.Random(seed)
+
+    def generate(
+        self,
+        prompt: str,
+        max_length: int,
+        temperature: float,
+        stop: Sequence[str] = (),
+    ) -> GenerationResult:
+        return self._generate(prompt, max_length, StopSequences(stop))
+
+    def generate_stream(
+        self,
+        prompt: str,
+        max_length: int,
+        temperature: float,
+        on_text: Callable[[str], None],
+        should_stop: Optional[Callable[[], bool]] = None,
+        stop: Sequence[str] = (),
+    ) -> GenerationResult:
+        return self._generate(
+            prompt, max_length, StopSequences(stop), on_text, should_stop
+        )
+
+    def _generate(
+        self,
+        prompt: str,
+        max_length: int,
+        stop: "StopSequences",
+        on_text: Optional[Callable[[str], None]] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+    ) -> GenerationResult:
+        """単語（後続の空白を含む）ごとにテキストを伸ばし、上限や停止文字列で打ち切ります。
+
+        ルールベースでは1文字を1トークンとして数えます。on_textを指定した場合は
+        単語ごとに送信します（停止文字列の先頭かもしれない末尾は確定まで保留）。
+        """
+        template = self._random.choice(self.templates)
+        continuation = self._random.choice(self.continuations)
+        source = template.format(prompt=prompt) + continuation
+        text = ""
+        sent_length = 0
+        stop_reason = STOP_END
+        for chunk in re.findall(r"\S+\s*", source):
+            if should_stop is not None and should_stop():
+                stop_reason = STOP_CANCELLED
+                break
+            if len(text) + len(chunk) > max_length:
+                chunk = chunk[: max_length - len(text)]
+                stop_reason = STOP_LENGTH
+            # 前回までに確認済みの部分をまたぐ停止文字列も見つけられる位置から探す
+            start = max(0, len(text) - stop.max_length + 1)
+            text += chunk
+            index = stop.find(text, start)
+            if index >= 0:
+                text, stop_reason = text[:index], STOP_SEQUENCE
+            if on_text is not None:
+                end = len(text)
+                if stop_reason == STOP_END:
+                    end -= stop.holdback(text)
+                if end > sent_length:
+                    on_text(text[sent_length:end])
+                    sent_length = end
+            if stop_reason != STOP_END:
+                break
+        if on_text is not None and stop_reason == STOP_END and len(text) > sent_length:
+            on_text(text[sent_length:])
+        return GenerationResult(
+            text=text,
+            method=self.method,
+            token_count=len(text),
+            stop_reason=stop_reason,
+        )
+
+
+class StopSequences:
+    """停止文字列の検出"""
+
+    def __init__(self, sequences: Sequence[str] = ()):
+        self.sequences = tuple(sequence for sequence in sequences if sequence)
+        self.max_length = max(map(len, self.sequences), default=0)
+
+    def __bool__(self) -> bool:
+        return bool(self.sequences)
+
+    def find(self, text: str, start: int = 0) -> int:
+        """start以降で最初に現れる停止文字列の位置（なければ-1）"""
+        positions = [
+            index
+            for sequence in self.sequences
+            if (index := text.find(sequence, start)) >= 0
+        ]
+        return min(positions, default=-1)
+
+    def holdback(self, text: str) -> int:
+        """末尾のうち、停止文字列の先頭と一致していて送信を保留すべき文字数"""
+        for length in range(min(self.max_length - 1, len(text)), 0, -1):
+            suffix = text[-length:]
+            if any(sequence.startswith(suffix) for sequence in self.sequences):
+                return length
+        return 0
+
+
+class StopSequenceCriteria:
+    """生成したテキストに停止文字列が現れた行の生成を止めるstopping_criteria"""
+
+    def __init__(self, tokenizer: Any, stop: StopSequences, prompt_length: int):
+        self.tokenizer = tokenizer
+        self.stop = stop
+        self.prompt_length = prompt_length
+        # 停止文字列を含み得る末尾のトークン数（1トークン1バイト以上・1文字4バイト以下）
+        self.window = 4 * stop.max_length + 4
+
+    def __call__(self, input_ids: Any, scores: Any, **kwargs: Any) -> Any:
+        import torch
+
+        start = max(self.prompt_length, input_ids.shape[1] - self.window)
+        tails = self.tokenizer.batch_decode(
+            input_ids[:, start:], skip_special_tokens=True
+        )
+        return torch.tensor(
+            [self.stop.find(tail) >= 0 for tail in tails],
+            dtype=torch.bool,
+            device=input_ids.device,
+        )
+
+
+class TextCallbackStreamer:
+    """model.generate()のstreamerとして、確定したテキストの差分をコールバックへ渡す
+
+    バイトレベルのトークナイザーでは1トークンが文字の途中で終わることがあるため、
+    デコード結果が置換文字（U+FFFD）で終わる間は送信を保留します。
+    停止文字列の先頭と一致する末尾も、停止文字列かどうかが確定するまで保留します。
+    """
+
+    def __init__(
+        self,
+        tokenizer: Any,
+        on_text: Callable[[str], None],
+        stop: Optional[StopSequences] = None,
+    ):
+        self.tokenizer = tokenizer
+        self.on_text = on_text
+        self.stop = stop or StopSequences()
+        self.token_ids: list[int] = []
+        self.sent_length = 0
+        self.stopped = False
+        self._prompt_skipped = False
+
+    def put(self, value: Any) -> None:
+        # 最初の呼び出しはプロンプトのトークン
+        if not self._prompt_skipped:
+            self._prompt_skipped = True
+            return
+        self.token_ids.extend(value.reshape(-1).tolist())
+        self._send(final=False)
+
+    def end(self) -> None:
+        self._send(final=True)
+
+    def _send(self, final: bool) -> None:
+        if self.stopped:
+            return
+        text = self.tokenizer.decode(self.token_ids, skip_special_tokens=True)
+        if not final and text.endswith("\ufffd"):
+            return
+        index = self.stop.find(text, max(0, self.sent_length - self.stop.max_length))
+        if index >= 0:
+            text = text[:index]
+            self.stopped = True
+        elif not final:
+            text = text[: len(text) - self.stop.holdback(text)]
+        if len(text) > self.sent_length:
+            self.on_text(text[self.sent_length :])
+            self.sent_length = len(text)
+
+
+def build_tiny_random_model() -> tuple[Any, Any]:
+    """ネットワークなしで使える小さなランダム初期化GPT-2とバイト単位のトークナイザー"""
+    import torch
+    from tokenizers import Tokenizer, decoders, models, pre_tokenizers
+    from transformers import GPT2Config, GPT2LMHeadModel, PreTrainedTokenizerFast
+
+    # バイトレベルの256文字 + 終端トークン（マージなしのBPE）
+    vocab = {
+        char: index
+        for index, char in enumerate(sorted(pre_tokenizers.ByteLevel.alphabet()))
+    }
+    eos_token = "<|endoftext|>"
+    vocab[eos_token] = len(vocab)
+    tokenizer_object = Tokenizer(models.BPE(vocab=vocab, merges=[]))
+    tokenizer_object.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    tokenizer_object.decoder = decoders.ByteLevel()
+    tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer_object, eos_token=eos_token, pad_token=eos_token
+    )
+
+    torch.manual_seed(0)
+    config = GPT2Config(
+        vocab_size=len(vocab),
+        n_positions=1024,
+        n_embd=32,
+        n_layer=2,
+        n_head=2,
+        bos_token_id=vocab[eos_token],
+        eos_token_id=vocab[eos_token],
+    )
+    return tokenizer, GPT2LMHeadModel(config)
+
+
+class TransformersBackend(TextGenerationBackend):
+    """ローカルのHugging Face因果言語モデルによる生成
+
+    prefix_cacheを指定すると、1件ずつの生成でプロンプトのKVを保存し、
+    先頭が一致する以降のプロンプトではその分のプレフィルを省略します。
+    """
+
+    name = "transformers"
+    method = "llm"
+
+    def __init__(
+        self,
+        model_name: str,
+        device: str = "cpu",
+        prefix_cache: Optional[PrefixKVCache] = None,
+    ):
+        self.model_name = model_name
+        self.device = device
+        self.prefix_cache = prefix_cache
+        self.tokenizer: Any = None
+        self.model: Any = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.model is not None
+
+    def load(self) -> None:
+        if self.model is not None:
+            return
+        with self._lock:
+            if self.model is not None:
+                return
+            if self.model_name == TINY_RANDOM_MODEL:
+                tokenizer, model = build_tiny_random_model()
+            else:
+                from transformers import AutoModelForCausalLM, AutoTokenizer
+
+                tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                model = AutoModelForCausalLM.from_pretrained(self.model_name)
+            if tokenizer.pad_token is None:
+                tokenizer.pad_token = tokenizer.eos_token
+            # 因果言語モデルのバッチ生成では末尾を揃えるため左側をパディングする
+            tokenizer.padding_side = "left"
+            self.tokenizer = tokenizer
+            # modelの代入を最後にしてloadedの判定を読み込み完了後にする
+            self.model = model.to(self.device).eval()
+
+    def generate(
+        self,
+        prompt: str,
+        max_length: int,
+        temperature: float,
+        stop: Sequence[str] = (),
+    ) -> GenerationResult:
+        return self.generate_batch([prompt], max_length, temperature, stop)[0]
+
+    def generate_batch(
+        self,
+        prompts: list[str],
+        max_length: int,
+        temperature: float,
+        stop: Sequence[str] = (),
+    ) -> list[GenerationResult]:
+        """プロンプトを左詰めでパディングし、1回のバッチ推論で生成します。
+
+        max_lengthは生成ループ内で打ち切るトークン数の上限（max_new_tokens）です。
+        停止文字列が現れた行はその時点で生成を止めます。
+        """
+        import torch
+
+        self.load()
+        stop_sequences = StopSequences(stop)
+        options = self._generation_options(max_length, temperature)
+        if len(prompts) == 1:
+            return [self._generate_one(prompts[0], options, stop_sequences)]
+        inputs = self.tokenizer(prompts, return_tensors="pt", padding=True).to(
+            self.device
+        )
+        prompt_length = inputs["input_ids"].shape[1]
+        if stop_sequences:
+            options["stopping_criteria"] = [
+                StopSequenceCriteria(self.tokenizer, stop_sequences, prompt_length)
+            ]
+        with torch.inference_mode():
+            output = self.model.generate(**inputs, **options)
+        return [
+            self._to_result(tokens, stop_sequences)
+            for tokens in output[:, prompt_length:].tolist()
+        ]
+
+    def generate_stream(
+        self,
+        prompt: str,
+        max_length: int,
+        temperature: float,
+        on_text: Callable[[str], None],
+        should_stop: Optional[Callable[[], bool]] = None,
+        stop: Sequence[str] = (),
+    ) -> GenerationResult:
+        """1トークン生成するごとに、確定したテキストをon_textへ渡します。"""
+        import torch
+
+        self.load()
+        stop_sequences = StopSequences(stop)
+        options = self._generation_options(max_length, temperature)
+        options["streamer"] = TextCallbackStreamer(
+            self.tokenizer, on_text, stop_sequences
+        )
+        if should_stop is not None:
+
+            def stop_requested(input_ids: Any, scores: Any, **kwargs: Any) -> Any:
+                return torch.full(
+                    (input_ids.shape[0],),
+                    should_stop(),
+                    dtype=torch.bool,
+                    device=input_ids.device,
+                )
+
+            options["stopping_criteria"] = [stop_requested]
+
+        return self._generate_one(prompt, options, stop_sequences, should_stop)
+
+    def _generate_one(
+        self,
+        prompt: str,
+        options: dict,
+        stop: StopSequences,
+        should_stop: Optional[Callable[[], bool]] = None,
+    ) -> GenerationResult:
+        """1件のプロンプトを生成します（パディングなし、接頭辞KVキャッシュを利用）。"""
+        import torch
+
+        inputs = self.tokenizer(prompt, return_tensors="pt").to(self.device)
+        prompt_ids = inputs["input_ids"][0].tolist()
+        if stop:
+            options.setdefault("stopping_criteria", []).append(
+                StopSequenceCriteria(self.tokenizer, stop, len(prompt_ids))
+            )
+        match = None
+        if self.prefix_cache is not None:
+            match = self.prefix_cache.lookup(prompt_ids)
+            if match.past_key_values is not None:
+                # 一致した接頭辞のKVから始め、残りのトークンだけをプレフィルする
+                options["past_key_values"] = match.past_key_values
+            options["return_dict_in_generate"] = True
+
+        with torch.inference_mode():
+            output = self.model.generate(**inputs, **options)
+
+        prefix_cache_info = None
+        if self.prefix_cache is not None:
+            # 生成後のKVは生成トークン分も含むため、プロンプト分に切り詰めて保存
+            output.past_key_values.crop(len(prompt_ids))
+            self.prefix_cache.store(prompt_ids, output.past_key_values)
+            stats = self.prefix_cache.stats()
+            prefix_cache_info = {
+                "reused_tokens": match.reused_tokens,
+                "hit_rate": stats["hit_rate"],
+                "saved_prefill_tokens": stats["saved_prefill_tokens"],
+            }
+            output = output.sequences
+        return self._to_result(
+            output[0, len(prompt_ids) :].tolist(),
+            stop,
+            cancelled=should_stop is not None and should_stop(),
+            prefix_cache=prefix_cache_info,
+        )
+
+    def _generation_options(self, max_length: int, temperature: float) -> dict:
+        options: dict[str, Any] = {
+            "max_new_tokens": max_length,
+            "pad_token_id": self.tokenizer.pad_token_id,
+        }
+        # 温度0は貪欲法（サンプリングしない）
+        if temperature > 0:
+            options.update(do_sample=True, temperature=temperature)
+        else:
+            options["do_sample"] = False
+        return options
+
+    def _to_result(
+        self,
+        tokens: list[int],
+        stop: StopSequences,
+        cancelled: bool = False,
+        prefix_cache: Optional[dict[str, Any]] = None,
+    ) -> GenerationResult:
+        """生成したトークン列（バッチのパディングを含み得る）を結果にします。
+
+        token_countは実際に生成したトークン数（終端トークン・停止文字列を含む）です。
+        """
+        text = self.tokenizer.decode(tokens, skip_special_tokens=True)
+        index = stop.find(text)
+        if index >= 0:
+            # 停止文字列で止めた行の以降のトークンはバッチのパディング
+            text = text[:index]
+            stop_reason = STOP_SEQUENCE
+            pad_token_id = self.tokenizer.pad_token_id
+            count = (
+                tokens.index(pad_token_id) if pad_token_id in tokens else len(tokens)
+            )
+        elif self.tokenizer.eos_token_id in tokens:
+            stop_reason = STOP_END
+            count = tokens.index(self.tokenizer.eos_token_id) + 1
+        else:
+            stop_reason = STOP_CANCELLED if cancelled else STOP_LENGTH
+            count = len(tokens)
+        return GenerationResult(
+            text=text,
+            method=self.method,
+            token_count=count,
+            stop_reason=stop_reason,
+            prefix_cache=prefix_cache,
+        )
+
+
+class InferenceServerError(RuntimeError):
+    """推論サーバーに接続できない、またはサーバー側で生成に失敗した"""
+
+
+class RemoteBackend(TextGenerationBackend):
+    """推論サーバー（inference_server.py）にローカルIPCで生成を依頼する
+
+    uvicornの各ワーカーはモデルを読み込まず、1つのモデルを共有する推論プロセス群に
+    Unixドメインソケットで接続します。リクエストごとに接続するため、空いている
+    推論プロセスが接続を受け付けます。
+    """
+
+    name = "remote"
+    method = "llm"
+
+    def __init__(
+        self, address: str, model_name: str = "", authkey: Optional[bytes] = None
+    ):
+        self.address = address
+        # 結果キャッシュのキーに使うサーバー側のモデル名
+        self.model_name = model_name
+        self.authkey = authkey
+
+    def generate(
+        self,
+        prompt: str,
+        max_length: int,
+        temperature: float,
+        stop: Sequence[str] = (),
+    ) -> GenerationResult:
+        return self.generate_batch([prompt], max_length, temperature, stop)[0]
+
+    def generate_batch(
+        self,
+        prompts: list[str],
+        max_length: int,
+        temperature: float,
+        stop: Sequence[str] = (),
+    ) -> list[GenerationResult]:
+        with self._connect() as conn:
+            conn.send(("generate_batch", prompts, max_length, temperature, tuple(stop)))
+            return self._receive(conn)[1]
+
+    def generate_stream(
+        self,
+        prompt: str,
+        max_length: int,
+        temperature: float,
+        on_text: Callable[[str], None],
+        should_stop: Optional[Callable[[], bool]] = None,
+        stop: Sequence[str] = (),
+    ) -> GenerationResult:
+        """サーバーから届いたテキストを逐次on_textへ渡します。
+
+        should_stopがTrueを返した場合は接続を閉じ、サーバー側の生成も打ち切らせます。
+        """
+        chunks: list[str] = []
+        with self._connect() as conn:
+            conn.send(("generate_stream", prompt, max_length, temperature, tuple(stop)))
+            while True:
+                kind, payload = self._receive(conn)
+                if kind != "text":
+                    return payload
+                chunks.append(payload)
+                on_text(payload)
+                if should_stop is not None and should_stop():
+                    return GenerationResult(
+                        text="".join(chunks),
+                        method=self.method,
+                        stop_reason=STOP_CANCELLED,
+                    )
+
+    def ping(self) -> int:
+        """サーバーの疎通を確認し、応答した推論プロセスのPIDを返します。"""
+        with self._connect() as conn:
+            conn.send(("ping",))
+            return self._receive(conn)[1]
+
+    def warm_up(self) -> None:
+        # モデルの読み込みとウォームアップはサーバー側で済んでいる
+        self.ping()
+
+    def _connect(self) -> Connection:
+        try:
+            return Client(self.address, family="AF_UNIX", authkey=self.authkey)
+        except OSError as e:
+            raise InferenceServerError(
+                f"推論サーバーに接続できません: {self.address}（{e}）"
+            ) from e
+
+    def _receive(self, conn: Connection) -> tuple[str, Any]:
+        try:
+            kind, payload = conn.recv()
+        except (EOFError, OSError) as e:
+            raise InferenceServerError("推論サーバーとの接続が切断されました") from e
+        if kind == "error":
+            raise InferenceServerError(payload)
+        return kind, payload
+
+
+BACKENDS = {
+    RuleBasedBackend.name: RuleBasedBackend,
+    TransformersBackend.name: TransformersBackend,
+    RemoteBackend.name: RemoteBackend,
+}
+
+
+def create_backend(
+    name: str,
+    model_name: str = "",
+    device: str = "cpu",
+    prefix_cache: Optional[PrefixKVCache] = None,
+    address: str = "",
+    authkey: Optional[bytes] = None,
+) -> TextGenerationBackend:
+    """名前に対応するバックエンドを作成します。
+
+    address・authkeyはremoteバックエンドの推論サーバーのソケットと認証キーです。
+    """
+    if name == RuleBasedBackend.name:
+        return RuleBasedBackend()
+    if name == TransformersBackend.name:
+        return TransformersBackend(model_name, device, prefix_cache)
+    if name == RemoteBackend.name:
+        return RemoteBackend(address, model_name, authkey)
+    raise ValueError(
+        f"未対応のテキスト生成バックエンドです: {name}（{', '.join(BACKENDS)}）"
+    )
@@ -0,0 +1,169 @@
+"""テキスト生成のマイクロバッチング
+
+同時に届いた生成リクエストを (max_length, temperature, stop) ごとにまとめ、
+待ち時間の上限（max_wait_ms）またはバッチサイズの上限に達した時点で
+1回のバッチ推論として実行し、結果をそれぞれの呼び出し元へ返します。
+受け付け済み（待機中・推論中）のリクエストが上限に達した場合は
+QueueFullError を送出します（エンドポイントは503を返す）。
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Sequence
+from dataclasses import dataclass
+from typing import Callable
+
+from app.services.text.backends import GenerationResult, TextGenerationBackend
+
+# バッチにまとめられる条件（同じ生成パラメータのリクエストのみ同じバッチにする）
+BatchKey = tuple[int, float, tuple[str, ...]]
+
+
+class QueueFullError(RuntimeError):
+    """生成キューが上限に達しており、リクエストを受け付けられない"""
+
+    def __init__(self, max_queue_size: int):
+        super().__init__(
+            f"テキスト生成キューが上限（{max_queue_size}件）に達しています"
+        )
+        self.max_queue_size = max_queue_size
+
+
+@dataclass
+class BatchOutcome:
+    """バッチ推論の結果（1リクエスト分）"""
+
+    result: GenerationResult
+    # バッチ推論にかかった時間（秒）
+    generation_time: float
+    # 受け付けからバッチ実行開始までの待ち時間（秒）
+    queue_time: float
+    batch_size: int
+
+
+@dataclass(eq=False)
+class _PendingRequest:
+    prompt: str
+    future: "asyncio.Future[BatchOutcome]"
+    enqueued_at: float
+    # バッチ推論に渡したか（渡した分の受け付け枠は推論の完了時に解放する）
+    dispatched: bool = False
+
+
+class BatchScheduler:
+    """生成リクエストをまとめてバッチ推論するスケジューラー"""
+
+    def __init__(
+        self,
+        backend: TextGenerationBackend,
+        run_in_executor: Callable[..., Awaitable],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        max_queue_size: int = 64,
+    ):
+        self.backend = backend
+        self.run_in_executor = run_in_executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue_size = max_queue_size
+        self._groups: dict[BatchKey, list[_PendingRequest]] = {}
+        self._timers: dict[BatchKey, asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task] = set()
+        # 受け付けてからバッチ推論が終わっていないリクエスト数
+        # （推論中に呼び出し元がキャンセルされても、推論が終わるまで数える）
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def submit(
+        self,
+        prompt: str,
+        max_length: int,
+        temperature: float,
+        stop: Sequence[str] = (),
+    ) -> BatchOutcome:
+        """リクエストをキューに入れ、バッチ推論の結果を待ちます。"""
+        if self._in_flight >= self.max_queue_size:
+            raise QueueFullError(self.max_queue_size)
+
+        loop = asyncio.get_running_loop()
+        key = (max_length, float(temperature), tuple(stop))
+        pending = _PendingRequest(prompt, loop.create_future(), time.perf_counter())
+        group = self._groups.setdefault(key, [])
+        group.append(pending)
+        self._in_flight += 1
+        try:
+            if len(group) >= self.max_batch_size:
+                self._flush(key)
+            elif len(group) == 1:
+                self._timers[key] = loop.call_later(self.max_wait, self._flush, key)
+            return await pending.future
+        finally:
+            if not pending.dispatched:
+                self._discard(key, pending)
+
+    def _discard(self, key: BatchKey, pending: _PendingRequest) -> None:
+        """バッチに渡す前に抜けたリクエストをグループから外し、受け付け枠を解放します。"""
+        group = self._groups.get(key)
+        if group is not None and pending in group:
+            group.remove(pending)
+            if not group:
+                del self._groups[key]
+                timer = self._timers.pop(key, None)
+                if timer is not None:
+                    timer.cancel()
+        self._in_flight -= 1
+
+    def _flush(self, key: BatchKey) -> None:
+        """グループを取り出し、バッチ推論のタスクを開始します。"""
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        group = self._groups.pop(key, [])
+        # 待機中にキャンセルされた呼び出し元の分は推論しない
+        group = [pending for pending in group if not pending.future.done()]
+        if not group:
+            return
+        for pending in group:
+            pending.dispatched = True
+        task = asyncio.get_running_loop().create_task(self._run_batch(key, group))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, key: BatchKey, group: list[_PendingRequest]) -> None:
+        try:
+            await self._generate(key, group)
+        finally:
+            self._in_flight -= len(group)
+
+    async def _generate(self, key: BatchKey, group: list[_PendingRequest]) -> None:
+        max_length, temperature, stop = key
+        started_at = time.perf_counter()
+        try:
+            results = await self.run_in_executor(
+                self.backend.generate_batch,
+                [pending.prompt for pending in group],
+                max_length,
+                temperature,
+                stop,
+            )
+        except Exception as error:
+            for pending in group:
+                if not pending.future.done():
+                    pending.future.set_exception(error)
+            return
+
+        finished_at = time.perf_counter()
+        for pending, result in zip(group, results):
+            if pending.future.done():
+                continue
+            pending.future.set_result(
+                BatchOutcome(
+                    result=result,
+                    generation_time=finished_at - started_at,
+                    queue_time=started_at - pending.enqueued_at,
+                    batch_size=len(group),
+                )
+            )
@@ -0,0 +1,328 @@
+"""テキスト生成の実行
+
+設定されたバックエンドをプロセスごとに1つだけ作成し、専用のスレッドプールで
+生成を実行します。推論中もイベントループは解放されるため、/health などの
+他のエンドポイントは待たされません。
+settings.text_batching が有効な場合は batching.BatchScheduler で同時リクエストを
+まとめてからバッチ推論します。決定的な生成の結果は app.utils.ttl_cache の
+LRU+TTLキャッシュに保存します。stream_text() はトークンを生成しながら逐次返します
+（ストリーミングはバッチング・キャッシュの対象外）。
+"""
+
+import asyncio
+import contextlib
+import threading
+import time
+import unicodedata
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.generated.generated_models import GenerateTextRequest, GenerateTextResponse
+from app.services.text.backends import (
+    GenerationResult,
+    InferenceServerError,
+    TextGenerationBackend,
+    create_backend,
+)
+from app.services.text.batching import BatchScheduler, QueueFullError
+from app.services.text.prefix_cache import PrefixKVCache
+from app.utils.ttl_cache import TTLCache
+
+# GenerateTextRequestの省略時の値（source/openapi.yamlのdefault）
+DEFAULT_MAX_LENGTH = 100
+DEFAULT_TEMPERATURE = 0.7
+# 結果キャッシュの1エントリあたりの生成テキスト以外の概算バイト数
+RESULT_CACHE_ENTRY_OVERHEAD = 512
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """推論専用のスレッドプールを返します（初回呼び出し時に作成）。"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.text_generation_workers,
+                    thread_name_prefix="text-generation",
+                )
+    return _executor
+
+
+def create_prefix_cache(max_bytes: Optional[int] = None) -> Optional[PrefixKVCache]:
+    """設定に従った接頭辞KVキャッシュを作成します（無効ならNone）。
+
+    max_bytesを省略すると TEXT_PREFIX_CACHE_MAX_BYTES を上限にします。
+    """
+    if not settings.text_prefix_cache_enabled:
+        return None
+    if max_bytes is None:
+        max_bytes = settings.text_prefix_cache_max_bytes
+    return PrefixKVCache(
+        max_bytes=max_bytes,
+        max_entries=settings.text_prefix_cache_max_entries,
+        min_tokens=settings.text_prefix_cache_min_tokens,
+    )
+
+
+@cache
+def get_backend() -> TextGenerationBackend:
+    """設定に従ったバックエンドを返します（プロセスごとに1つ）。"""
+    return create_backend(
+        settings.text_backend,
+        settings.text_model_name,
+        settings.text_model_device,
+        create_prefix_cache(),
+        address=settings.text_inference_address,
+        authkey=settings.text_inference_authkey.encode() or None,
+    )
+
+
+@cache
+def get_scheduler() -> BatchScheduler:
+    """設定に従ったバッチスケジューラーを返します（プロセスごとに1つ）。"""
+    return BatchScheduler(
+        get_backend(),
+        run_in_executor,
+        max_batch_size=settings.text_batch_max_size,
+        max_wait_ms=settings.text_batch_wait_ms,
+        max_queue_size=settings.text_batch_max_queue,
+    )
+
+
+async def run_in_executor(func, *args):
+    """推論用スレッドプールで同期関数を実行します。"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), func, *args)
+
+
+def _timed_generate(
+    backend: TextGenerationBackend,
+    prompt: str,
+    max_length: int,
+    temperature: float,
+    stop: tuple[str, ...],
+) -> tuple[GenerationResult, float]:
+    started_at = time.perf_counter()
+    result = backend.generate(prompt, max_length, temperature, stop)
+    return result, time.perf_counter() - started_at
+
+
+async def _generate_batched(
+    scheduler: BatchScheduler,
+    prompt: str,
+    max_length: int,
+    temperature: float,
+    stop: tuple[str, ...],
+) -> tuple[GenerationResult, dict]:
+    try:
+        outcome = await scheduler.submit(prompt, max_length, temperature, stop)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
+        )
+    return outcome.result, {
+        "generation_time": outcome.generation_time,
+        "queue_time": outcome.queue_time,
+        "batch_size": outcome.batch_size,
+    }
+
+
+def result_cache_key(
+    backend: TextGenerationBackend,
+    prompt: str,
+    max_length: int,
+    temperature: float,
+    stop: tuple[str, ...] = (),
+) -> tuple:
+    """正規化したリクエスト（省略値の補完・Unicode正規化）と生成エンジンのキー"""
+    return (
+        backend.name,
+        getattr(backend, "model_name", ""),
+        unicodedata.normalize("NFC", prompt),
+        max_length,
+        round(float(temperature), 4),
+        stop,
+    )
+
+
+def _result_metadata(result: GenerationResult) -> dict[str, Any]:
+    """生成結果から求まるmetadataの項目"""
+    metadata: dict[str, Any] = {"method": result.method, "length": len(result.text)}
+    if result.token_count is not None:
+        metadata["token_count"] = result.token_count
+    if result.stop_reason is not None:
+        metadata["stop_reason"] = result.stop_reason
+    if result.prefix_cache is not None:
+        metadata["prefix_cache"] = result.prefix_cache
+    return metadata
+
+
+def _result_size(value: tuple[GenerationResult, dict]) -> int:
+    # 生成テキストのバイト数 + キーやメタデータ分の概算
+    return len(value[0].text.encode("utf-8")) + RESULT_CACHE_ENTRY_OVERHEAD
+
+
+@cache
+def get_result_cache() -> Optional[TTLCache]:
+    """生成結果キャッシュを返します（settings.text_cache_enabledが無効ならNone）。"""
+    if not settings.text_cache_enabled:
+        return None
+    return TTLCache(
+        "text_generation",
+        max_entries=settings.text_cache_max_entries,
+        max_bytes=settings.text_cache_max_bytes,
+        ttl=settings.text_cache_ttl_seconds,
+        sizeof=_result_size,
+    )
+
+
+async def generate_text(
+    request: GenerateTextRequest,
+    backend: Optional[TextGenerationBackend] = None,
+    scheduler: Optional[BatchScheduler] = None,
+) -> GenerateTextResponse:
+    """プロンプトからテキストを生成し、生成時間をmetadataに含めて返します。
+
+    schedulerを指定した場合（またはsettings.text_batchingが有効な場合）は
+    同時に届いたリクエストとまとめてバッチ推論します。
+    温度が0（決定的な生成）またはrequest.cacheが指定された場合は結果キャッシュを使い、
+    実行中の同じリクエストがあればその結果を共有します。
+    """
+    if scheduler is None and backend is None and settings.text_batching:
+        scheduler = get_scheduler()
+    if scheduler is not None:
+        backend = scheduler.backend
+    backend = backend or get_backend()
+    max_length = request.max_length or DEFAULT_MAX_LENGTH
+    temperature = (
+        request.temperature if request.temperature is not None else DEFAULT_TEMPERATURE
+    )
+    stop = tuple(request.stop or ())
+
+    async def compute() -> tuple[GenerationResult, dict]:
+        try:
+            if scheduler is not None:
+                return await _generate_batched(
+                    scheduler, request.prompt, max_length, temperature, stop
+                )
+            result, elapsed = await run_in_executor(
+                _timed_generate, backend, request.prompt, max_length, temperature, stop
+            )
+        except InferenceServerError as e:
+            # 推論サーバーの停止・再起動中は一時的な利用不可として扱う
+            raise HTTPException(
+                status_code=503, detail=str(e), headers={"Retry-After": "1"}
+            )
+        return result, {"generation_time": elapsed}
+
+    result_cache = get_result_cache()
+    if result_cache is not None and (temperature == 0 or request.cache):
+        key = result_cache_key(backend, request.prompt, max_length, temperature, stop)
+        (result, timings), source = await result_cache.get_or_compute(key, compute)
+        # ヒット時のgeneration_timeは元の生成にかかった時間
+        timings = {**timings, "cache": source}
+    else:
+        result, timings = await compute()
+
+    # generation_timeはキュー待ちを含まない推論時間（秒）
+    metadata = {**_result_metadata(result), **timings}
+    return GenerateTextResponse(
+        generated_text=result.text, input_prompt=request.prompt, metadata=metadata
+    )
+
+
+def _timed_generate_stream(
+    backend: TextGenerationBackend,
+    prompt: str,
+    max_length: int,
+    temperature: float,
+    on_text: Callable[[str], None],
+    should_stop: Callable[[], bool],
+    stop: tuple[str, ...],
+) -> tuple[GenerationResult, float]:
+    started_at = time.perf_counter()
+    result = backend.generate_stream(
+        prompt, max_length, temperature, on_text, should_stop, stop
+    )
+    return result, time.perf_counter() - started_at
+
+
+async def stream_text(
+    request: GenerateTextRequest, backend: Optional[TextGenerationBackend] = None
+) -> AsyncIterator[dict[str, Any]]:
+    """生成したテキストを token イベントとして逐次返し、最後に done イベントを返します。
+
+    イベントはsource/openapi.yamlのGenerateTextStreamEventの形式です。
+    呼び出し側がイテレーションを途中でやめた場合（クライアントの切断など）は
+    推論用スレッドでの生成も打ち切ります。
+    """
+    backend = backend or get_backend()
+    max_length = request.max_length or DEFAULT_MAX_LENGTH
+    temperature = (
+        request.temperature if request.temperature is not None else DEFAULT_TEMPERATURE
+    )
+    loop = asyncio.get_running_loop()
+    chunks: asyncio.Queue[Optional[str]] = asyncio.Queue()
+    cancelled = threading.Event()
+
+    def on_text(text: str) -> None:
+        loop.call_soon_threadsafe(chunks.put_nowait, text)
+
+    started_at = time.perf_counter()
+    generation = asyncio.ensure_future(
+        run_in_executor(
+            _timed_generate_stream,
+            backend,
+            request.prompt,
+            max_length,
+            temperature,
+            on_text,
+            cancelled.is_set,
+            tuple(request.stop or ()),
+        )
+    )
+    # 生成終了（成功・失敗とも）をキューの終端として通知する
+    generation.add_done_callback(lambda _: chunks.put_nowait(None))
+
+    time_to_first_token = None
+    try:
+        index = 0
+        while (text := await chunks.get()) is not None:
+            if time_to_first_token is None:
+                time_to_first_token = time.perf_counter() - started_at
+            yield {"event": "token", "index": index, "token": text}
+            index += 1
+
+        try:
+            result, elapsed = await generation
+        except Exception as e:
+            yield {"event": "error", "detail": f"テキスト生成に失敗しました: {e}"}
+            return
+        metadata = {
+            **_result_metadata(result),
+            "generation_time": elapsed,
+            "time_to_first_token": time_to_first_token,
+        }
+        yield {"event": "done", "generated_text": result.text, "metadata": metadata}
+    finally:
+        cancelled.set()
+        # 途中で抜けた場合も生成の終了を待ち、推論用スレッドの後始末と例外の回収をする
+        # （待つ間に呼び出し側がキャンセルされると生成のFutureもキャンセルされる）
+        with contextlib.suppress(Exception):
+            await generation
+
+
+async def warm_up(backend: Optional[TextGenerationBackend] = None) -> float:
+    """モデルの読み込みと1回目の生成を推論用スレッドで行い、所要時間（秒）を返します。"""
+    backend = backend or get_backend()
+    started_at = time.perf_counter()
+    await run_in_executor(backend.warm_up)
+    return time.perf_counter() - started_at
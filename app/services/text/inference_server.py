@@ -0,0 +1,215 @@
+"""推論サーバー（1つのモデルを複数の推論プロセスで共有）
+
+uvicornを複数ワーカーで起動すると、ワーカーごとにモデルを読み込むためメモリが
+ワーカー数に比例して増えます。推論サーバーはモデルを親プロセスで一度だけ読み込み、
+重みを共有メモリに置いてから推論プロセスをforkします。重みは読み取り専用で共有されるため、
+推論プロセスを増やしてもメモリはほぼモデル1つ分のままです。接頭辞KVキャッシュは
+fork後に推論プロセスごとに作成し、上限（TEXT_PREFIX_CACHE_MAX_BYTES）を推論プロセス数で
+分け合います。
+
+OpenMPのスレッドプールはforkを越えて使えない（子プロセスで固まる）ため、親プロセスは
+1スレッドで読み込みだけを行い、スレッド数の設定と初回生成（ウォームアップ）は
+fork後の推論プロセスで行います。
+
+推論プロセスは同じUnixドメインソケットで待ち受け（プリフォーク）、空いているプロセスが
+次の接続を受け付けます。FastAPIのワーカーは TEXT_BACKEND=remote
+（backends.RemoteBackend）で接続します。
+
+起動: python -m app.services.text.inference_server [--workers 4]（make serve-inference）
+"""
+
+import argparse
+import os
+import signal
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from multiprocessing.connection import Connection, Listener
+from multiprocessing.process import BaseProcess
+from typing import Optional
+
+from app.core.config import settings
+from app.services.text.backends import (
+    TextGenerationBackend,
+    TransformersBackend,
+    create_backend,
+)
+from app.services.text.generation import create_prefix_cache
+from app.services.text.prefix_cache import PrefixKVCache
+
+
+def _handle(backend: TextGenerationBackend, conn: Connection) -> None:
+    """1つの接続のリクエスト（1件）を処理して応答します。"""
+    operation, *args = conn.recv()
+    try:
+        if operation == "generate_batch":
+            conn.send(("ok", backend.generate_batch(*args)))
+        elif operation == "generate_stream":
+            _handle_stream(backend, conn, *args)
+        elif operation == "ping":
+            conn.send(("ok", os.getpid()))
+        else:
+            conn.send(("error", f"未対応のリクエストです: {operation}"))
+    except Exception as e:
+        conn.send(("error", f"テキスト生成に失敗しました: {e}"))
+
+
+def _handle_stream(
+    backend: TextGenerationBackend,
+    conn: Connection,
+    prompt: str,
+    max_length: int,
+    temperature: float,
+    stop: tuple[str, ...] = (),
+) -> None:
+    disconnected = False
+
+    def on_text(text: str) -> None:
+        nonlocal disconnected
+        if disconnected:
+            return
+        try:
+            conn.send(("text", text))
+        except OSError:
+            # クライアントが接続を閉じた（切断・打ち切り）
+            disconnected = True
+
+    result = backend.generate_stream(
+        prompt, max_length, temperature, on_text, lambda: disconnected, stop
+    )
+    if not disconnected:
+        conn.send(("ok", result))
+
+
+def worker_prefix_cache(workers: int) -> Optional[PrefixKVCache]:
+    """推論プロセス1つ分の接頭辞KVキャッシュ（上限を推論プロセス数で分け合う）"""
+    return create_prefix_cache(settings.text_prefix_cache_max_bytes // workers)
+
+
+def _serve_forever(
+    listener: Listener, backend: TextGenerationBackend, num_threads: int, workers: int
+) -> None:
+    """推論プロセスのメインループ（接続を受け付けて1件ずつ処理）"""
+    # 終了は親プロセスからのSIGTERMで行う
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    model = getattr(backend, "model", None)
+    if model is not None:
+        import torch
+
+        # プロセス間でCPUコアを分け合う（スレッドプールはfork後に作成される）
+        torch.set_num_threads(num_threads)
+    if isinstance(backend, TransformersBackend):
+        backend.prefix_cache = worker_prefix_cache(workers)
+    backend.warm_up()
+    while True:
+        try:
+            conn = listener.accept()
+        except Exception:
+            # 認証の失敗など、その接続だけを捨てる
+            continue
+        with conn:
+            try:
+                _handle(backend, conn)
+            except (EOFError, OSError):
+                pass
+
+
+@dataclass
+class InferenceServer:
+    """起動済みの推論サーバー（推論プロセス群）"""
+
+    address: str
+    listener: Listener
+    processes: list[BaseProcess] = field(default_factory=list)
+
+    def join(self) -> None:
+        for process in self.processes:
+            process.join()
+
+    def close(self) -> None:
+        """推論プロセスを終了し、ソケットを削除します。"""
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.join()
+        self.listener.close()
+
+
+def start_server(
+    backend: TextGenerationBackend,
+    address: str,
+    workers: int,
+    authkey: Optional[bytes] = None,
+) -> InferenceServer:
+    """モデルを読み込み、共有する推論プロセスをworkers個起動します。
+
+    推論プロセスはforkで作成するため、POSIX環境（Linux・macOS）でのみ動作します。
+    接頭辞KVキャッシュは推論プロセスごとに作成するため、backendのものは使いません。
+    """
+    if isinstance(backend, TransformersBackend):
+        backend.prefix_cache = None
+        if backend.model is None:
+            import torch
+
+            # forkの前にOpenMPのスレッドプールを作らないよう、1スレッドで読み込む
+            torch.set_num_threads(1)
+    # forkの前に読み込みだけを済ませ、子プロセスには読み込み済みの重みを引き継ぐ
+    backend.load()
+    model = getattr(backend, "model", None)
+    if model is not None:
+        # 重みを共有メモリへ移し、子プロセス間でコピーされないようにする
+        model.share_memory()
+
+    if os.path.exists(address):
+        os.unlink(address)
+    listener = Listener(address, family="AF_UNIX", authkey=authkey)
+    num_threads = max(1, (os.cpu_count() or 1) // workers)
+    context = get_context("fork")
+    server = InferenceServer(address, listener)
+    for _ in range(workers):
+        process = context.Process(
+            target=_serve_forever,
+            args=(listener, backend, num_threads, workers),
+            daemon=True,
+        )
+        process.start()
+        server.processes.append(process)
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="テキスト生成の推論サーバー")
+    parser.add_argument(
+        "--backend", default="transformers", help="推論プロセスで使うバックエンド"
+    )
+    parser.add_argument("--model", default=settings.text_model_name)
+    parser.add_argument("--device", default=settings.text_model_device)
+    parser.add_argument("--address", default=settings.text_inference_address)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.text_inference_workers or os.cpu_count() or 1,
+        help="推論プロセス数（既定はCPUコア数）",
+    )
+    args = parser.parse_args()
+
+    # 接頭辞KVキャッシュは推論プロセスごとにfork後に作成する
+    backend = create_backend(args.backend, args.model, args.device)
+    server = start_server(
+        backend,
+        args.address,
+        args.workers,
+        settings.text_inference_authkey.encode() or None,
+    )
+    print(
+        f"🚀 推論サーバー: {args.address}（{args.model}、推論プロセス{args.workers}個）"
+    )
+    try:
+        server.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""
+textサービス: post_echo_text_batch_impl
+"""
+
+from datetime import datetime
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.generated.generated_models import EchoTextBatchRequest, EchoTextBatchResponse
+from app.services.text.analysis import analyze_texts
+
+
+async def post_echo_text_batch_impl(
+    request: EchoTextBatchRequest,
+) -> EchoTextBatchResponse:
+    """複数テキストを単一テキストのエコーと同じエンジンで分析します（入力順）。
+
+    分析はCPU処理のため、ほかのリクエストを止めないようスレッドプールで実行します。
+    """
+    results = await run_in_threadpool(analyze_texts, request.texts)
+    return EchoTextBatchResponse(results=results, timestamp=datetime.now())
@@ -1,10 +1,15 @@
 """
-textサービス: post_echo_text_impl の自動生成スタブ
+textサービス: post_echo_text_impl
 """
 
-from typing import Any
+from datetime import datetime
 
+from app.generated.generated_models import EchoTextRequest, EchoTextResponse
+from app.services.text.analysis import analyze_text
 
-async def post_echo_text_impl(request: Any = None) -> Any:
-    """TODO: 実装してください"""
-    return {"message": "post_echo_text_impl not implemented"}
+
+async def post_echo_text_impl(request: EchoTextRequest) -> EchoTextResponse:
+    """テキストをそのまま返し、言語・単語数・感情の分析結果を添えます。"""
+    return EchoTextResponse(
+        echo=request.text, analysis=analyze_text(request.text), timestamp=datetime.now()
+    )
@@ -1,10 +1,11 @@
 """
-textサービス: post_generate_text_impl の自動生成スタブ
+textサービス: post_generate_text_impl
 """
 
-from typing import Any
+from app.generated.generated_models import GenerateTextRequest, GenerateTextResponse
+from app.services.text.generation import generate_text
 
 
-async def post_generate_text_impl(request: Any = None) -> Any:
-    """TODO: 実装してください"""
-    return {"message": "post_generate_text_impl not implemented"}
+async def post_generate_text_impl(request: GenerateTextRequest) -> GenerateTextResponse:
+    """設定されたバックエンド（ルールベースまたはLLM）でテキストを生成します。"""
+    return await generate_text(request)
@@ -1,10 +1,13 @@
 """
-textサービス: post_generate_text_legacy_impl の自動生成スタブ
+textサービス: post_generate_text_legacy_impl
 """
 
-from typing import Any
+from app.generated.generated_models import GenerateTextRequest, GenerateTextResponse
+from app.services.text.generation import generate_text
 
 
-async def post_generate_text_legacy_impl(request: Any = None) -> Any:
-    """TODO: 実装してください"""
-    return {"message": "post_generate_text_legacy_impl not implemented"}
+async def post_generate_text_legacy_impl(
+    request: GenerateTextRequest,
+) -> GenerateTextResponse:
+    """後方互換の/generate: /api/v1/text/generate と同じバックエンドで生成します。"""
+    return await generate_text(request)
@@ -0,0 +1,47 @@
+"""
+textサービス: post_generate_text_stream_impl
+"""
+
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+from fastapi.responses import StreamingResponse
+
+from app.generated.generated_models import GenerateTextRequest
+from app.services.text.generation import stream_text
+
+SSE_MEDIA_TYPE = "text/event-stream"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def encode_sse(event: dict[str, Any]) -> bytes:
+    """Server-Sent Eventsの1フレーム（event行 + data行 + 空行）"""
+    data = json.dumps(event, ensure_ascii=False, separators=(",", ":"))
+    return f"event: {event['event']}\ndata: {data}\n\n".encode()
+
+
+def encode_ndjson(event: dict[str, Any]) -> bytes:
+    """NDJSONの1行"""
+    return json.dumps(event, ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+
+
+async def _encode(
+    events: AsyncIterator[dict[str, Any]], ndjson: bool
+) -> AsyncIterator[bytes]:
+    encode = encode_ndjson if ndjson else encode_sse
+    async for event in events:
+        yield encode(event)
+
+
+async def post_generate_text_stream_impl(
+    request: GenerateTextRequest, accept: str = ""
+) -> StreamingResponse:
+    """生成したトークンを逐次送信します（AcceptでNDJSONを指定しなければSSE）。"""
+    ndjson = NDJSON_MEDIA_TYPE in accept and SSE_MEDIA_TYPE not in accept
+    return StreamingResponse(
+        _encode(stream_text(request), ndjson),
+        media_type=NDJSON_MEDIA_TYPE if ndjson else SSE_MEDIA_TYPE,
+        # プロキシ（nginx等）でのバッファリングを無効にしてトークンをすぐに届ける
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
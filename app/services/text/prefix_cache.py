@@ -0,0 +1,180 @@
+"""プロンプト接頭辞のKVキャッシュ
+
+共通のシステムプロンプトなどで始まるプロンプトでは、接頭辞部分のアテンションの
+key/value（past_key_values）は毎回同じです。生成に使ったプロンプトのKVを保存しておき、
+新しいプロンプトと先頭から一致するトークン数だけ再利用することで、その分の
+プレフィル（プロンプトの順伝播）を省略します。
+
+保存するKVは先頭のmin_tokensトークン（それより短い一致は再利用しないため、
+再利用できるエントリは必ずこのブロックが一致する）で索引し、検索ではブロックが
+一致するエントリだけを比べます。再利用するKVは一致した長さに切り詰めたテンソルだけを
+コピーします。
+
+保存するKVはバイト数とエントリ数の上限を持ち、上限を超えた場合は最も長く
+使われていないものから追い出します。推論用スレッドから呼ばれるためロックで保護します。
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+
+def _kv_tensors(past_key_values: Any) -> list[Any]:
+    return [
+        tensor
+        for layer in past_key_values.layers
+        for tensor in (layer.keys, layer.values)
+        if tensor is not None
+    ]
+
+
+def copy_kv_prefix(past_key_values: Any, length: int) -> Any:
+    """先頭のlengthトークン分だけをコピーしたCacheを返します（元のKVは変更しない）。
+
+    テンソルは切り詰めてから複製し、Cacheのそれ以外の状態はdeepcopyで複製します。
+    """
+    memo = {
+        id(tensor): tensor[..., :length, :].clone()
+        for tensor in _kv_tensors(past_key_values)
+    }
+    copied = copy.deepcopy(past_key_values, memo)
+    # テンソル以外の長さの情報も揃える（切り詰め済みのテンソルはそのまま）
+    copied.crop(length)
+    return copied
+
+
+def kv_cache_nbytes(past_key_values: Any) -> int:
+    """transformersのCache（DynamicCache）が保持するテンソルのバイト数"""
+    return sum(
+        tensor.nelement() * tensor.element_size()
+        for tensor in _kv_tensors(past_key_values)
+    )
+
+
+@dataclass
+class _Prefix:
+    token_ids: tuple[int, ...]
+    past_key_values: Any
+    size: int
+
+
+@dataclass(frozen=True)
+class PrefixMatch:
+    """lookup()の結果"""
+
+    # 再利用できる先頭のトークン数（0はキャッシュミス）
+    reused_tokens: int
+    # reused_tokens分に切り詰めたKVのコピー（生成時に書き換えてよい）
+    past_key_values: Optional[Any] = None
+
+
+class PrefixKVCache:
+    """プロンプトのKVを保存し、最長一致する接頭辞を再利用するLRUキャッシュ"""
+
+    def __init__(self, max_bytes: int, max_entries: int = 64, min_tokens: int = 16):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        # これより短い一致は再利用しない（コピーのコストに見合わないため）
+        self.min_tokens = min_tokens
+        self._entries: OrderedDict[tuple[int, ...], _Prefix] = OrderedDict()
+        # 先頭のmin_tokensトークン -> そのトークンで始まるエントリ
+        self._blocks: dict[tuple[int, ...], dict[tuple[int, ...], _Prefix]] = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.lookups = 0
+        self.hits = 0
+        self.saved_prefill_tokens = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, token_ids: list[int]) -> PrefixMatch:
+        """token_idsと先頭から最も長く一致する保存済みKVを探します。
+
+        生成には最後のトークンのlogitsが必要なため、再利用するのは最大で
+        len(token_ids) - 1 トークンです。
+        """
+        limit = len(token_ids) - 1
+        block = tuple(token_ids[: self.min_tokens])
+        with self._lock:
+            self.lookups += 1
+            if limit < self.min_tokens:
+                return PrefixMatch(reused_tokens=0)
+            best: Optional[_Prefix] = None
+            best_length = 0
+            # 先頭のブロックは一致しているため、その続きから比べる
+            for prefix in self._blocks.get(block, {}).values():
+                length = _common_prefix_length(
+                    prefix.token_ids, token_ids, limit, len(block)
+                )
+                if length > best_length:
+                    best, best_length = prefix, length
+            if best is None or best_length < self.min_tokens:
+                return PrefixMatch(reused_tokens=0)
+            self._entries.move_to_end(best.token_ids)
+            self.hits += 1
+            self.saved_prefill_tokens += best_length
+        # 保存済みのKVは書き換えないため、コピーはロックの外で行う
+        past_key_values = copy_kv_prefix(best.past_key_values, best_length)
+        return PrefixMatch(reused_tokens=best_length, past_key_values=past_key_values)
+
+    def store(self, token_ids: list[int], past_key_values: Any) -> None:
+        """プロンプトのKVを保存します（past_key_valuesはtoken_ids分に切り詰め済み）。
+
+        呼び出し後にpast_key_valuesを書き換えないでください。
+        """
+        if len(token_ids) < self.min_tokens:
+            return
+        key = tuple(token_ids)
+        size = kv_cache_nbytes(past_key_values)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            prefix = _Prefix(key, past_key_values, size)
+            self._entries[key] = prefix
+            self._blocks.setdefault(key[: self.min_tokens], {})[key] = prefix
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, oldest = self._entries.popitem(last=False)
+                block = oldest.token_ids[: self.min_tokens]
+                del self._blocks[block][oldest.token_ids]
+                if not self._blocks[block]:
+                    del self._blocks[block]
+                self.bytes -= oldest.size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._blocks.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        """ヒット率・省略したプレフィルのトークン数などの統計情報"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+                "saved_prefill_tokens": self.saved_prefill_tokens,
+                "evictions": self.evictions,
+            }
+
+
+def _common_prefix_length(
+    a: tuple[int, ...], b: list[int], limit: int, start: int = 0
+) -> int:
+    """aとbの先頭から一致するトークン数（start未満は一致済みとして比べない）"""
+    end = min(len(a), limit)
+    length = start
+    while length < end and a[length] == b[length]:
+        length += 1
+    return length
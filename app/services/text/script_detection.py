@@ -0,0 +1,190 @@
+"""Unicodeの文字種（スクリプト）による言語の推定
+
+コードポイントの範囲表 SCRIPT_RANGES から、基本多言語面（U+0000〜U+FFFF）の
+全文字を文字種コード1文字へ写す変換表をモジュール読み込み時に作成しておき、
+str.translate() でテキストを1回走査して文字種ごとの文字数を数えます
+（走査・集計はC実装で行われ、Pythonの1文字ずつのループや正規表現の連鎖は不要）。
+長いテキストは CHUNK_SIZE 文字ずつ処理し、数えた文字が max_letters 個に
+達した時点で打ち切ります。基本多言語面の外の文字（CJK拡張Bなど）は範囲表を二分探索します。
+detect_languages() は複数テキストの先頭のチャンクを連結して1回で変換し、テキストごとの
+集計は変換後の文字列の範囲に対する str.count() などのC実装の呼び出しで行います。
+
+推定する言語:
+- ja: ひらがな・カタカナを含む（漢字もjaとして数える）
+- zh: 漢字のみ（かな・ハングルを含まない）
+- ko: ハングル
+- en: ラテン文字（連続したラテン文字を1単語とし、LATIN_WORD_WEIGHT 文字分と数える）
+- mixed: 2番目に多い言語が最も多い言語の MIXED_RATIO 倍以上ある
+- unknown: 文字種を判定できる文字がない（数字・記号のみなど）
+"""
+
+import re
+from bisect import bisect_right
+from collections import Counter
+from collections.abc import Sequence
+from typing import Optional
+
+LATIN = "latin"
+HIRAGANA = "hiragana"
+KATAKANA = "katakana"
+HAN = "han"
+HANGUL = "hangul"
+
+# (開始, 終了, 文字種)。開始位置の昇順で重複なし
+SCRIPT_RANGES: tuple[tuple[int, int, str], ...] = (
+    (0x0041, 0x005A, LATIN),  # A-Z
+    (0x0061, 0x007A, LATIN),  # a-z
+    (0x00C0, 0x00D6, LATIN),  # Latin-1 Supplement（×を除く）
+    (0x00D8, 0x00F6, LATIN),  # （÷を除く）
+    (0x00F8, 0x024F, LATIN),  # Latin Extended-A/B
+    (0x1100, 0x11FF, HANGUL),  # Hangul Jamo
+    (0x1E00, 0x1EFF, LATIN),  # Latin Extended Additional
+    (0x3040, 0x309F, HIRAGANA),
+    (0x30A0, 0x30FF, KATAKANA),
+    (0x3130, 0x318F, HANGUL),  # Hangul Compatibility Jamo
+    (0x31F0, 0x31FF, KATAKANA),  # Katakana Phonetic Extensions
+    (0x3400, 0x4DBF, HAN),  # CJK Unified Ideographs Extension A
+    (0x4E00, 0x9FFF, HAN),  # CJK Unified Ideographs
+    (0xA960, 0xA97F, HANGUL),  # Hangul Jamo Extended-A
+    (0xAC00, 0xD7AF, HANGUL),  # Hangul Syllables
+    (0xD7B0, 0xD7FF, HANGUL),  # Hangul Jamo Extended-B
+    (0xF900, 0xFAFF, HAN),  # CJK Compatibility Ideographs
+    (0xFF21, 0xFF3A, LATIN),  # 全角英大文字
+    (0xFF41, 0xFF5A, LATIN),  # 全角英小文字
+    (0xFF66, 0xFF9F, KATAKANA),  # 半角カタカナ
+    (0xFFA0, 0xFFDC, HANGUL),  # 半角ハングル
+    (0x20000, 0x2FA1F, HAN),  # CJK Extension B以降・互換漢字補助
+)
+_STARTS = [start for start, _, _ in SCRIPT_RANGES]
+_ENDS = [end for _, end, _ in SCRIPT_RANGES]
+_SCRIPTS = [script for _, _, script in SCRIPT_RANGES]
+
+# 長いテキストで走査を打ち切るまでに数える文字数
+DEFAULT_MAX_LETTERS = 2048
+# 一度に変換・集計する文字数
+CHUNK_SIZE = 2048
+# 2番目に多い言語が最も多い言語のこの割合以上ならmixed
+MIXED_RATIO = 0.5
+# ラテン文字の1単語を漢字・かな・ハングルの何文字分とみなすか
+LATIN_WORD_WEIGHT = 2
+
+# 文字種 -> 変換後の1文字のコード（対象外の文字は空白）
+_CODES = {LATIN: "L", HIRAGANA: "H", KATAKANA: "K", HAN: "C", HANGUL: "G"}
+_SCRIPT_OF_CODE = {code: script for script, code in _CODES.items()}
+_OTHER = " "
+
+
+def _build_bmp_table() -> str:
+    table = [_OTHER] * 0x10000
+    for start, end, script in SCRIPT_RANGES:
+        for codepoint in range(start, min(end, 0xFFFF) + 1):
+            table[codepoint] = _CODES[script]
+    return "".join(table)
+
+
+# str.translate()用の変換表（インデックス = コードポイント）。範囲外は変換されない
+_BMP_TABLE = _build_bmp_table()
+_LATIN_WORD = re.compile(_CODES[LATIN] + "+")
+# 変換表で変換されない文字（基本多言語面の外）
+_UNMAPPED = re.compile(f"[^{''.join(_CODES.values())}{_OTHER}]")
+# 連結するテキストの区切り（変換後は対象外の文字になる）
+_SEPARATOR = "\n"
+
+
+def script_of(char: str) -> Optional[str]:
+    """1文字の文字種（範囲表にない文字はNone）"""
+    codepoint = ord(char)
+    index = bisect_right(_STARTS, codepoint) - 1
+    if index >= 0 and codepoint <= _ENDS[index]:
+        return _SCRIPTS[index]
+    return None
+
+
+def count_scripts(
+    text: str, max_letters: Optional[int] = DEFAULT_MAX_LETTERS
+) -> dict[str, int]:
+    """文字種ごとの文字数と、ラテン文字の単語数（"latin_words"）を数えます。
+
+    数えた文字がmax_letters個に達したチャンクで打ち切ります（Noneは全体を走査）。
+    """
+    counts: Counter = Counter()
+    latin_words = 0
+    letters = 0
+    for offset in range(0, len(text), CHUNK_SIZE):
+        translated = text[offset : offset + CHUNK_SIZE].translate(_BMP_TABLE)
+        chunk_counts = Counter(translated)
+        del chunk_counts[_OTHER]
+        for char, count in chunk_counts.items():
+            script = _SCRIPT_OF_CODE.get(char) or script_of(char)
+            if script is not None:
+                counts[script] += count
+                letters += count
+        if chunk_counts.get(_CODES[LATIN]):
+            latin_words += len(_LATIN_WORD.findall(translated))
+        if max_letters is not None and letters >= max_letters:
+            break
+    return {script: counts[script] for script in _CODES} | {"latin_words": latin_words}
+
+
+def count_scripts_batch(
+    texts: Sequence[str], max_letters: Optional[int] = DEFAULT_MAX_LETTERS
+) -> list[dict[str, int]]:
+    """複数テキストの count_scripts() の結果を入力順に返します。
+
+    各テキストの先頭の CHUNK_SIZE 文字を連結して1回で変換し、続きが必要な長い
+    テキスト（max_letters に達していないもの）だけ残りを count_scripts() で数えます。
+    """
+    heads = [text[:CHUNK_SIZE] for text in texts]
+    translated = _SEPARATOR.join(heads).translate(_BMP_TABLE)
+    results = []
+    start = 0
+    for text, head in zip(texts, heads):
+        end = start + len(head)
+        counts = {
+            script: translated.count(code, start, end)
+            for script, code in _CODES.items()
+        }
+        for char in _UNMAPPED.findall(translated, start, end):
+            script = script_of(char)
+            if script is not None:
+                counts[script] += 1
+        counts["latin_words"] = len(_LATIN_WORD.findall(translated, start, end))
+        letters = sum(counts[script] for script in _CODES)
+        if len(text) > CHUNK_SIZE and (max_letters is None or letters < max_letters):
+            rest = count_scripts(
+                text[CHUNK_SIZE:],
+                None if max_letters is None else max_letters - letters,
+            )
+            counts = {key: counts[key] + rest[key] for key in counts}
+        results.append(counts)
+        start = end + len(_SEPARATOR)
+    return results
+
+
+def _language(counts: dict[str, int]) -> str:
+    kana = counts[HIRAGANA] + counts[KATAKANA]
+    votes = {
+        "en": counts["latin_words"] * LATIN_WORD_WEIGHT,
+        "ko": counts[HANGUL],
+        # 漢字はかながあれば日本語、なければ中国語として数える
+        "ja": kana + counts[HAN] if kana else 0,
+        "zh": 0 if kana else counts[HAN],
+    }
+    ranked = sorted(votes.items(), key=lambda item: item[1], reverse=True)
+    if ranked[0][1] == 0:
+        return "unknown"
+    if ranked[1][1] >= ranked[0][1] * MIXED_RATIO:
+        return "mixed"
+    return ranked[0][0]
+
+
+def detect_language(text: str, max_letters: Optional[int] = DEFAULT_MAX_LETTERS) -> str:
+    """テキストの言語（ja / zh / ko / en / mixed / unknown）を推定します。"""
+    return _language(count_scripts(text, max_letters))
+
+
+def detect_languages(
+    texts: Sequence[str], max_letters: Optional[int] = DEFAULT_MAX_LETTERS
+) -> list[str]:
+    """複数テキストの言語を入力順に推定します（detect_language() と同じ結果）。"""
+    return [_language(counts) for counts in count_scripts_batch(texts, max_letters)]
@@ -0,0 +1,89 @@
+"""サービス層の_impl関数の遅延import
+
+生成されたルーターは `lazy_impl()` 経由でサービス関数を参照します。
+`settings.lazy_service_imports` が有効な場合は、エンドポイントの初回呼び出し時
+（またはウォームアップ時）に初めてサービスモジュールをimportします。
+無効な場合はその場でimportし、実際の関数をそのまま返します（従来と同じ動作）。
+"""
+
+import importlib
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+
+
+class LazyImpl:
+    """初回呼び出し時にサービス関数を解決するプロキシ"""
+
+    __slots__ = ("module_path", "attr", "_func", "_lock")
+
+    def __init__(self, module_path: str, attr: str):
+        self.module_path = module_path
+        self.attr = attr
+        self._func: Optional[Callable[..., Any]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def resolved(self) -> bool:
+        return self._func is not None
+
+    def resolve(self) -> Callable[..., Any]:
+        """サービス関数をimportして返します（2回目以降はキャッシュを返す）。"""
+        func = self._func
+        if func is None:
+            with self._lock:
+                if self._func is None:
+                    module = importlib.import_module(self.module_path)
+                    self._func = getattr(module, self.attr)
+                func = self._func
+        return func
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        # async関数の場合はコルーチンが返り、呼び出し側でawaitされる
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        state = "resolved" if self.resolved else "pending"
+        return f"<LazyImpl {self.module_path}.{self.attr} ({state})>"
+
+
+# 生成ルーターが登録した遅延プロキシ（ウォームアップ用）
+_registry: list[LazyImpl] = []
+
+
+def lazy_impl(module_path: str, attr: str) -> Callable[..., Any]:
+    """サービス関数への参照を作成します。
+
+    遅延モードではLazyImplを、そうでなければimport済みの関数を返します。
+    """
+    if not settings.lazy_service_imports:
+        return getattr(importlib.import_module(module_path), attr)
+    proxy = LazyImpl(module_path, attr)
+    _registry.append(proxy)
+    return proxy
+
+
+def pending_modules() -> list[str]:
+    """まだimportされていないサービスモジュールの一覧を返します。"""
+    return sorted({p.module_path for p in _registry if not p.resolved})
+
+
+def warm_up(modules: Optional[list[str]] = None) -> dict[str, float]:
+    """遅延プロキシを事前に解決します（readiness前のウォームアップ用）。
+
+    modulesを指定した場合は、そのモジュール（例: "app.services.health"）のみ解決します。
+    戻り値はモジュールごとのimport時間（秒）です。
+    """
+    timings: dict[str, float] = {}
+    for proxy in _registry:
+        if proxy.resolved:
+            continue
+        if modules is not None and proxy.module_path not in modules:
+            continue
+        started_at = time.perf_counter()
+        proxy.resolve()
+        elapsed = time.perf_counter() - started_at
+        timings[proxy.module_path] = timings.get(proxy.module_path, 0.0) + elapsed
+    return timings
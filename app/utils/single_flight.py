@@ -0,0 +1,125 @@
+"""同じキーの同時の呼び出しを1回の実行にまとめる（single-flight）
+
+キー（操作と正規化したリクエスト）ごとに実行中のタスクを1つだけ持ち、同じキーで
+後から来た呼び出しは新たに実行せず、そのタスクの結果（または例外）を待ちます。
+タスクは呼び出し元から独立して実行し、各呼び出し元は asyncio.shield() で待つため、
+1つの呼び出し元のキャンセル（クライアントの切断など）は実行中のタスクや
+ほかの呼び出し元に影響しません。全員がキャンセルしてもタスクは最後まで実行されます。
+
+使い方:
+    flights = SingleFlight()
+    value, shared = await flights.do(("weather", city), lambda: fetch(city))
+
+    @single_flight()
+    async def get_weather_impl(request: WeatherRequest) -> WeatherResponse: ...
+
+イベントループ内（単一スレッド）から使用することを前提としています。
+"""
+
+import asyncio
+import functools
+from collections.abc import Awaitable, Hashable
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+from pydantic import BaseModel
+
+V = TypeVar("V")
+
+
+class SingleFlight(Generic[V]):
+    """キーごとに実行中のタスクを1つだけ持ち、同時の呼び出しで共有します。"""
+
+    def __init__(self):
+        self._in_flight: dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.shared = 0
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._in_flight
+
+    def start(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[V]],
+        on_done: Optional[Callable[[asyncio.Future], None]] = None,
+    ) -> asyncio.Future:
+        """keyのタスクを返します（実行中でなければfn()を開始）。
+
+        on_doneはタスクの完了時、実行中の登録を外すのと同時に1回だけ呼ばれます
+        （結果の保存など。次の呼び出しとの間に隙間ができない）。
+        """
+        task = self._in_flight.get(key)
+        if task is not None:
+            return task
+        self.calls += 1
+        task = asyncio.ensure_future(fn())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda done: self._finish(key, done, on_done))
+        return task
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[V]]) -> tuple[V, bool]:
+        """fn()の結果を返します。戻り値は (値, 実行中の呼び出しを共有したか) です。"""
+        shared = key in self._in_flight
+        if shared:
+            self.shared += 1
+        # 待っている呼び出し元がキャンセルされても実行自体は続ける
+        return await asyncio.shield(self.start(key, fn)), shared
+
+    def stats(self) -> dict[str, int]:
+        return {"in_flight": len(self), "calls": self.calls, "shared": self.shared}
+
+    def _finish(
+        self,
+        key: Hashable,
+        task: asyncio.Future,
+        on_done: Optional[Callable[[asyncio.Future], None]],
+    ) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if on_done is not None:
+            on_done(task)
+        elif not task.cancelled():
+            task.exception()  # 待つ呼び出し元がいなくても例外を取得済みにする
+
+
+def request_key(*args: Any, **kwargs: Any) -> Hashable:
+    """引数からキーを作ります（pydanticモデルはJSONに正規化）。"""
+
+    def normalize(value: Any) -> Hashable:
+        if isinstance(value, BaseModel):
+            return value.model_dump_json()
+        return value
+
+    return (
+        tuple(map(normalize, args)),
+        tuple(sorted((name, normalize(value)) for name, value in kwargs.items())),
+    )
+
+
+def single_flight(
+    key: Callable[..., Hashable] = request_key,
+) -> Callable[[Callable[..., Awaitable[V]]], Callable[..., Awaitable[V]]]:
+    """async関数の同じ引数での同時呼び出しを1回の実行にまとめるデコレーター
+
+    キーは (関数名, key(*args, **kwargs)) です。keyに正規化関数を渡すと、
+    表記揺れのあるリクエストも同じ実行にまとめられます。
+    """
+
+    def decorate(func: Callable[..., Awaitable[V]]) -> Callable[..., Awaitable[V]]:
+        flights: SingleFlight[V] = SingleFlight()
+        operation = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> V:
+            value, _ = await flights.do(
+                (operation, key(*args, **kwargs)), lambda: func(*args, **kwargs)
+            )
+            return value
+
+        wrapper.flights = flights  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorate
@@ -0,0 +1,193 @@
+"""LRU + TTL のインメモリキャッシュ
+
+エントリ数とバイト数の両方に上限を持ち、上限を超えた場合は最も長く使われていない
+エントリから追い出します。有効期限（TTL）を過ぎたエントリは参照時に破棄します。
+同じキーの計算が実行中の場合は、新たに計算せず実行中の結果を待ちます
+（スタンピード防止、app.utils.single_flight）。
+stale_ttl を指定すると、TTLを過ぎてからさらにstale_ttl秒の間は古い値をすぐに返し、
+裏で1回だけ再計算して置き換えます（stale-while-revalidate）。
+
+イベントループ内（単一スレッド）から使用することを前提としています。
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Hashable
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+from app.utils.single_flight import SingleFlight
+
+V = TypeVar("V")
+
+# get_or_compute()が返す取得元
+HIT = "hit"
+MISS = "miss"
+COALESCED = "coalesced"
+STALE = "stale"
+
+
+@dataclass
+class _Entry(Generic[V]):
+    value: V
+    expires_at: float
+    # この時刻までは古い値として返せる（stale_ttlが0ならexpires_atと同じ）
+    stale_until: float
+    size: int
+
+
+class TTLCache(Generic[V]):
+    """エントリ数・バイト数の上限とTTLを持つLRUキャッシュ"""
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        max_bytes: int,
+        ttl: float,
+        sizeof: Callable[[V], int] = lambda value: 1,
+        clock: Callable[[], float] = time.monotonic,
+        stale_ttl: float = 0.0,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.sizeof = sizeof
+        self.clock = clock
+        self._entries: OrderedDict[Hashable, _Entry[V]] = OrderedDict()
+        self._flights: SingleFlight[V] = SingleFlight()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.stale = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.evictions = 0
+        self.expirations = 0
+        _registry[name] = self
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """有効なエントリを返します（なければNone）。ヒット・ミスを記録します。"""
+        entry = self._lookup(key)
+        if entry is None or entry.expires_at <= self.clock():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry.value
+
+    def set(self, key: Hashable, value: V) -> None:
+        """値を保存し、上限を超えた分を古い順に追い出します。"""
+        size = self.sizeof(value)
+        if key in self._entries:
+            self._remove(key)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        expires_at = self.clock() + self.ttl
+        self._entries[key] = _Entry(
+            value, expires_at, expires_at + self.stale_ttl, size
+        )
+        self.bytes += size
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    async def get_or_compute(
+        self, key: Hashable, compute: Callable[[], Awaitable[V]]
+    ) -> tuple[V, str]:
+        """キャッシュの値を返し、なければ計算して保存します。
+
+        戻り値は (値, 取得元) で、取得元は "hit" / "miss" / "coalesced"
+        （実行中の同じ計算の結果を共有した）/ "stale"（TTLを過ぎた値を返し、
+        裏で再計算を始めた）のいずれかです。
+        計算が例外で終わった場合は保存せず、待っていた全員に同じ例外を送出します
+        （裏での再計算の失敗は古い値をそのまま残し、refresh_failuresに数えます）。
+        """
+        entry = self._lookup(key)
+        if entry is not None:
+            if entry.expires_at > self.clock():
+                self.hits += 1
+                return entry.value, HIT
+            self.stale += 1
+            if key not in self._flights:
+                self.refreshes += 1
+                self._start(key, compute)
+            return entry.value, STALE
+        self.misses += 1
+
+        source = MISS
+        if key in self._flights:
+            self.coalesced += 1
+            source = COALESCED
+        # 待っている呼び出し元がキャンセルされても計算自体は続ける
+        return await asyncio.shield(self._start(key, compute)), source
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        """ヒット・ミスなどの統計情報"""
+        lookups = self.hits + self.stale + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "stale": self.stale,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            # 古い値を返した分もヒットに含める
+            "hit_rate": (self.hits + self.stale) / lookups if lookups else 0.0,
+        }
+
+    def _lookup(self, key: Hashable) -> Optional[_Entry[V]]:
+        """古い値として返せる期間を含め、期限内のエントリ（LRUの順序を更新）"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.stale_until <= self.clock():
+            self._remove(key)
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _start(
+        self, key: Hashable, compute: Callable[[], Awaitable[V]]
+    ) -> asyncio.Future:
+        """実行中の計算を返します（なければ開始し、完了時に_finishで保存）。"""
+        return self._flights.start(key, compute, lambda done: self._finish(key, done))
+
+    def _finish(self, key: Hashable, task: asyncio.Future) -> None:
+        """計算の完了時（実行中の登録を外すのと同時）に、成功していれば保存します。"""
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            if key in self._entries:
+                self.refresh_failures += 1
+            return
+        self.set(key, task.result())
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self.bytes -= entry.size
+
+
+# 作成されたキャッシュ（名前 -> キャッシュ）。ヘルスチェックで統計を公開する
+_registry: dict[str, TTLCache] = {}
+
+
+def cache_stats() -> dict[str, dict[str, Any]]:
+    """作成済みの全キャッシュの統計情報を返します。"""
+    return {name: cache.stats() for name, cache in _registry.items()}
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# bench_external_cache.py
+"""
+外部データの応答キャッシュのレイテンシベンチマーク
+
+少数の人気都市に偏った天気リクエストを送り、キャッシュなし（毎回上流を呼ぶ）と
+キャッシュあり（stale-while-revalidate）のレイテンシ（p50 / p99）を比較します。
+上流は組み込みのモック（1回あたり約100ミリ秒の遅延）を使うため、ネットワークは不要です。
+
+使い方: python3 benchmarks/bench_external_cache.py [--requests 200] [--cities 5]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.generated.generated_models import WeatherRequest  # noqa: E402
+from app.services.external import cache  # noqa: E402
+from app.services.external.providers import fetch_weather  # noqa: E402
+
+CITIES = ["Tokyo", "Osaka", "Kyoto", "Sapporo", "Fukuoka", "Nagoya", "Sendai"]
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """最近傍法によるパーセンタイル"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_load(fetch, requests: list[WeatherRequest]) -> dict[str, float]:
+    """リクエストを順に送り、1件ごとのレイテンシを集計します。"""
+    latencies: list[float] = []
+    for request in requests:
+        started_at = time.perf_counter()
+        await fetch(request)
+        latencies.append(time.perf_counter() - started_at)
+    return {"p50": percentile(latencies, 0.50), "p99": percentile(latencies, 0.99)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="外部データの応答キャッシュベンチマーク"
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--cities", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cities = CITIES[: args.cities]
+    # 先頭の都市ほど多く選ばれる（人気都市に偏ったアクセス）
+    weights = [1 / (rank + 1) for rank in range(len(cities))]
+    requests = [
+        WeatherRequest(city=city)
+        for city in rng.choices(cities, weights=weights, k=args.requests)
+    ]
+
+    print(f"📊 天気リクエスト{args.requests}件（{len(cities)}都市）")
+    for label, fetch in (
+        ("キャッシュなし", fetch_weather),
+        ("キャッシュあり", cache.get_weather),
+    ):
+        result = asyncio.run(run_load(fetch, requests))
+        print(
+            f"  {label}: p50 {result['p50'] * 1e6:,.1f}µs"
+            f" / p99 {result['p99'] * 1e6:,.1f}µs"
+        )
+    stats = cache.get_cache("weather").stats()
+    print(f"  ヒット率: {stats['hit_rate']:.1%}（ミス{stats['misses']}件）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
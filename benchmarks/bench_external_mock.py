@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# bench_external_mock.py
+"""
+モックの上流を使った外部データのエンドポイントの負荷ベンチマーク
+
+キャッシュを無効にして、アプリ（ASGI）にリクエストを同時に送り、モックの応答時間の
+指定（既定の固定の待ち時間・none・lognormal）ごとのスループットとレイテンシ
+（p50 / p99）を比較します。none では自分たちのサーバーの処理だけを測れます。
+
+使い方: python3 benchmarks/bench_external_mock.py [--requests 2000] [--concurrency 50]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import settings  # noqa: E402
+from app.services.external import mock  # noqa: E402
+from main import app  # noqa: E402
+
+LATENCIES = [None, "lognormal:5:50", "none"]
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """最近傍法によるパーセンタイル"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_load(requests: int, concurrency: int) -> dict[str, float]:
+    """名言・天気のリクエストを同時に送り、スループットとレイテンシを集計します。"""
+    latencies: list[float] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+
+        async def send(index: int) -> None:
+            started_at = time.perf_counter()
+            if index % 2:
+                response = await client.get("/api/v1/external/quote")
+            else:
+                response = await client.post(
+                    "/api/v1/external/weather", json={"city": "Tokyo"}
+                )
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - started_at)
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def limited(index: int) -> None:
+            async with semaphore:
+                await send(index)
+
+        started_at = time.perf_counter()
+        await asyncio.gather(*(limited(index) for index in range(requests)))
+        elapsed = time.perf_counter() - started_at
+    return {
+        "rps": requests / elapsed,
+        "p50": percentile(latencies, 0.50),
+        "p99": percentile(latencies, 0.99),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="モックの上流の負荷ベンチマーク")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # 毎回モックの上流まで届くようにキャッシュを無効にする
+    settings.external_cache_enabled = False
+    settings.external_mock_seed = args.seed
+    print(f"📊 リクエスト{args.requests}件（同時{args.concurrency}件）")
+    for latency in LATENCIES:
+        settings.external_mock_latency = latency
+        mock._mock = None
+        result = asyncio.run(run_load(args.requests, args.concurrency))
+        print(
+            f"  {latency or '既定（固定100/50ms）'}: {result['rps']:,.0f}件/秒"
+            f" / p50 {result['p50'] * 1e3:,.2f}ms / p99 {result['p99'] * 1e3:,.2f}ms"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# bench_script_detection.py
+"""
+文字種（スクリプト）による言語推定のマイクロベンチマーク
+
+日本語・英語・中国語・韓国語の文を混ぜた1KB〜1MBのコーパスで、以下を比較します。
+1. 正規表現の連鎖（文字種ごとに全体を走査して数える従来の方式）
+2. 範囲表による1回の走査（全体を走査）
+3. 範囲表による1回の走査（max_letters個で打ち切り、エンドポイントの既定）
+
+使い方: python3 benchmarks/bench_script_detection.py [--repeat 5]
+"""
+
+import argparse
+import re
+import sys
+import time
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.text import script_detection  # noqa: E402
+
+SENTENCES = {
+    "ja": "今日はとても良い天気なので、公園でコーヒーを飲みました。",
+    "en": "The quick brown fox jumps over the lazy dog near the river. ",
+    "zh": "我们今天在公园里散步，天气非常好。",
+    "ko": "오늘은 날씨가 정말 좋아서 공원에서 산책했습니다. ",
+}
+# コーパス名 -> 文の並び（繰り返して目標サイズにする）
+CORPORA = {
+    "ja主体": ["ja", "ja", "ja", "en"],
+    "en主体": ["en", "en", "en", "ja"],
+    "4言語混在": ["ja", "en", "zh", "ko"],
+}
+SIZES = {"1KB": 1 << 10, "10KB": 10 << 10, "100KB": 100 << 10, "1MB": 1 << 20}
+
+# 従来方式: 文字種ごとの正規表現で全体を走査する
+REGEX_CHAIN = {
+    "latin": re.compile(r"[A-Za-z]"),
+    "kana": re.compile(r"[\u3040-\u30ff]"),
+    "han": re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff]"),
+    "hangul": re.compile(r"[\uac00-\ud7af]"),
+}
+
+
+def regex_chain_counts(text: str) -> dict[str, int]:
+    return {name: len(pattern.findall(text)) for name, pattern in REGEX_CHAIN.items()}
+
+
+def build_corpus(order: list[str], target_bytes: int) -> str:
+    """文を繰り返して、UTF-8で目標バイト数程度のテキストを作成します。"""
+    parts: list[str] = []
+    size = 0
+    while size < target_bytes:
+        for language in order:
+            sentence = SENTENCES[language]
+            parts.append(sentence)
+            size += len(sentence.encode("utf-8"))
+    return "".join(parts)
+
+
+def measure(func, repeat: int) -> float:
+    """関数をrepeat回実行し、最良の実行時間（秒）を返します。"""
+    best = float("inf")
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started_at)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="言語推定のマイクロベンチマーク")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(
+        f"{'コーパス':<12}{'サイズ':>8}{'推定':>8}"
+        f"{'正規表現(ms)':>14}{'範囲表・全体(ms)':>18}{'範囲表・打切(ms)':>18}"
+    )
+    for corpus_name, order in CORPORA.items():
+        for size_name, target_bytes in SIZES.items():
+            text = build_corpus(order, target_bytes)
+            regex_time = measure(partial(regex_chain_counts, text), args.repeat)
+            full_time = measure(
+                partial(script_detection.detect_language, text, max_letters=None),
+                args.repeat,
+            )
+            early_time = measure(
+                partial(script_detection.detect_language, text), args.repeat
+            )
+            language = script_detection.detect_language(text)
+            print(
+                f"{corpus_name:<12}{size_name:>8}{language:>8}"
+                f"{regex_time * 1000:>14.3f}{full_time * 1000:>18.3f}"
+                f"{early_time * 1000:>18.3f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# bench_spec_loading.py
+"""
+OpenAPI YAML読み込みのベンチマーク
+
+約5MBの合成スペックを作成し、以下の読み込み時間を比較します。
+1. 純Pythonローダー（yaml.SafeLoader）
+2. libyamlのCローダー（yaml.CSafeLoader）
+3. 解析結果キャッシュのヒット時（pickle）
+
+使い方: python3 benchmarks/bench_spec_loading.py [--size-mb 5] [--repeat 3]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import spec_loader  # noqa: E402
+
+
+def build_synthetic_spec(target_bytes: int) -> str:
+    """指定サイズ程度の、例示データを多く含む合成OpenAPI仕様を作成します。"""
+    lines = [
+        "openapi: 3.1.0",
+        "info:",
+        "  title: synthetic",
+        "  version: 1.0.0",
+        "paths:",
+    ]
+    size = sum(len(line) + 1 for line in lines)
+    index = 0
+    while size < target_bytes:
+        block = [
+            f"  /api/v1/resource{index}/items:",
+            "    post:",
+            "      tags: [synthetic]",
+            f"      summary: 合成オペレーション{index}",
+            f"      operationId: create_resource{index}_item",
+            "      requestBody:",
+            "        content:",
+            "          application/json:",
+            "            schema:",
+            f'              $ref: "#/components/schemas/Resource{index}"',
+            "            example:",
+            f'              name: "サンプル{index}"',
+            "              tags: [alpha, beta, gamma, delta]",
+            "              nested:",
+            "                values: [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]",
+            "                description: 例示データを多く含む長めの説明文です。",
+            "      responses:",
+            '        "200":',
+            "          description: OK",
+        ]
+        lines.extend(block)
+        size += sum(len(line.encode("utf-8")) + 1 for line in block)
+        index += 1
+    return "\n".join(lines) + "\n"
+
+
+def measure(func, repeat: int) -> float:
+    """関数をrepeat回実行し、最良の実行時間（秒）を返します。"""
+    best = float("inf")
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started_at)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="OpenAPI YAML読み込みベンチマーク")
+    parser.add_argument("--size-mb", type=float, default=5.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        spec_path = tmp_dir / "openapi.yaml"
+        cache_dir = tmp_dir / "cache"
+        spec_path.write_text(
+            build_synthetic_spec(int(args.size_mb * 1024 * 1024)), encoding="utf-8"
+        )
+        data = spec_path.read_bytes()
+        print(f"📄 合成スペック: {len(data) / 1024 / 1024:.1f} MB")
+
+        results = {
+            "純Python (SafeLoader)": measure(
+                lambda: yaml.load(data, Loader=yaml.SafeLoader), args.repeat
+            ),
+        }
+        if hasattr(yaml, "CSafeLoader"):
+            results["Cローダー (CSafeLoader)"] = measure(
+                lambda: yaml.load(data, Loader=yaml.CSafeLoader), args.repeat
+            )
+        else:
+            print("⚠️  libyamlが利用できないためCローダーの計測をスキップします")
+
+        # キャッシュを作成してからヒット時間を計測
+        spec_loader.load_openapi_spec(spec_path, cache_dir=cache_dir)
+        results["キャッシュヒット (pickle)"] = measure(
+            lambda: spec_loader.load_openapi_spec(spec_path, cache_dir=cache_dir),
+            args.repeat,
+        )
+
+    baseline = results["純Python (SafeLoader)"]
+    print()
+    print(f"{'ローダー':<28}{'時間(秒)':>10}{'倍率':>10}")
+    for name, elapsed in results.items():
+        print(f"{name:<28}{elapsed:>10.3f}{baseline / elapsed:>9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
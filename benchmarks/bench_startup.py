@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# bench_startup.py
+"""
+アプリケーション起動時間のベンチマーク
+
+`python -X importtime` で `main` のimport
+（モジュール末尾の create_application() を含む）を新しいプロセスで計測し、
+サービス層を即時importする場合と遅延importする場合を比較します。
+遅延モードのコールドスタートが予算（--budget-ms）を超えた場合は終了コード1を返します。
+
+使い方: python3 benchmarks/bench_startup.py [--repeat 5] [--budget-ms 1500] [--top 10]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# 子プロセスで実行する計測コード（importの前にperf_counterを取る）
+PROBE = """
+import json, sys, time
+started_at = time.perf_counter()
+import main
+imported_at = time.perf_counter()
+main.create_application()
+created_at = time.perf_counter()
+print(json.dumps({
+    "cold_start": imported_at - started_at,
+    "create_application": created_at - imported_at,
+    "service_modules": sorted(m for m in sys.modules if m.startswith("app.services")),
+}))
+"""
+
+MODES = {"即時import": "false", "遅延import": "true"}
+
+
+def parse_importtime(stderr: str) -> list[tuple[int, str]]:
+    """-X importtimeの出力から (累積マイクロ秒, モジュール名) の一覧を返します。"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        # 区切りの後の空白1つを除いた残りのインデントがimportの入れ子の深さ
+        entries.append((int(cumulative_us), name[1:].rstrip()))
+    return entries
+
+
+def run_probe(lazy: str) -> tuple[dict, list[tuple[int, str]]]:
+    """新しいインタプリタで起動時間を1回計測します。"""
+    env = dict(os.environ, LAZY_SERVICE_IMPORTS=lazy, WARM_UP_SERVICES="[]")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    return result, parse_importtime(completed.stderr)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="アプリケーション起動時間ベンチマーク")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=1500.0,
+        help="遅延importモードのコールドスタート予算（ミリ秒）",
+    )
+    parser.add_argument("--top", type=int, default=10, help="表示する遅いimportの数")
+    args = parser.parse_args()
+
+    best: dict[str, dict] = {}
+    slowest: dict[str, list[tuple[int, str]]] = {}
+    for mode, lazy in MODES.items():
+        for _ in range(args.repeat):
+            result, imports = run_probe(lazy)
+            if mode not in best or result["cold_start"] < best[mode]["cold_start"]:
+                best[mode] = result
+                slowest[mode] = imports
+
+    print(f"{'モード':<12}{'コールドスタート(ms)':>20}{'create_application(ms)':>24}")
+    for mode, result in best.items():
+        print(
+            f"{mode:<12}{result['cold_start'] * 1000:>20.1f}"
+            f"{result['create_application'] * 1000:>24.1f}"
+        )
+
+    for mode, result in best.items():
+        print()
+        service_count = len(result["service_modules"])
+        print(f"📦 {mode}: 読み込まれたサービスモジュール {service_count}件")
+        # mainが直接importしているモジュール（入れ子の深さ1）の累積時間
+        direct = [
+            (cumulative_us, name.strip())
+            for cumulative_us, name in slowest[mode]
+            if name.startswith("  ") and not name.startswith("    ")
+        ]
+        for cumulative_us, name in sorted(direct, reverse=True)[: args.top]:
+            print(f"  {cumulative_us / 1000:>8.1f} ms  {name}")
+
+    lazy_cold_start_ms = best["遅延import"]["cold_start"] * 1000
+    print()
+    if lazy_cold_start_ms > args.budget_ms:
+        print(
+            f"❌ 遅延importモードの起動時間 {lazy_cold_start_ms:.1f} ms が"
+            f"予算 {args.budget_ms:.0f} ms を超えています"
+        )
+        return 1
+    print(
+        f"✅ 起動時間 {lazy_cold_start_ms:.1f} ms（予算 {args.budget_ms:.0f} ms 以内）"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# bench_text_batching.py
+"""
+テキスト生成のマイクロバッチング負荷ベンチマーク
+
+同時に多数の生成リクエストを送り、バッチングなし（1件ずつ推論）と
+BatchSchedulerによるバッチングありのスループット（tokens/sec）と
+レイテンシ（p50 / p99）を比較します。
+既定ではネットワーク不要のランダム初期化モデル（tiny-random）を使用します。
+
+使い方: python3 benchmarks/bench_text_batching.py [--requests 64] [--concurrency 32]
+        [--max-length 32] [--batch-size 8] [--wait-ms 10] [--model tiny-random]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.generated.generated_models import GenerateTextRequest  # noqa: E402
+from app.services.text import generation  # noqa: E402
+from app.services.text.backends import TransformersBackend  # noqa: E402
+from app.services.text.batching import BatchScheduler  # noqa: E402
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """最近傍法によるパーセンタイル"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_load(
+    backend: TransformersBackend,
+    scheduler: Optional[BatchScheduler],
+    requests: list[GenerateTextRequest],
+    concurrency: int,
+) -> dict[str, float]:
+    """同時実行数を制限してリクエストを送り、スループットとレイテンシを集計します。"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    tokens = 0
+
+    async def send(request: GenerateTextRequest) -> None:
+        nonlocal tokens
+        async with semaphore:
+            started_at = time.perf_counter()
+            response = await generation.generate_text(
+                request, backend=backend, scheduler=scheduler
+            )
+            latencies.append(time.perf_counter() - started_at)
+            tokens += response.metadata["token_count"]
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(send(request) for request in requests))
+    elapsed = time.perf_counter() - started_at
+    return {
+        "tokens_per_sec": tokens / elapsed,
+        "p50": percentile(latencies, 0.50),
+        "p99": percentile(latencies, 0.99),
+        "elapsed": elapsed,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="テキスト生成バッチングベンチマーク")
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--max-length", type=int, default=32)
+    parser.add_argument("--temperature", type=float, default=0.0)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--wait-ms", type=float, default=10.0)
+    parser.add_argument("--model", default="tiny-random")
+    args = parser.parse_args()
+
+    backend = TransformersBackend(args.model)
+    backend.warm_up()
+    requests = [
+        GenerateTextRequest(
+            prompt=f"リクエスト{index}: 今日の天気は",
+            max_length=args.max_length,
+            temperature=args.temperature,
+        )
+        for index in range(args.requests)
+    ]
+    scheduler = BatchScheduler(
+        backend,
+        generation.run_in_executor,
+        max_batch_size=args.batch_size,
+        max_wait_ms=args.wait_ms,
+        max_queue_size=args.requests,
+    )
+
+    results = {
+        "バッチングなし": asyncio.run(
+            run_load(backend, None, requests, args.concurrency)
+        ),
+        "バッチングあり": asyncio.run(
+            run_load(backend, scheduler, requests, args.concurrency)
+        ),
+    }
+
+    print(
+        f"📊 {args.requests}件 / 同時{args.concurrency}件 / "
+        f"max_length={args.max_length} / モデル {args.model}"
+    )
+    print(f"{'モード':<12}{'tokens/sec':>12}{'p50(ms)':>10}{'p99(ms)':>10}")
+    for mode, result in results.items():
+        print(
+            f"{mode:<12}{result['tokens_per_sec']:>12.1f}"
+            f"{result['p50'] * 1000:>10.1f}{result['p99'] * 1000:>10.1f}"
+        )
+    speedup = (
+        results["バッチングあり"]["tokens_per_sec"]
+        / results["バッチングなし"]["tokens_per_sec"]
+    )
+    print(f"\n🚀 スループット: {speedup:.2f}倍")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
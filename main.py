@@ -9,31 +9,94 @@ This application provides:
 - Client-side type generation support
 """
 
+import asyncio
+from contextlib import asynccontextmanager
+from functools import cache
+from pathlib import Path
+from typing import Optional
+
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.openapi.docs import (
+    get_redoc_html,
+    get_swagger_ui_html,
+    get_swagger_ui_oauth2_redirect_html,
+)
 from fastapi.openapi.utils import get_openapi
 from fastapi.responses import HTMLResponse
 
 from app.core.config import settings
+from app.core.openapi_document import OpenAPIDocument
+from app.core.precompressed import PrecompressedAsset
 from app.generated.generated_models import GenerateTextRequest, GenerateTextResponse
 from app.generated.generated_router import legacy_router
 from app.generated.generated_router import main_router as api_router
-from app.services.legacy.text_service import TextService
+from app.utils import lazy_import
 
+PROJECT_ROOT = Path(__file__).resolve().parent
+OPENAPI_URL = "/openapi.json"
+SWAGGER_OAUTH2_REDIRECT_URL = "/docs/oauth2-redirect"
+PRERENDERED_DOCS = {"/docs": "swagger.html", "/redoc": "redoc.html"}
 
-def create_custom_openapi(app: FastAPI):
-    """カスタムOpenAPIスキーマを作成します。"""
-    if app.openapi_schema:
-        return app.openapi_schema
 
-    openapi_schema = get_openapi(
-        title=settings.app_name,
-        version=settings.version,
-        description=settings.description,
-        routes=app.routes,
-    )
+def static_cache_control() -> str:
+    """事前描画ページのCache-Controlヘッダー値を返します。"""
+    if settings.serve_prerendered_docs:
+        return f"public, max-age={settings.static_cache_max_age}"
+    return "no-cache"
+
 
+@cache
+def load_prerendered_doc(filename: str) -> Optional[PrecompressedAsset]:
+    """generate_docs.pyが描画したHTMLを読み込み、圧縮済みアセットとして保持します。"""
+    path = PROJECT_ROOT / settings.prerendered_docs_dir / filename
+    if not path.exists():
+        return None
+    return PrecompressedAsset.from_file(path, "text/html; charset=utf-8")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """起動時にサービスのimportやモデルの読み込みを行います（readiness前のウォームアップ）。"""
+    if settings.warm_up_services:
+        timings = await asyncio.to_thread(
+            lazy_import.warm_up, settings.warm_up_services
+        )
+        for module_path, elapsed in timings.items():
+            print(f"🔥 ウォームアップ: {module_path}（{elapsed:.3f}秒）")
+    if settings.text_warm_up and settings.text_backend != "rule_based":
+        # モデルの読み込みと初回生成をreadiness前に済ませる（推論用スレッドで実行）
+        from app.services.text import generation
+        from app.services.text.backends import InferenceServerError
+
+        try:
+            elapsed = await generation.warm_up()
+        except InferenceServerError as e:
+            # 推論サーバーが未起動でもAPIは起動する（生成リクエストは503を返す）
+            print(f"⚠️ テキスト生成のウォームアップをスキップしました: {e}")
+        else:
+            print(
+                f"🔥 テキスト生成モデル: {settings.text_model_name}（{elapsed:.3f}秒）"
+            )
+    # 上流の外部APIごとに共有するHTTPクライアント（接続プール）を作成する
+    from app.services.external import mock, upstream
+
+    for name, protocol in upstream.get_clients().stats().items():
+        print(f"🌐 外部API: {name}（{protocol}）")
+    # モックのデータ（EXTERNAL_MOCK_DATA_PATH）と応答時間の指定を起動時に検証する
+    mock.get_mock()
+    # OpenAPIドキュメントをリクエスト受付前にシリアライズ・圧縮しておく
+    await asyncio.to_thread(lambda: app.state.openapi_document.asset)
+    if settings.serve_prerendered_docs:
+        for filename in PRERENDERED_DOCS.values():
+            await asyncio.to_thread(load_prerendered_doc, filename)
+    yield
+    await upstream.close_clients()
+
+
+def customize_openapi_schema(openapi_schema: dict) -> dict:
+    """OpenAPIスキーマにロゴ・サーバー情報などのカスタム情報を追加します。"""
     # カスタム情報を追加
     openapi_schema["info"]["x-logo"] = {
         "url": "https://fastapi.tiangolo.com/img/logo-margin/logo-teal.png"
@@ -44,52 +107,29 @@ def create_custom_openapi(app: FastAPI):
         {"url": "http://localhost:8000", "description": "開発サーバー"},
         {"url": "https://api.example.com", "description": "本番サーバー"},
     ]
-
-    app.openapi_schema = openapi_schema
-    return app.openapi_schema
+    return openapi_schema
 
 
-def create_application() -> FastAPI:
-    """FastAPIアプリケーションを作成し設定します。"""
+def create_custom_openapi(app: FastAPI):
+    """カスタムOpenAPIスキーマを作成します。"""
+    if app.openapi_schema:
+        return app.openapi_schema
 
-    # FastAPIインスタンスを作成
-    app = FastAPI(
+    openapi_schema = get_openapi(
         title=settings.app_name,
         version=settings.version,
         description=settings.description,
-        debug=settings.debug,
-        docs_url="/docs",
-        redoc_url="/redoc",
-        openapi_url="/openapi.json",
-    )
-
-    # CORSミドルウェアを追加
-    app.add_middleware(
-        CORSMiddleware,
-        allow_origins=settings.cors_origins,
-        allow_credentials=settings.cors_allow_credentials,
-        allow_methods=settings.cors_allow_methods,
-        allow_headers=settings.cors_allow_headers,
+        routes=app.routes,
     )
 
-    # APIルーターを含める
-    app.include_router(api_router, prefix=settings.api_v1_prefix)
-
-    # Legacy router (no prefix for backward compatibility)
-    app.include_router(legacy_router)
-
-    # カスタムOpenAPIスキーマを設定
-    app.openapi = lambda: create_custom_openapi(app)
+    app.openapi_schema = customize_openapi_schema(openapi_schema)
+    return app.openapi_schema
 
-    # テキスト生成サービスのインスタンス
-    text_service = TextService()
 
-    # ルートエンドポイント
-    @app.get("/", response_class=HTMLResponse)
-    async def root():
-        """APIドキュメントリンク付きのルートエンドポイント。"""
-        return HTMLResponse(
-            content="""
+def render_root_page() -> str:
+    """APIドキュメントへのリンクを載せたルートページのHTMLを描画します。"""
+    return (
+        """
         <!DOCTYPE html>
         <html>
         <head>
@@ -122,11 +162,11 @@ def create_application() -> FastAPI:
                 <div class="header">
                     <h1>🚀 localLLM-FastAPI</h1>
                     <p class="version">バージョン """
-            + settings.version
-            + """</p>
+        + settings.version
+        + """</p>
                     <p>"""
-            + settings.description
-            + """</p>
+        + settings.description
+        + """</p>
                 </div>
                 <div class="links">
                     <a href="/docs" class="link-card">
@@ -150,8 +190,87 @@ def create_application() -> FastAPI:
         </body>
         </html>
         """
+    )
+
+
+def create_application() -> FastAPI:
+    """FastAPIアプリケーションを作成し設定します。"""
+
+    # FastAPIインスタンスを作成
+    # /openapi.json・/docs・/redocは事前シリアライズ版を下で登録する
+    app = FastAPI(
+        title=settings.app_name,
+        version=settings.version,
+        description=settings.description,
+        debug=settings.debug,
+        docs_url=None,
+        redoc_url=None,
+        openapi_url=None,
+        lifespan=lifespan,
+    )
+
+    # CORSミドルウェアを追加
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.cors_origins,
+        allow_credentials=settings.cors_allow_credentials,
+        allow_methods=settings.cors_allow_methods,
+        allow_headers=settings.cors_allow_headers,
+    )
+
+    # APIルーターを含める
+    app.include_router(api_router, prefix=settings.api_v1_prefix)
+
+    # Legacy router (no prefix for backward compatibility)
+    app.include_router(legacy_router)
+
+    # カスタムOpenAPIスキーマを設定
+    app.openapi = lambda: create_custom_openapi(app)
+    app.state.openapi_document = OpenAPIDocument(
+        app,
+        customize=customize_openapi_schema,
+        prebuilt_path=PROJECT_ROOT / settings.openapi_prebuilt_path,
+    )
+
+    @app.get(OPENAPI_URL, include_in_schema=False)
+    async def openapi_json(request: Request):
+        """事前シリアライズ・圧縮済みのOpenAPIスキーマ（ETag/304対応）"""
+        return app.state.openapi_document.asset.response(request)
+
+    @app.get("/docs", include_in_schema=False)
+    async def swagger_ui_html(request: Request):
+        if settings.serve_prerendered_docs:
+            prerendered = load_prerendered_doc(PRERENDERED_DOCS["/docs"])
+            if prerendered is not None:
+                return prerendered.response(request, static_cache_control())
+        return get_swagger_ui_html(
+            openapi_url=OPENAPI_URL,
+            title=f"{app.title} - Swagger UI",
+            oauth2_redirect_url=SWAGGER_OAUTH2_REDIRECT_URL,
         )
 
+    @app.get(SWAGGER_OAUTH2_REDIRECT_URL, include_in_schema=False)
+    async def swagger_ui_redirect():
+        return get_swagger_ui_oauth2_redirect_html()
+
+    @app.get("/redoc", include_in_schema=False)
+    async def redoc_html(request: Request):
+        if settings.serve_prerendered_docs:
+            prerendered = load_prerendered_doc(PRERENDERED_DOCS["/redoc"])
+            if prerendered is not None:
+                return prerendered.response(request, static_cache_control())
+        return get_redoc_html(openapi_url=OPENAPI_URL, title=f"{app.title} - ReDoc")
+
+    # ルートエンドポイント（HTMLは起動時に一度だけ描画・圧縮）
+    root_page = PrecompressedAsset.from_bytes(
+        render_root_page().encode("utf-8"), "text/html; charset=utf-8"
+    )
+
+    @app.get("/", response_class=HTMLResponse, include_in_schema=False)
+    async def root(request: Request):
+        """APIドキュメントリンク付きのルートエンドポイント。"""
+        return root_page.response(request, cache_control=static_cache_control())
+
     # 元の/generateエンドポイント（後方互換性のため）
     @app.post("/generate", response_model=GenerateTextResponse)
     async def generate_text_legacy(request: GenerateTextRequest):
@@ -161,13 +280,10 @@ def create_application() -> FastAPI:
         この機能は /api/v1/text/generate に移行されましたが、
         既存のクライアントとの互換性を保つために提供されています。
         """
+        from app.services.text.generation import generate_text
+
         try:
-            result = await text_service.generate_text(
-                prompt=request.prompt,
-                max_length=request.max_length or 50,
-                temperature=request.temperature or 1.0,
-            )
-            return result
+            return await generate_text(request)
         except Exception as e:
             raise HTTPException(
                 status_code=500, detail=f"テキスト生成に失敗しました: {str(e)}"
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# backend_sharding.py
+"""
+タグ単位に分割したバックエンドコードの生成
+
+モノリシックな generated_models.py / generated_router.py の代わりに、
+タグごとに以下のモジュールを生成します（generate_backend_code.py --shard-by-tag）。
+
+- app/generated/common_models.py   : 複数タグから参照される（または未使用の）スキーマ
+- app/generated/<tag>/models.py    : そのタグだけが参照するスキーマ
+- app/generated/<tag>/router.py    : そのタグのルーターとエンドポイント
+- app/generated/sharded_router.py  : 全タグのルーターを束ねるmain_router/legacy_router
+
+各シャードはプロセスプールで並列に描画し、内容が変わったファイルのみ書き込みます。
+個別のルーターをimportしても、他タグのモデルは読み込まれません。
+"""
+
+import json
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Optional
+
+import generate_backend_code as backend
+from generation_manifest import PROJECT_ROOT, hash_bytes, hash_file
+from schema_resolver import SchemaResolver
+
+GENERATED_DIR = "app/generated"
+GENERATED_PACKAGE = "app.generated"
+COMMON_MODELS_MODULE = "common_models"
+SHARD_MANIFEST_PATH = PROJECT_ROOT / ".cache" / "shard_manifest.json"
+
+HTTP_METHODS = ["get", "post", "put", "delete", "patch"]
+
+
+def operation_tag(operation: Mapping[str, Any]) -> str:
+    """エンドポイントが属するタグ（最初のタグ）を返します。"""
+    tags = operation.get("tags", [])
+    return tags[0] if tags else "default"
+
+
+def list_shard_tags(spec: Mapping[str, Any]) -> list[str]:
+    """シャードを作成するタグを、スペックのtags定義順で返します。"""
+    tags = [tag["name"] for tag in spec.get("tags", [])]
+    for methods in spec.get("paths", {}).values():
+        for method, operation in methods.items():
+            if method.lower() in HTTP_METHODS:
+                tag = operation_tag(operation)
+                if tag not in tags:
+                    tags.append(tag)
+    return tags
+
+
+def partition_schemas(
+    spec: Mapping[str, Any], resolver: SchemaResolver
+) -> tuple[list[str], dict[str, list[str]]]:
+    """モデルを共通モジュールとタグ専用モジュールに振り分けます。
+
+    エンドポイントから（推移的に）参照されるタグが1つだけのモデルはそのタグへ、
+    複数タグから参照される・どこからも参照されないモデルは共通モジュールへ置きます。
+    共通モデルの参照先は必ず共通モデルになるため、タグ間のimportは発生しません。
+    """
+    usage: dict[str, set[Optional[str]]] = {name: set() for name in resolver.schemas}
+
+    def mark(root_names: list[str], owner: Optional[str]) -> None:
+        stack = list(root_names)
+        while stack:
+            name = stack.pop()
+            if name not in usage or owner in usage[name]:
+                continue
+            usage[name].add(owner)
+            stack.extend(resolver.graph.get(name, []))
+
+    for methods in spec.get("paths", {}).values():
+        for method, operation in methods.items():
+            if method.lower() in HTTP_METHODS:
+                mark(resolver.collect_refs(operation), operation_tag(operation))
+    # どのエンドポイントからも参照されないモデルは、その依存先ごと共通モジュールへ
+    mark([name for name, owners in usage.items() if not owners], None)
+
+    common: list[str] = []
+    per_tag: dict[str, list[str]] = {}
+    for name in resolver.emission_order():
+        if not resolver.is_object_schema(resolver.schemas[name]):
+            continue
+        owners = usage[name]
+        if len(owners) == 1 and None not in owners:
+            per_tag.setdefault(next(iter(owners)), []).append(name)
+        else:
+            common.append(name)
+    return common, per_tag
+
+
+def spec_for_tag(spec: Mapping[str, Any], tag: str) -> dict[str, Any]:
+    """指定タグのエンドポイントだけを含むスペックを作成します。"""
+    paths: dict[str, dict[str, Any]] = {}
+    for path, methods in spec.get("paths", {}).items():
+        for method, operation in methods.items():
+            if method.lower() in HTTP_METHODS and operation_tag(operation) == tag:
+                paths.setdefault(path, {})[method] = operation
+    return {
+        "tags": [t for t in spec.get("tags", []) if t["name"] == tag]
+        or [{"name": tag}],
+        "paths": paths,
+        "components": spec.get("components", {}),
+    }
+
+
+def render_tag_shard(spec: Mapping[str, Any], tag: str) -> dict[str, str]:
+    """1タグ分のシャード（models.py / router.py / __init__.py）を描画します。"""
+    resolver = SchemaResolver(spec)
+    common, per_tag = partition_schemas(spec, resolver)
+    tag_models = per_tag.get(tag, [])
+    tag_spec = spec_for_tag(spec, tag)
+    common_module = f"{GENERATED_PACKAGE}.{COMMON_MODELS_MODULE}"
+    tag_package = f"{GENERATED_PACKAGE}.{tag}"
+
+    # models.py: タグ専用モデル（共通モデルへの参照はimport）
+    used_common = [
+        name
+        for name in common
+        if any(name in resolver.graph.get(model, []) for model in tag_models)
+    ]
+    models_content = backend.render_model_module(
+        resolver,
+        tag_models,
+        f"OpenAPI YAML仕様から自動生成されたPydanticモデル（{tag}タグ）\n"
+        "手動で編集しないでください。source/openapi.yamlを編集してから再生成してください。",
+        {common_module: used_common},
+    )
+
+    # router.py: エンドポイントが直接参照するモデルのみimport
+    referenced = set(resolver.collect_refs(tag_spec["paths"]))
+    router_common = [name for name in common if name in referenced]
+    router_tag_models = [name for name in tag_models if name in referenced]
+    model_import_lines = ""
+    if router_common:
+        names = backend.format_import_names(router_common)
+        model_import_lines += f"from {common_module} import {names}\n"
+    if router_tag_models:
+        names = backend.format_import_names(router_tag_models)
+        model_import_lines += f"from {tag_package}.models import {names}\n"
+
+    service_imports_str = backend.generate_service_imports(
+        backend.extract_service_imports_from_spec(tag_spec)
+    )
+    router_definitions, _router_names = backend.generate_router_definitions(tag_spec)
+    tag_prefixes = backend.extract_router_prefixes_from_paths(tag_spec)
+    model_names = tuple(router_common + router_tag_models)
+
+    router_content = f'''"""
+OpenAPI YAML仕様から自動生成されたFastAPIルーター（{tag}タグ）
+手動で編集しないでください。source/openapi.yamlを編集してから再生成してください。
+"""
+
+{backend.render_fastapi_imports(tag_spec)}
+
+# ruff: noqa: F401
+{model_import_lines}{service_imports_str}
+
+{router_definitions}
+
+
+'''
+    for path, methods in tag_spec["paths"].items():
+        for method, operation in methods.items():
+            router_content += (
+                backend.generate_endpoint_implementation(
+                    path, method, operation, tag_prefixes, model_names
+                )
+                + "\n\n"
+            )
+
+    base = f"{GENERATED_DIR}/{tag}"
+    return {
+        f"{base}/__init__.py": f'"""{tag}タグの自動生成モジュール"""\n',
+        f"{base}/models.py": models_content,
+        f"{base}/router.py": router_content,
+    }
+
+
+def render_common_models(spec: Mapping[str, Any]) -> dict[str, str]:
+    """共通モデルモジュールを描画します。"""
+    resolver = SchemaResolver(spec)
+    common, _per_tag = partition_schemas(spec, resolver)
+    content = backend.render_model_module(
+        resolver,
+        common,
+        "OpenAPI YAML仕様から自動生成された共通Pydanticモデル（複数タグで共有）\n"
+        "手動で編集しないでください。source/openapi.yamlを編集してから再生成してください。",
+    )
+    return {f"{GENERATED_DIR}/{COMMON_MODELS_MODULE}.py": content}
+
+
+def render_sharded_router(spec: Mapping[str, Any]) -> dict[str, str]:
+    """全タグのルーターを束ねる集約モジュールを描画します。"""
+    import_lines = []
+    include_lines = []
+    legacy_tag = None
+    for tag in list_shard_tags(spec):
+        tag_spec = spec_for_tag(spec, tag)
+        if not tag_spec["paths"]:
+            continue
+        _definitions, router_names = backend.generate_router_definitions(tag_spec)
+        names = [
+            f"{name} as {tag}_{name}"
+            for name in router_names
+            if name != f"{tag}_router"
+        ]
+        import_lines.append(
+            f"from {GENERATED_PACKAGE}.{tag}.router import "
+            + ", ".join([f"{tag}_router", *names])
+        )
+        include_lines.append(f"main_router.include_router({tag}_router)")
+        if "legacy_router" in router_names and legacy_tag is None:
+            legacy_tag = tag
+
+    legacy_line = (
+        f"legacy_router = {legacy_tag}_legacy_router"
+        if legacy_tag
+        else 'legacy_router = APIRouter(tags=["legacy"])'
+    )
+    content = f'''"""
+OpenAPI YAML仕様から自動生成されたタグ別ルーターの集約モジュール
+generated_router.pyと同じくmain_routerとlegacy_routerを公開します。
+手動で編集しないでください。source/openapi.yamlを編集してから再生成してください。
+"""
+
+from fastapi import APIRouter
+
+{chr(10).join(import_lines)}
+
+# メインルーターを作成
+main_router = APIRouter()
+{chr(10).join(include_lines)}
+
+# legacy_routerはmain_routerに含めず、/api/v1を付けずにマウントするため別扱い
+{legacy_line}
+'''
+    return {f"{GENERATED_DIR}/sharded_router.py": content}
+
+
+def _render_shard(kind: str, spec: Mapping[str, Any], tag: str) -> dict[str, str]:
+    """プロセスプールから呼び出すトップレベルの描画関数"""
+    if kind == "tag":
+        return render_tag_shard(spec, tag)
+    if kind == "common":
+        return render_common_models(spec)
+    return render_sharded_router(spec)
+
+
+def render_shards(spec: Mapping[str, Any], jobs: int = 1) -> dict[str, str]:
+    """全シャードを描画します（jobs>1の場合はプロセスプールで並列実行）。"""
+    shard_jobs = [("common", ""), ("aggregate", "")] + [
+        ("tag", tag)
+        for tag in list_shard_tags(spec)
+        if spec_for_tag(spec, tag)["paths"]
+    ]
+    contents: dict[str, str] = {}
+    if jobs <= 1:
+        for kind, tag in shard_jobs:
+            contents.update(_render_shard(kind, spec, tag))
+        return contents
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [
+            pool.submit(_render_shard, kind, spec, tag) for kind, tag in shard_jobs
+        ]
+        for future in futures:
+            contents.update(future.result())
+    return contents
+
+
+def load_shard_manifest(path: Path = SHARD_MANIFEST_PATH) -> dict[str, Any]:
+    """前回のシャード生成結果（描画ハッシュ・ファイルハッシュ）を読み込みます。"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_shard_manifest(manifest: dict[str, Any], path: Path = SHARD_MANIFEST_PATH):
+    """シャード生成結果を保存します。"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False, sort_keys=True)
+    tmp_path.replace(path)
+
+
+def write_shards(
+    contents: dict[str, str], previous: dict[str, Any]
+) -> tuple[list[Path], list[Path]]:
+    """内容が変わったシャードのみ書き込み、不要になったシャードを削除します。
+
+    戻り値は (書き込んだファイル, 削除したファイル)。
+    """
+    from generation_pipeline import write_if_changed
+
+    written = []
+    for output, content in contents.items():
+        recorded = previous.get(output, {})
+        if write_if_changed(
+            output, content, recorded.get("rendered"), recorded.get("output")
+        ):
+            written.append(PROJECT_ROOT / output)
+
+    # タグの削除などで生成されなくなったシャードを削除（自動生成物のみ）
+    removed = []
+    for output in sorted(set(previous) - set(contents)):
+        path = PROJECT_ROOT / output
+        if path.exists() and hash_file(path) == previous[output].get("output"):
+            path.unlink()
+            removed.append(path)
+    return written, removed
+
+
+def record_shards(contents: dict[str, str]) -> dict[str, Any]:
+    """整形後のファイルハッシュを含むシャードマニフェストを作成します。"""
+    return {
+        output: {
+            "rendered": hash_bytes(content.encode("utf-8")),
+            "output": hash_file(PROJECT_ROOT / output),
+        }
+        for output, content in contents.items()
+    }
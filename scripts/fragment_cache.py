@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# fragment_cache.py
+"""
+生成コード断片のメモ化
+
+モデルクラス・ルーターエンドポイント・TypeScriptインターフェースなどの断片を
+入力の内容ハッシュをキーとして記憶し、ウォッチモードでの再生成時に
+変更された断片だけを描画し直します。
+一回限りの生成ではハッシュ計算のコストを避けるため無効になっています。
+"""
+
+import functools
+import hashlib
+import json
+from typing import Any, Callable
+
+_enabled = False
+_fragments: dict[tuple[str, str], str] = {}
+_used: set[tuple[str, str]] = set()
+stats = {"hits": 0, "misses": 0}
+
+
+def enable() -> None:
+    """断片キャッシュを有効化します（ウォッチモードで使用）。"""
+    global _enabled
+    _enabled = True
+
+
+def _key(args: tuple, kwargs: dict) -> str:
+    canonical = json.dumps(
+        [args, kwargs],
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def memoize(func: Callable[..., str]) -> Callable[..., str]:
+    """引数の内容が同じなら前回の描画結果を返すデコレーター"""
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> str:
+        if not _enabled:
+            return func(*args, **kwargs)
+        key = (func.__qualname__, _key(args, kwargs))
+        _used.add(key)
+        if key in _fragments:
+            stats["hits"] += 1
+            return _fragments[key]
+        stats["misses"] += 1
+        result = func(*args, **kwargs)
+        _fragments[key] = result
+        return result
+
+    return wrapper
+
+
+def begin_cycle() -> None:
+    """再生成サイクルの開始（統計と使用済みキーをリセット）"""
+    _used.clear()
+    stats["hits"] = 0
+    stats["misses"] = 0
+
+
+def end_cycle() -> None:
+    """今回のサイクルで使われなかった断片を破棄し、メモリ使用量を抑えます。
+
+    描画されなかった種類（再生成対象外だった成果物）の断片は次回のために残します。
+    """
+    rendered_kinds = {kind for kind, _ in _used}
+    for key in list(_fragments):
+        if key[0] in rendered_kinds and key not in _used:
+            del _fragments[key]
@@ -4,14 +4,53 @@
 OpenAPI YAML-first 統合生成スクリプト
 
 手書きのopenapi.yamlからコード、型定義、ドキュメントを一括生成します。
+前回の生成結果は .cache/generation_manifest.json に記録され、
+入力（スペックのセクション・生成スクリプト）が変わった成果物のみを再生成します。
+既定ではスペックを一度だけ解析し、同一プロセス内のパイプラインで各成果物を生成します。
 """
 
+import argparse
 import os
 import subprocess
 import sys
+import time
 import traceback
 from pathlib import Path
 
+import fragment_cache
+from generation_manifest import (
+    GENERATION_TARGETS,
+    compute_generator_versions,
+    compute_section_hashes,
+    compute_target_fingerprints,
+    diff_sections,
+    find_stale_targets,
+    hash_bytes,
+    hash_outputs,
+    is_up_to_date,
+    list_service_files,
+    load_manifest,
+    save_manifest,
+)
+from generation_pipeline import load_spec_model, run_pipeline
+from spec_loader import load_openapi_spec
+from spec_watcher import create_watcher
+
+# 生成ステップ: (説明, 実行スクリプト, 担当する生成対象)
+GENERATION_STEPS = [
+    (
+        "TypeScript型定義・OpenAPIファイル生成",
+        "scripts/generate_frontend_code.py",
+        ["frontend"],
+    ),
+    (
+        "Pydanticモデル・FastAPIルーター生成",
+        "scripts/generate_backend_code.py",
+        ["models", "router", "services"],
+    ),
+    ("HTMLドキュメント生成", "scripts/generate_docs.py", ["docs"]),
+]
+
 
 def run_command(command: str, description: str, cwd: str = None) -> int:
     """コマンドを実行し、結果を表示"""
@@ -48,13 +87,264 @@ def run_command(command: str, description: str, cwd: str = None) -> int:
         return 1
 
 
-def main():
+def snapshot_python_outputs(project_root: Path) -> dict[Path, float]:
+    """生成先ディレクトリのPythonファイルの更新時刻を記録します。"""
+    snapshot = {}
+    for directory in ("app/generated", "app/services"):
+        for path in (project_root / directory).rglob("*.py"):
+            snapshot[path] = path.stat().st_mtime_ns
+    return snapshot
+
+
+def find_changed_python_files(
+    before: dict[Path, float], after: dict[Path, float]
+) -> list[Path]:
+    """生成処理の前後で作成・更新されたPythonファイルを返します。"""
+    return sorted(path for path, mtime in after.items() if before.get(path) != mtime)
+
+
+def format_python_files(files: list[Path], project_root: Path) -> None:
+    """変更されたPythonファイルのみをruffで整形します（ツリー全体は対象外）。"""
+    if not files:
+        print("⏭️ 整形対象のファイルはありません")
+        return
+
+    print(f"🎨 変更された{len(files)}ファイルをフォーマット中...")
+    file_args = [str(f) for f in files]
+    for ruff in (["poetry", "run", "ruff"], ["ruff"]):
+        try:
+            # lintエラーが出てもformatで直るため、check --fixの失敗は無視する
+            subprocess.run(
+                [*ruff, "check", "--fix", "--quiet", *file_args],
+                cwd=project_root,
+                capture_output=True,
+            )
+            subprocess.run(
+                [*ruff, "format", "--quiet", *file_args],
+                check=True,
+                cwd=project_root,
+                capture_output=True,
+            )
+            print("✨ フォーマット完了")
+            return
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            continue
+    print("⚠️  ruffが見つかりません。make formatで手動整形してください")
+
+
+def run_subprocess_steps(
+    project_root: Path, stale_targets: list[str]
+) -> tuple[list[str], list[Path]]:
+    """従来通り各生成スクリプトをサブプロセスとして実行します。"""
+    before = snapshot_python_outputs(project_root)
+    completed_targets = []
+    for description, script, targets in GENERATION_STEPS:
+        step_targets = [name for name in targets if name in stale_targets]
+        if not step_targets:
+            print(f"⏭️ {description}: 変更なしのためスキップ")
+            continue
+
+        command = f'"{sys.executable}" {script}'
+        if script.endswith("generate_backend_code.py"):
+            command += " --only " + " ".join(step_targets)
+
+        full_command = f"cd {project_root} && {command}"
+        if run_command(full_command, description) != 0:
+            print(f"❌ {description} でエラーが発生しました。処理を中断します。")
+            break
+        completed_targets.extend(step_targets)
+        print()
+
+    after = snapshot_python_outputs(project_root)
+    return completed_targets, find_changed_python_files(before, after)
+
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    """コマンドライン引数を解析します。"""
+    parser = argparse.ArgumentParser(description="OpenAPI YAML-first 統合生成")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="マニフェストを無視してすべての成果物を再生成",
+    )
+    parser.add_argument(
+        "--subprocess",
+        action="store_true",
+        help="従来通り各生成スクリプトを個別のサブプロセスで実行",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="インプロセス生成時の並列数（2以上でプールを使用）",
+    )
+    parser.add_argument(
+        "--executor",
+        choices=["thread", "process"],
+        default="thread",
+        help="並列実行に使うプールの種類",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="source/openapi.yamlを監視し、保存のたびに差分を再生成",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=0.15,
+        help="ウォッチモードで連続保存をまとめる待ち時間（秒）",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="inotifyを使わずポーリングで監視",
+    )
+    return parser.parse_args(argv)
+
+
+def regenerate(
+    project_root: Path,
+    yaml_path: Path,
+    args: argparse.Namespace,
+    manifest: dict,
+) -> tuple[int, dict, bool]:
+    """スペックの変更を反映し、入力が変わった成果物のみを再生成します。
+
+    戻り値は (終了コード, 更新後のマニフェスト, 再生成を行ったかどうか)。
+    """
+    started_at = time.perf_counter()
+
+    # 高速パス: YAMLを解析せずにファイル全体のハッシュで変更有無を判定
+    spec_bytes = yaml_path.read_bytes()
+    spec_hash = hash_bytes(spec_bytes)
+    generator_versions = compute_generator_versions()
+
+    if is_up_to_date(manifest, spec_hash, generator_versions):
+        elapsed = time.perf_counter() - started_at
+        print(f"✅ 変更はありません。生成をスキップしました（{elapsed:.3f}秒）")
+        return 0, manifest, False
+
+    spec = load_openapi_spec(yaml_path, spec_bytes=spec_bytes)
+    sections = compute_section_hashes(spec)
+    fingerprints = compute_target_fingerprints(sections, generator_versions)
+    recorded_targets = manifest.get("targets", {})
+    stale_targets = find_stale_targets(manifest, fingerprints)
+
+    changes = diff_sections(manifest.get("sections", {}), sections)
+    for section, names in changes.items():
+        print(f"📝 変更された{section}: {', '.join(names)}")
+    print(f"🎯 再生成対象: {', '.join(stale_targets) or 'なし'}")
+    print()
+
+    if args.subprocess:
+        completed_targets, changed_files = run_subprocess_steps(
+            project_root, stale_targets
+        )
+        rendered = {}
+    else:
+        model = load_spec_model(yaml_path, spec)
+        result = run_pipeline(
+            model,
+            stale_targets,
+            previous_targets=recorded_targets,
+            jobs=args.jobs,
+            executor=args.executor,
+        )
+        for target, error in result.failed.items():
+            print(f"❌ {target} の生成でエラーが発生しました: {error}")
+        completed_targets = [t for t in stale_targets if t not in result.failed]
+        changed_files = [
+            *[path for path in result.written if path.suffix == ".py"],
+            *result.service_files,
+        ]
+        rendered = result.rendered
+        for path in result.written:
+            print(f"✅ 生成: {path.relative_to(project_root)}")
+        print(f"⚡ インプロセス生成完了（{result.elapsed:.3f}秒）")
+        print()
+
+    # 変更された生成物のみ整形（ツリー全体のmake formatは行わない）
+    format_python_files(changed_files, project_root)
+
+    # 成功した生成対象のみマニフェストを更新（失敗した対象は次回再生成される）
+    # サービススタブの追加でファイル一覧が変わるため、指紋は生成後に再計算する
+    sections["service_files"] = list_service_files()
+    fingerprints = compute_target_fingerprints(sections, generator_versions)
+    targets_state = dict(recorded_targets)
+    for name in GENERATION_TARGETS:
+        if name in completed_targets or name not in stale_targets:
+            targets_state[name] = {
+                "fingerprint": fingerprints[name],
+                "outputs": hash_outputs(name),
+                "rendered": rendered.get(
+                    name, recorded_targets.get(name, {}).get("rendered", {})
+                ),
+            }
+        else:
+            targets_state.pop(name, None)
+
+    all_succeeded = set(stale_targets) <= set(completed_targets)
+    manifest = {
+        "spec_sha256": spec_hash if all_succeeded else "",
+        "generators": generator_versions,
+        "service_files": sections["service_files"],
+        "sections": sections,
+        "targets": targets_state,
+    }
+    save_manifest(manifest)
+    return (0 if all_succeeded else 1), manifest, True
+
+
+def watch(
+    project_root: Path, yaml_path: Path, args: argparse.Namespace, manifest: dict
+) -> int:
+    """スペックを監視し、保存のたびに影響のある成果物だけを再生成します。"""
+    watcher = create_watcher(yaml_path, debounce=args.debounce, polling=args.poll)
+    print(f"👀 {yaml_path} を監視しています（{watcher.name}、Ctrl+Cで終了）")
+
+    try:
+        while True:
+            if not watcher.wait():
+                continue
+            print()
+            print(f"🔄 変更を検知しました: {time.strftime('%H:%M:%S')}")
+            started_at = time.perf_counter()
+            fragment_cache.begin_cycle()
+            try:
+                _status, manifest, _changed = regenerate(
+                    project_root, yaml_path, args, manifest
+                )
+            except Exception as e:
+                # 編集途中のYAML構文エラーなどでは監視を継続する
+                print(f"❌ 再生成に失敗しました（監視は継続します）: {e}")
+                continue
+            finally:
+                # 失敗したサイクルでも使われなかった断片を破棄する
+                fragment_cache.end_cycle()
+            elapsed = time.perf_counter() - started_at
+            stats = fragment_cache.stats
+            print(
+                f"⏱️ 反映完了: {elapsed:.3f}秒"
+                f"（断片キャッシュ ヒット{stats['hits']} / 再描画{stats['misses']}）"
+            )
+    except KeyboardInterrupt:
+        print()
+        print("👋 監視を終了しました")
+    finally:
+        watcher.close()
+    return 0
+
+
+def main(argv: list[str] = None):
     """メイン処理"""
+    args = parse_args(argv)
+    started_at = time.perf_counter()
     print("🔧 OpenAPI YAML-first 統合生成プロセスを開始...")
     print("=" * 60)
 
     # プロジェクトルートに移動
-    project_root = Path(__file__).parent.parent
+    project_root = Path(__file__).resolve().parent.parent
 
     # source/openapi.yaml の存在確認
     yaml_path = project_root / "source" / "openapi.yaml"
@@ -66,34 +356,29 @@ def main():
     print(f"📖 OpenAPI YAML仕様を確認: {yaml_path}")
     print()
 
-    steps = [
-        (
-            f'"{sys.executable}" scripts/generate_frontend_code.py',
-            "TypeScript型定義・OpenAPIファイル生成",
-        ),
-        (
-            f'"{sys.executable}" scripts/generate_backend_code.py',
-            "Pydanticモデル・FastAPIルーター生成",
-        ),
-        (f'"{sys.executable}" scripts/generate_docs.py', "HTMLドキュメント生成"),
-    ]
-
-    for command, description in steps:
-        full_command = f"cd {project_root} && {command}"
-        if run_command(full_command, description) != 0:
-            print(f"❌ {description} でエラーが発生しました。処理を中断します。")
-            return 1
-        print()
+    if args.watch:
+        if args.subprocess:
+            print("⚠️  ウォッチモードではインプロセス生成を使用します")
+            args.subprocess = False
+        # 変更のないモデル・エンドポイント・インターフェースは前回の描画結果を再利用する
+        # （初回生成から有効にして、以降の差分描画に備える）
+        fragment_cache.enable()
+
+    manifest = {} if args.force else load_manifest()
+    status, manifest, changed = regenerate(project_root, yaml_path, args, manifest)
 
-    # 生成物を常に整形
-    run_command("make format", "コードフォーマット実行", cwd=str(project_root))
+    if args.watch:
+        return watch(project_root, yaml_path, args, manifest)
+    if status != 0 or not changed:
+        return status
 
-    print("🎉 すべての生成処理が完了しました！")
+    elapsed = time.perf_counter() - started_at
+    print(f"🎉 すべての生成処理が完了しました！（{elapsed:.2f}秒）")
     print()
     print("📁 生成されたファイル:")
     print("  📊 ソース仕様: source/openapi.yaml")
     print("  🔧 TypeScript型定義: scripts/generated/api-types.ts")
-    print("  📄 OpenAPIドキュメント: docs/generated/openapi.{json,yaml}")
+    print("  📄 OpenAPIドキュメント: docs/generated/openapi.json")
     print("  🏗️ Pydanticモデル: app/generated/generated_models.py")
     print("  🌐 FastAPIルーター: app/generated/generated_router.py")
     print("  📖 HTMLドキュメント: scripts/generated/docs/{swagger,redoc}.html")
@@ -6,13 +6,21 @@ OpenAPI YAML ファーストアプローチ用のコード生成スクリプト
 手書きのopenapi.yamlからPydanticモデルとFastAPIエンドポイントを生成します。
 """
 
+import argparse
 import re
 import subprocess
 import sys
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 
-import yaml
+import fragment_cache
+import spec_loader
+from schema_resolver import (
+    SchemaResolver,
+    is_nullable,
+    non_null_type,
+    streaming_media_types,
+)
 
 # OpenAPIのoperationIdからサービス層の関数名への明示的なマッピング
 # サービスモジュールが配置されているディレクトリ
@@ -34,15 +42,17 @@ def find_service_module(tag: str) -> str:
 
 
 def load_openapi_spec(yaml_path: str) -> dict[str, Any]:
-    """OpenAPI YAML仕様をロードします。"""
-    with open(yaml_path, encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    """OpenAPI YAML仕様をロードします（Cローダー＋解析結果キャッシュを使用）。"""
+    return spec_loader.load_openapi_spec(yaml_path)
 
 
-def format_generated_files(output_dir: Path) -> None:
-    """生成されたPythonファイルをruffでフォーマットします。"""
+def format_generated_files(output_dir: Path, files: list[Path] = None) -> None:
+    """生成されたPythonファイルをruffでフォーマットします。
+
+    filesが指定された場合はそのファイルのみを対象にします。
+    """
     try:
-        python_files = list(output_dir.glob("*.py"))
+        python_files = files if files is not None else list(output_dir.glob("*.py"))
         if python_files:
             print("🎨 生成されたファイルをフォーマット中...")
 
@@ -72,42 +82,116 @@ def format_generated_files(output_dir: Path) -> None:
         print("⚠️  poetryまたはruffが見つかりません。手動でフォーマットしてください")
 
 
-def generate_pydantic_models(spec: dict[str, Any], output_dir: str) -> None:
-    """Pydanticモデルを生成します。"""
-    output_path = Path(output_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
+MODELS_MODULE_DOCSTRING = """OpenAPI YAML仕様から自動生成されたPydanticモデル
+手動で編集しないでください。source/openapi.yamlを編集してから再生成してください。"""
 
-    models_file = output_path / "generated_models.py"
 
-    content = """\"\"\"
-OpenAPI YAML仕様から自動生成されたPydanticモデル
-手動で編集しないでください。source/openapi.yamlを編集してから再生成してください。
+def render_pydantic_models(spec: dict[str, Any]) -> str:
+    """Pydanticモデルファイルの内容を生成します（ファイルには書き込みません）。
+
+    $refの参照先モデルが先に定義されるよう依存順に出力し、
+    循環参照は文字列の前方参照とmodel_rebuild()で解決します。
+    """
+    resolver = SchemaResolver(spec)
+    model_names = [
+        name
+        for name in resolver.emission_order()
+        if resolver.is_object_schema(resolver.schemas[name])
+    ]
+    return render_model_module(resolver, model_names, MODELS_MODULE_DOCSTRING)
+
+
+def render_model_module(
+    resolver: SchemaResolver,
+    model_names: list[str],
+    docstring: str,
+    model_imports: Optional[dict[str, list[str]]] = None,
+) -> str:
+    """指定したモデル群を1モジュールとして描画します。
+
+    model_importsには他モジュールで定義されるモデル（モジュール名 -> モデル名）を渡します。
+    """
+    model_imports = model_imports or {}
+    body = ""
+    defined: set[str] = {name for names in model_imports.values() for name in names}
+    rebuild_names = []
+    for schema_name in model_names:
+        schema_def = resolver.schemas[schema_name]
+        if "allOf" in schema_def:
+            schema_def = resolver.merged_object(schema_name)
+        field_types = {
+            prop_name: convert_openapi_type_to_python(prop_def, resolver, defined)
+            for prop_name, prop_def in schema_def.get("properties", {}).items()
+        }
+        # Literalの値を除いて、前方参照（文字列のモデル名）が残るかを調べる
+        if any(
+            '"' in re.sub(r"Literal\[[^\]]*\]", "", field_type)
+            for field_type in field_types.values()
+        ):
+            rebuild_names.append(schema_name)
+        body += generate_model_class(schema_name, schema_def, field_types) + "\n\n"
+        defined.add(schema_name)
+
+    if rebuild_names:
+        body += "# 前方参照（循環参照）を解決\n"
+        body += "".join(f"{name}.model_rebuild()\n" for name in rebuild_names)
+
+    import_lines = "".join(
+        f"from {module} import {format_import_names(names)}\n"
+        for module, names in model_imports.items()
+        if names
+    )
+    if import_lines:
+        import_lines = "\n" + import_lines
+
+    typing_names = ", ".join(
+        name
+        for name in ("Annotated", "Any", "Literal", "Optional", "Union")
+        if name in ("Any", "Optional") or f"{name}[" in body
+    )
+    content = f"""\"\"\"
+{docstring}
 \"\"\"
 
 from datetime import datetime
-from typing import Any, Optional
+from typing import {typing_names}
 
 from pydantic import BaseModel, Field
-
+{import_lines}
 
 """
+    return content + body
+
 
-    # コンポーネント/スキーマからモデルを生成
-    schemas = spec.get("components", {}).get("schemas", {})
+def format_import_names(names: list[str]) -> str:
+    """import文の名前部分を生成します（長い場合は複数行に分割）。"""
+    if len(", ".join(names)) > 60:
+        return "(\n    " + ",\n    ".join(names) + ",\n)"
+    return ", ".join(names)
 
-    for schema_name, schema_def in schemas.items():
-        if schema_def.get("type") == "object":
-            model_code = generate_model_class(schema_name, schema_def)
-            content += model_code + "\n\n"
 
+def generate_pydantic_models(spec: dict[str, Any], output_dir: str) -> None:
+    """Pydanticモデルを生成します。"""
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    models_file = output_path / "generated_models.py"
     with open(models_file, "w", encoding="utf-8") as f:
-        f.write(content)
+        f.write(render_pydantic_models(spec))
 
     print(f"✅ Pydanticモデルを生成しました: {models_file}")
 
 
-def generate_model_class(name: str, schema: dict[str, Any]) -> str:
-    """単一のPydanticモデルクラスを生成します。"""
+@fragment_cache.memoize
+def generate_model_class(
+    name: str,
+    schema: dict[str, Any],
+    field_types: Optional[dict[str, str]] = None,
+) -> str:
+    """単一のPydanticモデルクラスを生成します。
+
+    field_typesには$ref解決済みのプロパティ型を渡せます（省略時はその場で変換）。
+    """
     description = schema.get("description", "")
     properties = schema.get("properties", {})
     required = schema.get("required", [])
@@ -122,41 +206,47 @@ def generate_model_class(name: str, schema: dict[str, Any]) -> str:
     # プロパティを生成
     for prop_name, prop_def in properties.items():
         is_required = prop_name in required
-        field_type = convert_openapi_type_to_python(prop_def)
+        if field_types is not None and prop_name in field_types:
+            field_type = field_types[prop_name]
+        else:
+            field_type = convert_openapi_type_to_python(prop_def)
         field_description = prop_def.get("description", "")
 
         # デフォルト値の処理
         default_value = prop_def.get("default")
         field_def = ""
+        default_literal = None
 
         if not is_required:
             if default_value is not None:
                 if isinstance(default_value, str):
-                    field_def = f' = "{default_value}"'
+                    default_literal = f'"{default_value}"'
                 else:
-                    field_def = f" = {default_value}"
+                    default_literal = f"{default_value}"
             else:
-                field_type = f"Optional[{field_type}]"
-                field_def = " = None"
+                if not field_type.startswith("Optional["):
+                    field_type = f"Optional[{field_type}]"
+                default_literal = "None"
+            field_def = f" = {default_literal}"
 
         # Field()を使用した詳細定義
         field_params = []
         if field_description:
             field_params.append(f'description="{field_description}"')
 
-        # 数値制約
-        if "minimum" in prop_def:
-            field_params.append(f"ge={prop_def['minimum']}")
-        if "maximum" in prop_def:
-            field_params.append(f"le={prop_def['maximum']}")
+        # 数値・文字列の制約
+        field_params.extend(value_constraints(prop_def))
 
-        # 文字列制約
-        if "minLength" in prop_def:
-            field_params.append(f"min_length={prop_def['minLength']}")
-        if "maxLength" in prop_def:
-            field_params.append(f"max_length={prop_def['maxLength']}")
+        # 配列の要素数の制約
+        if "minItems" in prop_def:
+            field_params.append(f"min_length={prop_def['minItems']}")
+        if "maxItems" in prop_def:
+            field_params.append(f"max_length={prop_def['maxItems']}")
 
         if field_params:
+            # Field()を使う場合もデフォルト値を残す（省略すると必須項目になる）
+            if default_literal is not None:
+                field_params.insert(0, f"default={default_literal}")
             # 長い行を避けるため、パラメータが多い場合は複数行に分割
             params_str = ", ".join(field_params)
             if len(f"    {prop_name}: {field_type} = Field({params_str})") > 80:
@@ -171,6 +261,22 @@ def generate_model_class(name: str, schema: dict[str, Any]) -> str:
     return class_def
 
 
+def value_constraints(prop_def: dict[str, Any]) -> list[str]:
+    """数値・文字列の制約をField()の引数に変換します。"""
+    params = []
+    if "minimum" in prop_def:
+        params.append(f"ge={prop_def['minimum']}")
+    if "maximum" in prop_def:
+        params.append(f"le={prop_def['maximum']}")
+    if "minLength" in prop_def:
+        params.append(f"min_length={prop_def['minLength']}")
+    if "maxLength" in prop_def:
+        params.append(f"max_length={prop_def['maxLength']}")
+    if "pattern" in prop_def:
+        params.append(f"pattern={prop_def['pattern']!r}")
+    return params
+
+
 def generate_service_impls(spec: dict[str, Any]) -> None:
     """サービス関数スタブを1ファイルずつ自動生成します。"""
     paths = spec.get("paths", {})
@@ -202,7 +308,10 @@ def generate_service_impls(spec: dict[str, Any]) -> None:
             if service_file_path.exists():
                 continue  # 既に存在するならスキップ
 
-            # テンプレート生成
+            # テンプレート生成（ストリーミングはAcceptヘッダーで形式を選ぶ）
+            params = "request: Any = None"
+            if streaming_media_types(operation):
+                params += ', accept: str = ""'
             stub = f'''"""
 {tag}サービス: {function_name} の自動生成スタブ
 """
@@ -210,7 +319,7 @@ def generate_service_impls(spec: dict[str, Any]) -> None:
 from typing import Any
 
 
-async def {function_name}(request: Any = None) -> Any:
+async def {function_name}({params}) -> Any:
     """TODO: 実装してください"""
     return {{"message": "{function_name} not implemented"}}
 '''
@@ -221,12 +330,76 @@ async def {function_name}(request: Any = None) -> Any:
             print(f"🛠️ サービススタブ生成: {service_file_path}")
 
 
-def convert_openapi_type_to_python(prop_def: dict[str, Any]) -> str:
-    """OpenAPIプロパティ定義をPython型に変換します。"""
-    prop_type = prop_def.get("type", "any")
+def convert_openapi_type_to_python(
+    prop_def: dict[str, Any],
+    resolver: Optional[SchemaResolver] = None,
+    defined: Optional[set[str]] = None,
+    _expanding: frozenset = frozenset(),
+) -> str:
+    """OpenAPIプロパティ定義をPython型に変換します。
+
+    resolverを渡すと$ref・allOf/oneOf/anyOf・nullableを解決します。
+    definedに含まれないモデルへの参照は前方参照（文字列）として出力します。
+    """
+    python_type = _convert_python_type(prop_def, resolver, defined, _expanding)
+    if resolver is not None and python_type != "Any" and is_nullable(prop_def):
+        return f"Optional[{python_type}]"
+    return python_type
+
+
+def _convert_python_type(
+    prop_def: dict[str, Any],
+    resolver: Optional[SchemaResolver],
+    defined: Optional[set[str]],
+    expanding: frozenset,
+) -> str:
+    ref = prop_def.get("$ref")
+    if ref and resolver is not None:
+        name = resolver.ref_name(ref)
+        if name in resolver.schemas and resolver.is_object_schema(
+            resolver.schemas[name]
+        ):
+            return name if defined is None or name in defined else f'"{name}"'
+        if ref in expanding:
+            return "Any"  # モデル化されないスキーマ同士の循環
+        # モデル化されないスキーマ（enumや配列の別名など）は参照先の型を展開
+        return convert_openapi_type_to_python(
+            resolver.deref(prop_def), resolver, defined, expanding | {ref}
+        )
+
+    if resolver is not None:
+        for keyword in ("oneOf", "anyOf"):
+            options = [
+                option
+                for option in prop_def.get(keyword) or []
+                if option.get("type") != "null"
+            ]
+            if options:
+                types = []
+                for option in options:
+                    option_type = convert_openapi_type_to_python(
+                        option, resolver, defined, expanding
+                    )
+                    if option_type not in types:
+                        types.append(option_type)
+                return types[0] if len(types) == 1 else f"Union[{', '.join(types)}]"
+        all_of = prop_def.get("allOf")
+        if all_of:
+            if len(all_of) == 1:
+                return convert_openapi_type_to_python(
+                    all_of[0], resolver, defined, expanding
+                )
+            return "dict[str, Any]"  # インラインの合成オブジェクト
+
+    prop_type = non_null_type(prop_def) or "any"
     prop_format = prop_def.get("format")
 
     if prop_type == "string":
+        # enumは値を限定したLiteralにする（範囲外の値はバリデーションエラー）
+        enum_values = prop_def.get("enum")
+        if enum_values:
+            values = ", ".join(f'"{value}"' for value in enum_values)
+            return f"Literal[{values}]"
         if prop_format == "date-time":
             return "datetime"
         return "str"
@@ -237,13 +410,17 @@ def convert_openapi_type_to_python(prop_def: dict[str, Any]) -> str:
     elif prop_type == "boolean":
         return "bool"
     elif prop_type == "array":
-        item_type = convert_openapi_type_to_python(prop_def.get("items", {}))
+        items = prop_def.get("items", {})
+        item_type = convert_openapi_type_to_python(items, resolver, defined, expanding)
+        # 要素の制約（文字列の長さなど）はAnnotatedで要素の型に付ける
+        item_constraints = value_constraints(items)
+        if item_constraints:
+            item_type = f"Annotated[{item_type}, Field({', '.join(item_constraints)})]"
         return f"list[{item_type}]"
     elif prop_type == "object":
         return "dict[str, Any]"
     else:
-        # $refの処理
-        ref = prop_def.get("$ref")
+        # $refの処理（resolverなしの場合は参照名をそのまま使用）
         if ref:
             return ref.split("/")[-1]
         return "Any"
@@ -365,50 +542,60 @@ def extract_service_imports_from_spec(spec: dict[str, Any]) -> dict[str, list[st
 
 
 def generate_service_imports(service_imports: dict[str, list[str]]) -> str:
-    """サービスインポート文を生成します（余計なカンマを除去）"""
-    import_lines = []
+    """サービス関数の参照を生成します。
 
-    for service_module, function_names in service_imports.items():
-        function_names_sorted = sorted(set(function_names))
+    関数はlazy_impl()経由で参照し、settings.lazy_service_importsが有効な場合は
+    エンドポイントの初回呼び出し時にサービスモジュールをimportします。
+    """
+    if not service_imports:
+        return ""
+    lines = [
+        "from app.utils.lazy_import import lazy_impl",
+        "",
+        "# サービス層の_impl関数（遅延モードでは初回呼び出し時にimport）",
+    ]
 
-        if len(function_names_sorted) == 1:
-            # 関数が1つだけなら1行でimport
-            import_line = (
-                f"from app.services.{service_module} import {function_names_sorted[0]}"
-            )
-        else:
-            # 複数関数ならマルチライン（カンマの位置も適切に）
-            functions_str = ",\n    ".join(function_names_sorted)
-            import_line = (
-                f"from app.services.{service_module} import (\n"
-                f"    {functions_str},\n"
-                f")"
+    for service_module, function_names in service_imports.items():
+        for function_name in sorted(set(function_names)):
+            lines.append(
+                f"{function_name} = lazy_impl("
+                f'"app.services.{service_module}", "{function_name}")'
             )
-        import_lines.append(import_line)
 
-    return "\n".join(import_lines)
+    return "\n".join(lines)
 
 
-def generate_router_stubs(spec: dict[str, Any], output_dir: str) -> None:
-    """FastAPIルータースタブを生成します。"""
-    output_path = Path(output_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
+def render_fastapi_imports(spec: dict[str, Any]) -> str:
+    """ルーターファイルのFastAPI関連のimport文を生成します。"""
+    has_streaming = any(
+        streaming_media_types(operation)
+        for methods in spec.get("paths", {}).values()
+        for method, operation in methods.items()
+        if method.lower() in ["get", "post", "put", "delete", "patch"]
+    )
+    if not has_streaming:
+        return "from fastapi import APIRouter"
+    # ストリーミングエンドポイントはAcceptヘッダーを読むためRequestも使う
+    return (
+        "from fastapi import APIRouter, Request\n"
+        "from fastapi.responses import StreamingResponse"
+    )
 
-    router_file = output_path / "generated_router.py"
 
-    # モデルをインポートするための名前を収集
-    schemas = spec.get("components", {}).get("schemas", {})
-    model_imports = []
-    for schema_name in schemas.keys():
-        model_imports.append(schema_name)
+def render_router_stubs(spec: dict[str, Any]) -> str:
+    """FastAPIルーターファイルの内容を生成します（ファイルには書き込みません）。"""
+    # モデルをインポートするための名前を収集（モデル化されるオブジェクト型のみ）
+    resolver = SchemaResolver(spec)
+    model_imports = [
+        schema_name
+        for schema_name, schema_def in resolver.schemas.items()
+        if resolver.is_object_schema(schema_def)
+    ]
 
     imports_str = ""
     if model_imports:
         # 長い行を避けるため、インポートを複数行に分割
-        if len(", ".join(model_imports)) > 60:
-            imports_str = "(\n    " + ",\n    ".join(model_imports) + ",\n)"
-        else:
-            imports_str = ", ".join(model_imports)
+        imports_str = format_import_names(model_imports)
 
     # 動的サービスインポートを生成
     service_imports = extract_service_imports_from_spec(spec)
@@ -422,7 +609,7 @@ OpenAPI YAML仕様から自動生成されたFastAPIルーター
 手動で編集しないでください。source/openapi.yamlを編集してから再生成してください。
 """
 
-from fastapi import APIRouter
+{render_fastapi_imports(spec)}
 
 # ruff: noqa: F401
 from app.generated.generated_models import {imports_str}
@@ -434,14 +621,15 @@ from app.generated.generated_models import {imports_str}
 
 '''
 
-    # パスからエンドポイントを生成
+    # パスからエンドポイントを生成（タグのプレフィックスは全エンドポイント共通で一度だけ計算）
     paths = spec.get("paths", {})
+    tag_prefixes = extract_router_prefixes_from_paths(spec)
 
     for path, methods in paths.items():
         for method, operation in methods.items():
             if method.lower() in ["get", "post", "put", "delete", "patch"]:
                 endpoint_code = generate_endpoint_implementation(
-                    path, method, operation, spec
+                    path, method, operation, tag_prefixes, tuple(model_imports)
                 )
                 content += endpoint_code + "\n\n"
 
@@ -461,16 +649,33 @@ main_router = APIRouter()
 # legacy_routerはmain_routerに含めず、/api/v1を付けずにマウントするため別扱い
 """
 
+    return content
+
+
+def generate_router_stubs(spec: dict[str, Any], output_dir: str) -> None:
+    """FastAPIルータースタブを生成します。"""
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    router_file = output_path / "generated_router.py"
     with open(router_file, "w", encoding="utf-8") as f:
-        f.write(content)
+        f.write(render_router_stubs(spec))
 
     print(f"✅ FastAPIルータースタブを生成しました: {router_file}")
 
 
+@fragment_cache.memoize
 def generate_endpoint_implementation(
-    path: str, method: str, operation: dict[str, Any], spec: dict[str, Any]
+    path: str,
+    method: str,
+    operation: dict[str, Any],
+    tag_prefixes: dict[str, str],
+    model_names: tuple[str, ...] = (),
 ) -> str:
-    """単一のエンドポイント実装を生成します。"""
+    """単一のエンドポイント実装を生成します。
+
+    model_namesを渡すと、モデルとして生成されないスキーマへの$refは型名にしません。
+    """
     operation_id = operation.get(
         "operationId",
         f"{method}_{path.replace('/', '_').replace('{', '').replace('}', '')}",
@@ -485,7 +690,6 @@ def generate_endpoint_implementation(
 
     if tags:
         tag = tags[0]
-        tag_prefixes = extract_router_prefixes_from_paths(spec)
 
         if tag in tag_prefixes:
             if path.startswith("/generate"):
@@ -509,9 +713,8 @@ def generate_endpoint_implementation(
         content = request_body.get("content", {})
         json_content = content.get("application/json", {})
         schema = json_content.get("schema", {})
-        ref = schema.get("$ref")
-        if ref:
-            model_name = ref.split("/")[-1]
+        model_name = _ref_model_name(schema, model_names)
+        if model_name:
             request_param = f"request: {model_name}"
 
     # レスポンスの処理
@@ -520,10 +723,11 @@ def generate_endpoint_implementation(
     content = success_response.get("content", {})
     json_content = content.get("application/json", {})
     schema = json_content.get("schema", {})
-    ref = schema.get("$ref")
-    response_type = "dict"
-    if ref:
-        response_type = ref.split("/")[-1]
+    response_type = _ref_model_name(schema, model_names) or "dict"
+    # SSE / NDJSONのレスポンスはサービス層がStreamingResponseを返す
+    streaming = streaming_media_types(operation)
+    if streaming:
+        response_type = "StreamingResponse"
 
     # パスパラメータの処理
     path_params = re.findall(r"\{([^}]+)\}", path)
@@ -535,6 +739,12 @@ def generate_endpoint_implementation(
     decorator = f'@{router_name}.{method.lower()}("{relative_path}"'
     if summary:
         decorator += f', summary="{summary}"'
+    if streaming:
+        media_types = ", ".join(f'"{media_type}": {{}}' for media_type in streaming)
+        decorator += (
+            ", response_class=StreamingResponse"
+            f', responses={{200: {{"content": {{{media_types}}}}}}}'
+        )
     decorator += ")"
 
     function_def = f"async def {operation_id}("
@@ -542,6 +752,10 @@ def generate_endpoint_implementation(
         function_def += request_param
     if path_param_str:
         function_def += path_param_str
+    if streaming:
+        if not function_def.endswith("("):
+            function_def += ", "
+        function_def += "http_request: Request"
     function_def += f") -> {response_type}:"
 
     docstring = ""
@@ -550,18 +764,30 @@ def generate_endpoint_implementation(
 
     # 実装本体を生成（HTTPメソッドも渡す）
     body = generate_endpoint_body(
-        operation_id, path, request_param, response_type, method
+        operation_id, path, request_param, response_type, method, bool(streaming)
     )
 
     return f"{decorator}\n{function_def}\n{docstring}\n{body}"
 
 
+def _ref_model_name(schema: dict[str, Any], model_names: tuple[str, ...]) -> str:
+    """スキーマの$refが生成済みモデルを指していればモデル名を返します。"""
+    ref = schema.get("$ref")
+    if not ref:
+        return ""
+    name = SchemaResolver.ref_name(ref) or ref.split("/")[-1]
+    if model_names and name not in model_names:
+        return ""
+    return name
+
+
 def generate_endpoint_body(
     operation_id: str,
     path: str,
     request_param: str,
     response_type: str,
     http_method: str,
+    streaming: bool = False,
 ) -> str:
     """エンドポイントの実装本体を生成します。"""
 
@@ -580,10 +806,12 @@ def generate_endpoint_body(
         service_function_name = f"{http_method}_{operation_id}"
 
     # Generate function call with or without parameters
-    if request_param:
-        return f"    return await {service_function_name}_impl(request)"
-    else:
-        return f"    return await {service_function_name}_impl()"
+    call_args = "request" if request_param else ""
+    if streaming:
+        # AcceptヘッダーでSSE / NDJSONを選ぶ
+        accept_arg = 'accept=http_request.headers.get("accept", "")'
+        call_args = f"{call_args}, {accept_arg}" if call_args else accept_arg
+    return f"    return await {service_function_name}_impl({call_args})"
 
 
 def update_services_init_imports():
@@ -613,15 +841,72 @@ def update_services_init_imports():
             import_lines = ["# ruff: noqa: F401"] if impls else []
             for module, func in sorted(impls):
                 import_lines.append(f"from .{module} import {func}")
-            # __init__.pyに書き込み
+            # __init__.pyに書き込み（内容が同じ場合はmtimeを変えないよう書き込まない）
             init_path = tag_dir / "__init__.py"
+            init_content = "\n".join(import_lines) + ("\n" if import_lines else "")
+            if init_path.exists() and init_path.read_text(encoding="utf-8") == (
+                init_content
+            ):
+                continue
             with open(init_path, "w", encoding="utf-8") as f:
-                f.write("\n".join(import_lines) + ("\n" if import_lines else ""))
+                f.write(init_content)
             print(f"✅ {init_path} に_impl関数のimport文を更新しました")
 
 
-def main():
+GENERATION_STEPS = ["models", "router", "services"]
+
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    """コマンドライン引数を解析します。"""
+    parser = argparse.ArgumentParser(
+        description="OpenAPI YAMLからバックエンドコードを生成"
+    )
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=GENERATION_STEPS,
+        default=GENERATION_STEPS,
+        help="指定した成果物のみ生成（generate_all.pyの差分生成で使用）",
+    )
+    parser.add_argument(
+        "--shard-by-tag",
+        action="store_true",
+        help="モデル・ルーターをタグ単位に分割して生成（app/generated/<tag>/）",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="--shard-by-tag時にシャードを並列描画するプロセス数",
+    )
+    return parser.parse_args(argv)
+
+
+def generate_sharded_backend(spec: dict[str, Any], output_dir: Path, jobs: int):
+    """タグ単位に分割したモデル・ルーターを生成し、変更されたファイルを返します。"""
+    import backend_sharding
+
+    previous = backend_sharding.load_shard_manifest()
+    contents = backend_sharding.render_shards(spec, jobs=jobs)
+    written, removed = backend_sharding.write_shards(contents, previous)
+    for path in written:
+        print(
+            f"✅ シャードを生成しました: {path.relative_to(output_dir.parent.parent)}"
+        )
+    for path in removed:
+        print(f"🗑️ 不要になったシャードを削除しました: {path}")
+    if not written and not removed:
+        print("✅ シャードに変更はありません")
+
+    # 整形後のハッシュを記録するため、フォーマット後にマニフェストを保存する
+    format_generated_files(output_dir, written)
+    backend_sharding.save_shard_manifest(backend_sharding.record_shards(contents))
+    return written
+
+
+def main(argv: list[str] = None):
     """メイン処理"""
+    args = parse_args(argv)
     print("🚀 OpenAPI YAML-firstコード生成を開始...")
 
     # パス設定
@@ -644,26 +929,42 @@ def main():
         spec = load_openapi_spec(str(yaml_path))
         print(f"📖 OpenAPI仕様をロードしました: {yaml_path}")
 
-        # モデル生成
-        generate_pydantic_models(spec, str(output_dir))
+        generated_files = []
 
-        # ルーター生成
-        generate_router_stubs(spec, str(output_dir))
+        if args.shard_by_tag:
+            # タグ単位の分割生成（モノリシックなモデル・ルーターの代わり）
+            generate_sharded_backend(spec, output_dir, args.jobs)
+        else:
+            # モデル生成
+            if "models" in args.only:
+                generate_pydantic_models(spec, str(output_dir))
+                generated_files.append(output_dir / "generated_models.py")
+
+            # ルーター生成
+            if "router" in args.only:
+                generate_router_stubs(spec, str(output_dir))
+                generated_files.append(output_dir / "generated_router.py")
 
-        # サービス内に関数生成
-        generate_service_impls(spec)
+        if "services" in args.only:
+            # サービス内に関数生成
+            generate_service_impls(spec)
 
-        # __init__.pyのimport文を更新
-        update_services_init_imports()
+            # __init__.pyのimport文を更新
+            update_services_init_imports()
 
         # 生成されたファイルをフォーマット
-        format_generated_files(output_dir)
+        format_generated_files(output_dir, generated_files)
 
         print("✅ コード生成が完了しました！")
         print()
         print("📁 生成されたファイル:")
-        print(f"  🔧 Pydanticモデル: {output_dir}/generated_models.py")
-        print(f"  🌐 FastAPIルーター: {output_dir}/generated_router.py")
+        if args.shard_by_tag:
+            print(f"  🔧 共通Pydanticモデル: {output_dir}/common_models.py")
+            print(f"  🧩 タグ別モデル・ルーター: {output_dir}/<tag>/")
+            print(f"  🌐 集約ルーター: {output_dir}/sharded_router.py")
+        else:
+            print(f"  🔧 Pydanticモデル: {output_dir}/generated_models.py")
+            print(f"  🌐 FastAPIルーター: {output_dir}/generated_router.py")
         print()
         print("💡 次のステップ:")
         print("  1. 生成されたスタブファイルに実装を追加")
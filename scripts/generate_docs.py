@@ -3,7 +3,7 @@
 ドキュメント生成スクリプト
 
 OpenAPIスキーマから以下を生成：
-1. OpenAPI YAML/JSON ファイル
+1. OpenAPI JSON ファイル（docs/generated/openapi.json、アプリの起動時に読み込む）
 2. TypeScript型定義
 3. 静的HTMLドキュメント（ReDoc）
 4. Swagger UI HTML
@@ -14,6 +14,7 @@ import sys
 from pathlib import Path
 
 import yaml
+from spec_loader import load_openapi_spec
 
 
 def generate_openapi_schema():
@@ -28,17 +29,16 @@ def generate_openapi_schema():
         print(f"❌ OpenAPI仕様ファイルが見つかりません: {source_yaml}")
         return None, None, None
 
-    with open(source_yaml, encoding="utf-8") as f:
-        schema = yaml.safe_load(f)
+    schema = load_openapi_spec(source_yaml)
 
     # generated ディレクトリを作成
     generated_dir = project_root / "docs" / "generated"
     generated_dir.mkdir(parents=True, exist_ok=True)
 
-    # JSON形式で保存
+    # JSON形式で保存（アプリがルートと一致すれば起動時にそのまま使用する）
     json_path = generated_dir / "openapi.json"
     with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(schema, f, indent=2, ensure_ascii=False)
+        f.write(render_openapi_json(schema))
 
     # YAML形式で保存
     yaml_path = generated_dir / "openapi.yaml"
@@ -49,28 +49,22 @@ def generate_openapi_schema():
     return schema, json_path, yaml_path
 
 
+def render_openapi_json(openapi_spec):
+    """アプリが起動時に読み込むOpenAPI JSONの内容を生成（ファイルには書き込まない）"""
+    return json.dumps(openapi_spec, indent=2, ensure_ascii=False) + "\n"
+
+
 def generate_typescript_types(openapi_json_path):
     """TypeScript型定義生成をスキップ（別のスクリプトで実行）"""
     print("⚠️ TypeScript型定義生成は scripts/generate_frontend.py で実行してください")
     return True
 
 
-def generate_redoc_html(openapi_json_path):
-    """ReDoc HTMLドキュメントを生成"""
-    print("📄 ReDoc HTMLドキュメントを生成中...")
-
-    docs_dir = Path(__file__).parent / "generated" / "docs"
-    docs_dir.mkdir(parents=True, exist_ok=True)
-
-    redoc_html_path = docs_dir / "redoc.html"
-
-    # OpenAPIスキーマを読み込んで直接HTMLに埋め込み
-    with open(openapi_json_path, encoding="utf-8") as f:
-        openapi_spec = json.load(f)
-
+def render_redoc_html(openapi_spec):
+    """ReDoc HTMLの内容を生成（ファイルには書き込まない）"""
     formatted_spec = json.dumps(openapi_spec, indent=2, ensure_ascii=False)
 
-    html_content = f"""<!DOCTYPE html>
+    return f"""<!DOCTYPE html>
 <html>
 <head>
     <title>LocalLLM FastAPI Documentation</title>
@@ -96,26 +90,31 @@ def generate_redoc_html(openapi_json_path):
 </html>
 """
 
-    with open(redoc_html_path, "w", encoding="utf-8") as f:
-        f.write(html_content)
-
-    print(f"✅ ReDoc HTMLを生成: {redoc_html_path}")
-
 
-def generate_swagger_html(openapi_json_path):
-    """Swagger UI HTMLドキュメントを生成"""
-    print("📄 Swagger UI HTMLドキュメントを生成中...")
+def generate_redoc_html(openapi_json_path):
+    """ReDoc HTMLドキュメントを生成"""
+    print("📄 ReDoc HTMLドキュメントを生成中...")
 
     docs_dir = Path(__file__).parent / "generated" / "docs"
-    swagger_html_path = docs_dir / "swagger.html"
+    docs_dir.mkdir(parents=True, exist_ok=True)
+
+    redoc_html_path = docs_dir / "redoc.html"
 
     # OpenAPIスキーマを読み込んで直接HTMLに埋め込み
     with open(openapi_json_path, encoding="utf-8") as f:
         openapi_spec = json.load(f)
 
+    with open(redoc_html_path, "w", encoding="utf-8") as f:
+        f.write(render_redoc_html(openapi_spec))
+
+    print(f"✅ ReDoc HTMLを生成: {redoc_html_path}")
+
+
+def render_swagger_html(openapi_spec):
+    """Swagger UI HTMLの内容を生成（ファイルには書き込まない）"""
     formatted_spec = json.dumps(openapi_spec, indent=2, ensure_ascii=False)
 
-    html_content = f"""<!DOCTYPE html>
+    return f"""<!DOCTYPE html>
 <html>
 <head>
     <title>LocalLLM FastAPI - Swagger UI</title>
@@ -161,8 +160,20 @@ def generate_swagger_html(openapi_json_path):
 </html>
 """
 
+
+def generate_swagger_html(openapi_json_path):
+    """Swagger UI HTMLドキュメントを生成"""
+    print("📄 Swagger UI HTMLドキュメントを生成中...")
+
+    docs_dir = Path(__file__).parent / "generated" / "docs"
+    swagger_html_path = docs_dir / "swagger.html"
+
+    # OpenAPIスキーマを読み込んで直接HTMLに埋め込み
+    with open(openapi_json_path, encoding="utf-8") as f:
+        openapi_spec = json.load(f)
+
     with open(swagger_html_path, "w", encoding="utf-8") as f:
-        f.write(html_content)
+        f.write(render_swagger_html(openapi_spec))
 
     print(f"✅ Swagger UI HTMLを生成: {swagger_html_path}")
 
@@ -172,7 +183,7 @@ def main():
     print("🚀 ドキュメント生成を開始...")
 
     try:
-        # 1. OpenAPIスキーマ生成（HTMLファイル生成用の一時ファイル）
+        # 1. OpenAPIスキーマ生成（JSONは起動時用に残し、YAMLは一時ファイル）
         schema, json_path, yaml_path = generate_openapi_schema()
 
         # 2. TypeScript型定義生成
@@ -184,19 +195,14 @@ def main():
         # 4. Swagger UI HTML生成
         generate_swagger_html(json_path)
 
-        # 5.一時ファイル削除
-        if json_path.exists():
-            json_path.unlink()
+        # 5.一時ファイル削除（openapi.jsonはアプリの起動時に使うため残す）
         if yaml_path.exists():
             yaml_path.unlink()
 
-        # 6.空のディレクトリを削除
-        if json_path.parent.exists() and not any(json_path.parent.iterdir()):
-            json_path.parent.rmdir()
-
         print("\n🎉 すべてのドキュメント生成が完了しました！")
         print("\n📁 生成されたファイル:")
         print("  - TypeScript型: scripts/generated/api-types.ts")
+        print("  - OpenAPI JSON: docs/generated/openapi.json")
         print("  - ReDoc HTML: scripts/generated/docs/redoc.html")
         print("  - Swagger HTML: scripts/generated/docs/swagger.html")
         print("\n💡 ドキュメントの使い分け:")
@@ -11,15 +11,22 @@ import subprocess
 import sys
 import time
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 
+import fragment_cache
+import spec_loader
 import yaml
+from schema_resolver import (
+    SchemaResolver,
+    is_nullable,
+    non_null_type,
+    streaming_media_types,
+)
 
 
 def load_openapi_spec(yaml_path: str) -> dict[str, Any]:
-    """OpenAPI YAML仕様をロードします。"""
-    with open(yaml_path, encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    """OpenAPI YAML仕様をロードします（Cローダー＋解析結果キャッシュを使用）。"""
+    return spec_loader.load_openapi_spec(yaml_path)
 
 
 def format_generated_python_files() -> None:
@@ -82,9 +89,64 @@ def format_generated_python_files() -> None:
         print(f"⚠️  フォーマットに失敗しましたが、生成は完了しています: {e}")
 
 
-def convert_openapi_type_to_typescript(prop_def: dict[str, Any]) -> str:
-    """OpenAPIプロパティ定義をTypeScript型に変換します。"""
-    prop_type = prop_def.get("type", "any")
+def convert_openapi_type_to_typescript(
+    prop_def: dict[str, Any],
+    resolver: Optional[SchemaResolver] = None,
+    _expanding: frozenset = frozenset(),
+) -> str:
+    """OpenAPIプロパティ定義をTypeScript型に変換します。
+
+    resolverを渡すと$ref・allOf/oneOf・nullableを解決します。
+    """
+    ts_type = _convert_typescript_type(prop_def, resolver, _expanding)
+    if resolver is not None and ts_type != "any" and is_nullable(prop_def):
+        if not ts_type.endswith(" | null"):
+            return f"{ts_type} | null"
+    return ts_type
+
+
+def _convert_typescript_type(
+    prop_def: dict[str, Any],
+    resolver: Optional[SchemaResolver],
+    expanding: frozenset,
+) -> str:
+    ref = prop_def.get("$ref")
+    if ref and resolver is not None:
+        name = resolver.ref_name(ref)
+        if name in resolver.schemas and resolver.is_object_schema(
+            resolver.schemas[name]
+        ):
+            return name
+        if ref in expanding:
+            return "any"  # インターフェース化されないスキーマ同士の循環
+        # インターフェース化されないスキーマ（enumや配列の別名など）は参照先の型を展開
+        return convert_openapi_type_to_typescript(
+            resolver.deref(prop_def), resolver, expanding | {ref}
+        )
+
+    if resolver is not None:
+        one_of = prop_def.get("oneOf")
+        if one_of:
+            types = []
+            for option in one_of:
+                if option.get("type") == "null":
+                    continue
+                option_type = convert_openapi_type_to_typescript(
+                    option, resolver, expanding
+                )
+                if option_type not in types:
+                    types.append(option_type)
+            return " | ".join(types) if types else "any"
+        all_of = prop_def.get("allOf")
+        if all_of:
+            types = [
+                convert_openapi_type_to_typescript(part, resolver, expanding)
+                for part in all_of
+            ]
+            return " & ".join(types)
+
+    prop_type = non_null_type(prop_def) if resolver is not None else None
+    prop_type = prop_type or prop_def.get("type", "any")
     prop_format = prop_def.get("format")
 
     if prop_type == "string":
@@ -102,7 +164,11 @@ def convert_openapi_type_to_typescript(prop_def: dict[str, Any]) -> str:
     elif prop_type == "boolean":
         return "boolean"
     elif prop_type == "array":
-        item_type = convert_openapi_type_to_typescript(prop_def.get("items", {}))
+        item_type = convert_openapi_type_to_typescript(
+            prop_def.get("items", {}), resolver, expanding
+        )
+        if " " in item_type:
+            return f"({item_type})[]"  # ユニオン/交差型は括弧で囲む
         return f"{item_type}[]"
     elif prop_type == "object":
         # additionalPropertiesがある場合
@@ -115,8 +181,7 @@ def convert_openapi_type_to_typescript(prop_def: dict[str, Any]) -> str:
             return "Record<string, any>"  # 簡略化
         return "Record<string, any>"
     else:
-        # $refの処理
-        ref = prop_def.get("$ref")
+        # $refの処理（resolverなしの場合は参照名をそのまま使用）
         if ref:
             return ref.split("/")[-1]
         # anyOfの処理
@@ -126,13 +191,23 @@ def convert_openapi_type_to_typescript(prop_def: dict[str, Any]) -> str:
             for option in any_of:
                 if option.get("type") == "null":
                     continue  # nullは後でOptionalとして処理
-                types.append(convert_openapi_type_to_typescript(option))
+                types.append(
+                    convert_openapi_type_to_typescript(option, resolver, expanding)
+                )
             return " | ".join(types) if types else "any"
         return "any"
 
 
-def generate_typescript_interface(name: str, schema: dict[str, Any]) -> str:
-    """単一のTypeScriptインターフェースを生成します。"""
+@fragment_cache.memoize
+def generate_typescript_interface(
+    name: str,
+    schema: dict[str, Any],
+    field_types: Optional[dict[str, str]] = None,
+) -> str:
+    """単一のTypeScriptインターフェースを生成します。
+
+    field_typesには$ref解決済みのプロパティ型を渡せます（省略時はその場で変換）。
+    """
     description = schema.get("description", "")
     properties = schema.get("properties", {})
     required = schema.get("required", [])
@@ -146,7 +221,10 @@ def generate_typescript_interface(name: str, schema: dict[str, Any]) -> str:
 
     for prop_name, prop_def in properties.items():
         is_required = prop_name in required
-        prop_type = convert_openapi_type_to_typescript(prop_def)
+        if field_types is not None and prop_name in field_types:
+            prop_type = field_types[prop_name]
+        else:
+            prop_type = convert_openapi_type_to_typescript(prop_def)
         prop_description = prop_def.get("description", "")
 
         # anyOfでnullが含まれている場合の処理
@@ -187,6 +265,7 @@ def generate_api_methods_from_spec(spec: dict[str, Any]) -> str:
     """OpenAPI仕様からapiMethodsオブジェクトを動的生成します。"""
     methods = []
     paths = spec.get("paths", {})
+    resolver = SchemaResolver(spec)
 
     for _path, methods_dict in paths.items():
         for method, operation in methods_dict.items():
@@ -215,33 +294,42 @@ def generate_api_methods_from_spec(spec: dict[str, Any]) -> str:
                     content = request_body.get("content", {})
                     json_content = content.get("application/json", {})
                     schema = json_content.get("schema", {})
-                    ref = schema.get("$ref")
-                    if ref:
-                        request_type = ref.split("/")[-1]
+                    if schema.get("$ref"):
+                        request_type = convert_openapi_type_to_typescript(
+                            schema, resolver
+                        )
 
                 # Check for response type
                 responses = operation.get("responses", {})
                 success_response = responses.get("200", {})
                 content = success_response.get("content", {})
-                json_content = content.get("application/json", {})
+                # SSE / NDJSONのレスポンスはイベント型の非同期イテレーターとして返す
+                streaming = streaming_media_types(operation)
+                response_media_type = streaming[0] if streaming else "application/json"
+                json_content = content.get(response_media_type, {})
                 schema = json_content.get("schema", {})
-                ref = schema.get("$ref")
-                if ref:
-                    response_type = ref.split("/")[-1]
+                if schema.get("$ref"):
+                    response_type = convert_openapi_type_to_typescript(schema, resolver)
 
                 # Generate endpoint constant name
                 endpoint_constant = operation_id.upper()
 
                 # Generate method implementation
-                if request_type:
-                    method_impl = f"""  {method_name}: (request: {request_type}): Promise<{response_type}> => {{
-    const client = createApiClient(process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000');
-    return client.{method.lower()}(API_ENDPOINTS.{endpoint_constant}, request);
+                if streaming:
+                    request_arg = f"request: {request_type}, " if request_type else ""
+                    data_arg = "request" if request_type else "undefined"
+                    method_impl = f"""  {method_name}: ({request_arg}options?: StreamOptions): AsyncGenerator<{response_type}> => {{
+    return getApiClient().stream<{response_type}>(API_ENDPOINTS.{endpoint_constant}, {data_arg}, options);
+  }}"""
+                elif request_type:
+                    method_impl = f"""  {method_name}: (request: {request_type}, options?: RequestOptions): Promise<{response_type}> => {{
+    return getApiClient().{method.lower()}(API_ENDPOINTS.{endpoint_constant}, request, options);
   }}"""
                 else:
-                    method_impl = f"""  {method_name}: (): Promise<{response_type}> => {{
-    const client = createApiClient(process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000');
-    return client.{method.lower()}(API_ENDPOINTS.{endpoint_constant});
+                    # ボディを取るメソッドはボディなし（undefined）の後にオプションを渡す
+                    no_body = "undefined, " if method.lower() in ("post", "put") else ""
+                    method_impl = f"""  {method_name}: (options?: RequestOptions): Promise<{response_type}> => {{
+    return getApiClient().{method.lower()}(API_ENDPOINTS.{endpoint_constant}, {no_body}options);
   }}"""
 
                 methods.append(method_impl)
@@ -249,8 +337,8 @@ def generate_api_methods_from_spec(spec: dict[str, Any]) -> str:
     return ",\n\n".join(methods)
 
 
-def generate_typescript_types(spec: dict[str, Any], output_path: str) -> None:
-    """TypeScript型定義ファイルを生成します。"""
+def render_typescript_types(spec: dict[str, Any]) -> str:
+    """TypeScript型定義ファイルの内容を生成します（ファイルには書き込みません）。"""
     content = f"""// OpenAPI YAML仕様から自動生成されたTypeScript型定義
 // 生成日時: {time.strftime("%Y-%m-%d %H:%M:%S")}
 // ソース: source/openapi.yaml
@@ -266,13 +354,23 @@ export interface ApiResponse<T> {{
 
 """
 
-    # スキーマからインターフェースを生成
-    schemas = spec.get("components", {}).get("schemas", {})
-
-    for schema_name, schema_def in schemas.items():
-        if schema_def.get("type") == "object":
-            interface_code = generate_typescript_interface(schema_name, schema_def)
-            content += interface_code + "\n"
+    # スキーマからインターフェースを生成（allOfは継承元のプロパティを展開）
+    resolver = SchemaResolver(spec)
+
+    for schema_name in resolver.emission_order():
+        schema_def = resolver.schemas[schema_name]
+        if not resolver.is_object_schema(schema_def):
+            continue
+        if "allOf" in schema_def:
+            schema_def = resolver.merged_object(schema_name)
+        field_types = {
+            prop_name: convert_openapi_type_to_typescript(prop_def, resolver)
+            for prop_name, prop_def in schema_def.get("properties", {}).items()
+        }
+        interface_code = generate_typescript_interface(
+            schema_name, schema_def, field_types
+        )
+        content += interface_code + "\n"
 
     # API エンドポイント定数
     endpoints = extract_api_endpoints(spec)
@@ -294,8 +392,21 @@ export type HttpMethod = 'GET' | 'POST' | 'PUT' | 'DELETE' | 'PATCH';
 // API クライアント設定
 export interface ApiClientConfig {
   baseUrl: string;
+  // 1回の呼び出しのタイムアウト（ミリ秒、0で無効）
   timeout?: number;
   headers?: Record<string, string>;
+  // GETの応答をキャッシュする既定の期間（ミリ秒、0でキャッシュしない）
+  staleTime?: number;
+}
+
+// 1回の呼び出しのオプション
+export interface RequestOptions {
+  // 呼び出し元の中断（同じGETを待つほかの呼び出し元には影響しない）
+  signal?: AbortSignal;
+  // タイムアウト（ミリ秒、省略時はApiClientConfig.timeout）
+  timeout?: number;
+  // GETの応答をキャッシュする期間（ミリ秒、省略時はApiClientConfig.staleTime）
+  staleTime?: number;
 }
 
 // API エラー型
@@ -304,9 +415,36 @@ export interface ApiError {
   status_code?: number;
 }
 
+// ストリーミングAPIのオプション
+export interface StreamOptions {
+  // 'sse'（Server-Sent Events、既定）または 'ndjson'
+  format?: 'sse' | 'ndjson';
+  signal?: AbortSignal;
+}
+
+// 呼び出し元のsignalが中断されたら、共有のPromiseを待たずに中断のエラーで終える
+function withSignal<T>(promise: Promise<T>, signal?: AbortSignal): Promise<T> {
+  if (!signal) {
+    return promise;
+  }
+  if (signal.aborted) {
+    return Promise.reject(signal.reason);
+  }
+  return new Promise<T>((resolve, reject) => {
+    const onAbort = () => reject(signal.reason);
+    signal.addEventListener('abort', onAbort, { once: true });
+    promise.then(resolve, reject).finally(() => {
+      signal.removeEventListener('abort', onAbort);
+    });
+  });
+}
+
 // fetchベースのAPIクライアントクラス
+// 同じGETの同時の呼び出しは1回のfetchにまとめ、staleTimeの間は応答をキャッシュする
 export class ApiClient {
   private config: ApiClientConfig;
+  private inFlight = new Map<string, Promise<unknown>>();
+  private cache = new Map<string, { data: unknown; expiresAt: number }>();
 
   constructor(config: ApiClientConfig) {
     this.config = config;
@@ -315,9 +453,69 @@ export class ApiClient {
   async request<T>(
     endpoint: ApiEndpoint,
     method: HttpMethod = 'GET',
-    data?: any
+    data?: any,
+    options: RequestOptions = {}
   ): Promise<T> {
-    const url = `${this.config.baseUrl}${endpoint}`;
+    const timeout = options.timeout ?? this.config.timeout ?? 0;
+    if (method !== 'GET') {
+      return this.fetchJson<T>(endpoint, method, data, timeout, options.signal);
+    }
+
+    const staleTime = options.staleTime ?? this.config.staleTime ?? 0;
+    const cached = this.cache.get(endpoint);
+    if (cached && cached.expiresAt > Date.now()) {
+      return cached.data as T;
+    }
+    let shared = this.inFlight.get(endpoint) as Promise<T> | undefined;
+    if (!shared) {
+      // 共有のfetchは呼び出し元のsignalではなく、タイムアウトでのみ中断する
+      const fetching: Promise<T> = this.fetchJson<T>(endpoint, 'GET', undefined, timeout)
+        .then((result) => {
+          // invalidate()で外された取得の応答（無効化前の内容）はキャッシュしない
+          if (staleTime > 0 && this.inFlight.get(endpoint) === fetching) {
+            this.cache.set(endpoint, { data: result, expiresAt: Date.now() + staleTime });
+          }
+          return result;
+        })
+        .finally(() => {
+          if (this.inFlight.get(endpoint) === fetching) {
+            this.inFlight.delete(endpoint);
+          }
+        });
+      this.inFlight.set(endpoint, fetching);
+      shared = fetching;
+    }
+    return withSignal(shared, options.signal);
+  }
+
+  // GETの応答のキャッシュを削除する（endpoint省略時はすべて）
+  // 取得中のGETも外し、以降の呼び出しは新しく取得する
+  invalidate(endpoint?: ApiEndpoint): void {
+    if (endpoint === undefined) {
+      this.cache.clear();
+      this.inFlight.clear();
+    } else {
+      this.cache.delete(endpoint);
+      this.inFlight.delete(endpoint);
+    }
+  }
+
+  private async fetchJson<T>(
+    endpoint: ApiEndpoint,
+    method: HttpMethod,
+    data: any,
+    timeout: number,
+    signal?: AbortSignal
+  ): Promise<T> {
+    const controller = new AbortController();
+    const abort = () => controller.abort(signal?.reason);
+    if (signal?.aborted) {
+      abort();
+    }
+    signal?.addEventListener('abort', abort, { once: true });
+    const timer = timeout > 0
+      ? setTimeout(() => controller.abort(new Error(`Request timed out after ${timeout}ms`)), timeout)
+      : undefined;
 
     const options: RequestInit = {
       method,
@@ -325,46 +523,117 @@ export class ApiClient {
         'Content-Type': 'application/json',
         ...this.config.headers,
       },
+      signal: controller.signal,
     };
 
     if (data && (method === 'POST' || method === 'PUT' || method === 'PATCH')) {
       options.body = JSON.stringify(data);
     }
 
-    const response = await fetch(url, options);
-
-    if (!response.ok) {
-      let errorDetail = `HTTP error! status: ${response.status}`;
-      try {
-        const errorData = await response.json();
-        errorDetail = errorData.detail || errorDetail;
-      } catch (e) {
-        // JSON パースエラーの場合はデフォルトメッセージを使用
+    try {
+      const response = await fetch(`${this.config.baseUrl}${endpoint}`, options);
+
+      if (!response.ok) {
+        let errorDetail = `HTTP error! status: ${response.status}`;
+        try {
+          const errorData = await response.json();
+          errorDetail = errorData.detail || errorDetail;
+        } catch (e) {
+          // JSON パースエラーの場合はデフォルトメッセージを使用
+        }
+        throw new Error(errorDetail);
       }
-      throw new Error(errorDetail);
-    }
 
-    return response.json();
+      return await response.json();
+    } finally {
+      clearTimeout(timer);
+      signal?.removeEventListener('abort', abort);
+    }
   }
 
   // GETリクエスト用のヘルパーメソッド
-  async get<T>(endpoint: ApiEndpoint): Promise<T> {
-    return this.request<T>(endpoint, 'GET');
+  async get<T>(endpoint: ApiEndpoint, options?: RequestOptions): Promise<T> {
+    return this.request<T>(endpoint, 'GET', undefined, options);
   }
 
   // POSTリクエスト用のヘルパーメソッド
-  async post<T>(endpoint: ApiEndpoint, data?: any): Promise<T> {
-    return this.request<T>(endpoint, 'POST', data);
+  async post<T>(endpoint: ApiEndpoint, data?: any, options?: RequestOptions): Promise<T> {
+    return this.request<T>(endpoint, 'POST', data, options);
   }
 
   // PUTリクエスト用のヘルパーメソッド
-  async put<T>(endpoint: ApiEndpoint, data: any): Promise<T> {
-    return this.request<T>(endpoint, 'PUT', data);
+  async put<T>(endpoint: ApiEndpoint, data: any, options?: RequestOptions): Promise<T> {
+    return this.request<T>(endpoint, 'PUT', data, options);
   }
 
   // DELETEリクエスト用のヘルパーメソッド
-  async delete<T>(endpoint: ApiEndpoint): Promise<T> {
-    return this.request<T>(endpoint, 'DELETE');
+  async delete<T>(endpoint: ApiEndpoint, options?: RequestOptions): Promise<T> {
+    return this.request<T>(endpoint, 'DELETE', undefined, options);
+  }
+
+  // SSE / NDJSONのストリーミングレスポンスを受信したイベントごとに返す
+  async *stream<T>(
+    endpoint: ApiEndpoint,
+    data?: any,
+    options: StreamOptions = {}
+  ): AsyncGenerator<T> {
+    const format = options.format ?? 'sse';
+    const response = await fetch(`${this.config.baseUrl}${endpoint}`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        Accept: format === 'ndjson' ? 'application/x-ndjson' : 'text/event-stream',
+        ...this.config.headers,
+      },
+      body: data === undefined ? undefined : JSON.stringify(data),
+      signal: options.signal,
+    });
+
+    if (!response.ok || !response.body) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    // SSEは空行、NDJSONは改行でイベントを区切る
+    const separator = format === 'ndjson' ? '\\n' : '\\n\\n';
+    const parse = (frame: string): T | undefined => {
+      const payload = format === 'ndjson'
+        ? frame
+        : frame
+            .split('\\n')
+            .filter((line) => line.startsWith('data:'))
+            .map((line) => line.slice(5).trimStart())
+            .join('\\n');
+      return payload.trim() ? (JSON.parse(payload) as T) : undefined;
+    };
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    try {
+      while (true) {
+        const { done, value } = await reader.read();
+        buffer += decoder.decode(value, { stream: !done });
+        let boundary = buffer.indexOf(separator);
+        while (boundary !== -1) {
+          const event = parse(buffer.slice(0, boundary));
+          buffer = buffer.slice(boundary + separator.length);
+          if (event !== undefined) {
+            yield event;
+          }
+          boundary = buffer.indexOf(separator);
+        }
+        if (done) {
+          break;
+        }
+      }
+      const last = parse(buffer);
+      if (last !== undefined) {
+        yield last;
+      }
+    } finally {
+      // 途中でイテレーションをやめた場合も接続を閉じ、サーバー側の生成を止める
+      await reader.cancel().catch(() => undefined);
+    }
   }
 }
 
@@ -377,6 +646,16 @@ export function createApiClient(baseUrl: string, options?: Partial<ApiClientConf
   });
 }
 
+// apiMethodsが共有するAPIクライアント（プロセスごとに1つ、最初の呼び出しで作成）
+let sharedApiClient: ApiClient | undefined;
+
+export function getApiClient(): ApiClient {
+  if (!sharedApiClient) {
+    sharedApiClient = createApiClient(process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000');
+  }
+  return sharedApiClient;
+}
+
 // Next.js用のカスタムフック型定義（React Query/SWR等で使用）
 export interface UseApiOptions {
   enabled?: boolean;
@@ -400,12 +679,16 @@ export const apiMethods = {
 } as const;
 """
 
-    # ファイルに出力
+    return content
+
+
+def generate_typescript_types(spec: dict[str, Any], output_path: str) -> None:
+    """TypeScript型定義ファイルを生成します。"""
     output_file = Path(output_path)
     output_file.parent.mkdir(parents=True, exist_ok=True)
 
     with open(output_file, "w", encoding="utf-8") as f:
-        f.write(content)
+        f.write(render_typescript_types(spec))
 
     print(f"✅ TypeScript型定義を生成しました: {output_file}")
 
@@ -1,5 +1,5 @@
 // OpenAPI YAML仕様から自動生成されたTypeScript型定義
-// 生成日時: 2025-06-23 16:39:06
+// 生成日時: 2026-10-17 03:33:34
 // ソース: source/openapi.yaml
 //
 // 手動で編集しないでください。source/openapi.yamlを編集してから再生成してください。
@@ -30,10 +30,14 @@ export interface DetailedHealthResponse {
 export interface GenerateTextRequest {
   /** テキスト生成用のプロンプト */
   prompt: string;
-  /** 生成テキストの最大長 */
+  /** 生成するトークン数の上限（生成ループ内で打ち切り） */
   max_length?: number;
   /** テキスト生成の温度パラメータ */
   temperature?: number;
+  /** 温度が0より大きくても結果キャッシュを使う（温度0では常に使用） */
+  cache?: boolean;
+  /** 生成を打ち切る文字列（出力には含めない） */
+  stop?: string[];
 }
 
 export interface GenerateTextResponse {
@@ -44,6 +48,24 @@ export interface GenerateTextResponse {
   metadata?: Record<string, any>;
 }
 
+/**
+ * ストリーミング生成の1イベント（tokenの後にdoneかerrorを1回）
+ */
+export interface GenerateTextStreamEvent {
+  /** イベント種別 */
+  event: "token" | "done" | "error";
+  /** トークンの通し番号（tokenイベント） */
+  index?: number;
+  /** 新たに生成されたテキスト（tokenイベント） */
+  token?: string;
+  /** 生成されたテキスト全体（doneイベント） */
+  generated_text?: string;
+  /** 生成メタデータ（doneイベント） */
+  metadata?: Record<string, any>;
+  /** エラーの詳細（errorイベント） */
+  detail?: string;
+}
+
 export interface EchoTextRequest {
   /** エコー対象のテキスト */
   text: string;
@@ -57,9 +79,39 @@ export interface EchoTextResponse {
   timestamp: string;
 }
 
+export interface EchoTextBatchRequest {
+  /** 分析対象のテキスト（1件あたり最大10000文字） */
+  texts: string[];
+}
+
+export interface EchoTextBatchResponse {
+  /** 各テキストの分析結果（EchoTextResponse.analysisと同じ形式、入力順） */
+  results: (Record<string, any>)[];
+  /** 処理時刻 */
+  timestamp: string;
+}
+
 export interface WeatherRequest {
   /** 都市名 */
   city: string;
+  /** 国コード（ISO 3166-1 alpha-2、同名の都市を区別する） */
+  country_code?: string;
+}
+
+/**
+ * 一括取得の1件のリクエスト
+ */
+export interface ExternalBatchItem {
+  /** 結果と対応付けるための任意の識別子（そのまま結果に含める） */
+  id?: string;
+  /** 取得するデータ */
+  operation: "weather" | "quote" | "fact" | "joke";
+  weather?: WeatherRequest;
+}
+
+export interface ExternalBatchRequest {
+  /** 取得するリクエスト（並行して実行） */
+  requests: ExternalBatchItem[];
 }
 
 export interface WeatherResponse {
@@ -98,6 +150,33 @@ export interface JokeResponse {
   type: "programming" | "dev" | "tech";
 }
 
+/**
+ * 一括取得の1件の結果（operationに対応する項目か、errorのどちらか）
+ */
+export interface ExternalBatchResult {
+  /** リクエストの識別子 */
+  id?: string;
+  /** 取得したデータ */
+  operation: "weather" | "quote" | "fact" | "joke";
+  /** 個別のエンドポイントを呼んだ場合のHTTPステータス */
+  status: number;
+  weather?: WeatherResponse;
+  quote?: QuoteResponse;
+  fact?: FactResponse;
+  joke?: JokeResponse;
+  /** エラーの詳細（失敗した場合） */
+  error?: string;
+}
+
+export interface ExternalBatchResponse {
+  /** 各リクエストの結果（入力順） */
+  results: ExternalBatchResult[];
+  /** 成功した件数 */
+  succeeded: number;
+  /** 失敗した件数 */
+  failed: number;
+}
+
 export interface ErrorResponse {
   /** エラーの詳細 */
   detail: string;
@@ -112,11 +191,14 @@ export const API_ENDPOINTS = {
   HEALTH_CHECK: '/api/v1/health/',
   DETAILED_HEALTH_CHECK: '/api/v1/health/detailed',
   GENERATE_TEXT: '/api/v1/text/generate',
+  GENERATE_TEXT_STREAM: '/api/v1/text/generate/stream',
   ECHO_TEXT: '/api/v1/text/echo',
+  ECHO_TEXT_BATCH: '/api/v1/text/echo/batch',
   GET_WEATHER: '/api/v1/external/weather',
   GET_RANDOM_QUOTE: '/api/v1/external/quote',
   GET_RANDOM_FACT: '/api/v1/external/fact',
   GET_PROGRAMMING_JOKE: '/api/v1/external/joke',
+  FETCH_EXTERNAL_BATCH: '/api/v1/external/batch',
   GENERATE_TEXT_LEGACY: '/generate',
 } as const;
 
@@ -129,8 +211,21 @@ export type HttpMethod = 'GET' | 'POST' | 'PUT' | 'DELETE' | 'PATCH';
 // API クライアント設定
 export interface ApiClientConfig {
   baseUrl: string;
+  // 1回の呼び出しのタイムアウト（ミリ秒、0で無効）
   timeout?: number;
   headers?: Record<string, string>;
+  // GETの応答をキャッシュする既定の期間（ミリ秒、0でキャッシュしない）
+  staleTime?: number;
+}
+
+// 1回の呼び出しのオプション
+export interface RequestOptions {
+  // 呼び出し元の中断（同じGETを待つほかの呼び出し元には影響しない）
+  signal?: AbortSignal;
+  // タイムアウト（ミリ秒、省略時はApiClientConfig.timeout）
+  timeout?: number;
+  // GETの応答をキャッシュする期間（ミリ秒、省略時はApiClientConfig.staleTime）
+  staleTime?: number;
 }
 
 // API エラー型
@@ -139,9 +234,36 @@ export interface ApiError {
   status_code?: number;
 }
 
+// ストリーミングAPIのオプション
+export interface StreamOptions {
+  // 'sse'（Server-Sent Events、既定）または 'ndjson'
+  format?: 'sse' | 'ndjson';
+  signal?: AbortSignal;
+}
+
+// 呼び出し元のsignalが中断されたら、共有のPromiseを待たずに中断のエラーで終える
+function withSignal<T>(promise: Promise<T>, signal?: AbortSignal): Promise<T> {
+  if (!signal) {
+    return promise;
+  }
+  if (signal.aborted) {
+    return Promise.reject(signal.reason);
+  }
+  return new Promise<T>((resolve, reject) => {
+    const onAbort = () => reject(signal.reason);
+    signal.addEventListener('abort', onAbort, { once: true });
+    promise.then(resolve, reject).finally(() => {
+      signal.removeEventListener('abort', onAbort);
+    });
+  });
+}
+
 // fetchベースのAPIクライアントクラス
+// 同じGETの同時の呼び出しは1回のfetchにまとめ、staleTimeの間は応答をキャッシュする
 export class ApiClient {
   private config: ApiClientConfig;
+  private inFlight = new Map<string, Promise<unknown>>();
+  private cache = new Map<string, { data: unknown; expiresAt: number }>();
 
   constructor(config: ApiClientConfig) {
     this.config = config;
@@ -150,9 +272,69 @@ export class ApiClient {
   async request<T>(
     endpoint: ApiEndpoint,
     method: HttpMethod = 'GET',
-    data?: any
+    data?: any,
+    options: RequestOptions = {}
   ): Promise<T> {
-    const url = `${this.config.baseUrl}${endpoint}`;
+    const timeout = options.timeout ?? this.config.timeout ?? 0;
+    if (method !== 'GET') {
+      return this.fetchJson<T>(endpoint, method, data, timeout, options.signal);
+    }
+
+    const staleTime = options.staleTime ?? this.config.staleTime ?? 0;
+    const cached = this.cache.get(endpoint);
+    if (cached && cached.expiresAt > Date.now()) {
+      return cached.data as T;
+    }
+    let shared = this.inFlight.get(endpoint) as Promise<T> | undefined;
+    if (!shared) {
+      // 共有のfetchは呼び出し元のsignalではなく、タイムアウトでのみ中断する
+      const fetching: Promise<T> = this.fetchJson<T>(endpoint, 'GET', undefined, timeout)
+        .then((result) => {
+          // invalidate()で外された取得の応答（無効化前の内容）はキャッシュしない
+          if (staleTime > 0 && this.inFlight.get(endpoint) === fetching) {
+            this.cache.set(endpoint, { data: result, expiresAt: Date.now() + staleTime });
+          }
+          return result;
+        })
+        .finally(() => {
+          if (this.inFlight.get(endpoint) === fetching) {
+            this.inFlight.delete(endpoint);
+          }
+        });
+      this.inFlight.set(endpoint, fetching);
+      shared = fetching;
+    }
+    return withSignal(shared, options.signal);
+  }
+
+  // GETの応答のキャッシュを削除する（endpoint省略時はすべて）
+  // 取得中のGETも外し、以降の呼び出しは新しく取得する
+  invalidate(endpoint?: ApiEndpoint): void {
+    if (endpoint === undefined) {
+      this.cache.clear();
+      this.inFlight.clear();
+    } else {
+      this.cache.delete(endpoint);
+      this.inFlight.delete(endpoint);
+    }
+  }
+
+  private async fetchJson<T>(
+    endpoint: ApiEndpoint,
+    method: HttpMethod,
+    data: any,
+    timeout: number,
+    signal?: AbortSignal
+  ): Promise<T> {
+    const controller = new AbortController();
+    const abort = () => controller.abort(signal?.reason);
+    if (signal?.aborted) {
+      abort();
+    }
+    signal?.addEventListener('abort', abort, { once: true });
+    const timer = timeout > 0
+      ? setTimeout(() => controller.abort(new Error(`Request timed out after ${timeout}ms`)), timeout)
+      : undefined;
 
     const options: RequestInit = {
       method,
@@ -160,46 +342,117 @@ export class ApiClient {
         'Content-Type': 'application/json',
         ...this.config.headers,
       },
+      signal: controller.signal,
     };
 
     if (data && (method === 'POST' || method === 'PUT' || method === 'PATCH')) {
       options.body = JSON.stringify(data);
     }
 
-    const response = await fetch(url, options);
-
-    if (!response.ok) {
-      let errorDetail = `HTTP error! status: ${response.status}`;
-      try {
-        const errorData = await response.json();
-        errorDetail = errorData.detail || errorDetail;
-      } catch (e) {
-        // JSON パースエラーの場合はデフォルトメッセージを使用
+    try {
+      const response = await fetch(`${this.config.baseUrl}${endpoint}`, options);
+
+      if (!response.ok) {
+        let errorDetail = `HTTP error! status: ${response.status}`;
+        try {
+          const errorData = await response.json();
+          errorDetail = errorData.detail || errorDetail;
+        } catch (e) {
+          // JSON パースエラーの場合はデフォルトメッセージを使用
+        }
+        throw new Error(errorDetail);
       }
-      throw new Error(errorDetail);
-    }
 
-    return response.json();
+      return await response.json();
+    } finally {
+      clearTimeout(timer);
+      signal?.removeEventListener('abort', abort);
+    }
   }
 
   // GETリクエスト用のヘルパーメソッド
-  async get<T>(endpoint: ApiEndpoint): Promise<T> {
-    return this.request<T>(endpoint, 'GET');
+  async get<T>(endpoint: ApiEndpoint, options?: RequestOptions): Promise<T> {
+    return this.request<T>(endpoint, 'GET', undefined, options);
   }
 
   // POSTリクエスト用のヘルパーメソッド
-  async post<T>(endpoint: ApiEndpoint, data?: any): Promise<T> {
-    return this.request<T>(endpoint, 'POST', data);
+  async post<T>(endpoint: ApiEndpoint, data?: any, options?: RequestOptions): Promise<T> {
+    return this.request<T>(endpoint, 'POST', data, options);
   }
 
   // PUTリクエスト用のヘルパーメソッド
-  async put<T>(endpoint: ApiEndpoint, data: any): Promise<T> {
-    return this.request<T>(endpoint, 'PUT', data);
+  async put<T>(endpoint: ApiEndpoint, data: any, options?: RequestOptions): Promise<T> {
+    return this.request<T>(endpoint, 'PUT', data, options);
   }
 
   // DELETEリクエスト用のヘルパーメソッド
-  async delete<T>(endpoint: ApiEndpoint): Promise<T> {
-    return this.request<T>(endpoint, 'DELETE');
+  async delete<T>(endpoint: ApiEndpoint, options?: RequestOptions): Promise<T> {
+    return this.request<T>(endpoint, 'DELETE', undefined, options);
+  }
+
+  // SSE / NDJSONのストリーミングレスポンスを受信したイベントごとに返す
+  async *stream<T>(
+    endpoint: ApiEndpoint,
+    data?: any,
+    options: StreamOptions = {}
+  ): AsyncGenerator<T> {
+    const format = options.format ?? 'sse';
+    const response = await fetch(`${this.config.baseUrl}${endpoint}`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        Accept: format === 'ndjson' ? 'application/x-ndjson' : 'text/event-stream',
+        ...this.config.headers,
+      },
+      body: data === undefined ? undefined : JSON.stringify(data),
+      signal: options.signal,
+    });
+
+    if (!response.ok || !response.body) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    // SSEは空行、NDJSONは改行でイベントを区切る
+    const separator = format === 'ndjson' ? '\n' : '\n\n';
+    const parse = (frame: string): T | undefined => {
+      const payload = format === 'ndjson'
+        ? frame
+        : frame
+            .split('\n')
+            .filter((line) => line.startsWith('data:'))
+            .map((line) => line.slice(5).trimStart())
+            .join('\n');
+      return payload.trim() ? (JSON.parse(payload) as T) : undefined;
+    };
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    try {
+      while (true) {
+        const { done, value } = await reader.read();
+        buffer += decoder.decode(value, { stream: !done });
+        let boundary = buffer.indexOf(separator);
+        while (boundary !== -1) {
+          const event = parse(buffer.slice(0, boundary));
+          buffer = buffer.slice(boundary + separator.length);
+          if (event !== undefined) {
+            yield event;
+          }
+          boundary = buffer.indexOf(separator);
+        }
+        if (done) {
+          break;
+        }
+      }
+      const last = parse(buffer);
+      if (last !== undefined) {
+        yield last;
+      }
+    } finally {
+      // 途中でイテレーションをやめた場合も接続を閉じ、サーバー側の生成を止める
+      await reader.cancel().catch(() => undefined);
+    }
   }
 }
 
@@ -212,6 +465,16 @@ export function createApiClient(baseUrl: string, options?: Partial<ApiClientConf
   });
 }
 
+// apiMethodsが共有するAPIクライアント（プロセスごとに1つ、最初の呼び出しで作成）
+let sharedApiClient: ApiClient | undefined;
+
+export function getApiClient(): ApiClient {
+  if (!sharedApiClient) {
+    sharedApiClient = createApiClient(process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000');
+  }
+  return sharedApiClient;
+}
+
 // Next.js用のカスタムフック型定義（React Query/SWR等で使用）
 export interface UseApiOptions {
   enabled?: boolean;
@@ -225,48 +488,51 @@ export type ApiMethod<Req, Res> = (...args: ApiRequest<Req>) => Promise<Res>;
 
 // 型安全なAPI呼び出し関数（OpenAPI仕様から自動生成）
 export const apiMethods = {
-  healthCheck: (): Promise<HealthResponse> => {
-    const client = createApiClient(process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000');
-    return client.get(API_ENDPOINTS.HEALTH_CHECK);
+  healthCheck: (options?: RequestOptions): Promise<HealthResponse> => {
+    return getApiClient().get(API_ENDPOINTS.HEALTH_CHECK, options);
+  },
+
+  detailedHealthCheck: (options?: RequestOptions): Promise<DetailedHealthResponse> => {
+    return getApiClient().get(API_ENDPOINTS.DETAILED_HEALTH_CHECK, options);
+  },
+
+  generateText: (request: GenerateTextRequest, options?: RequestOptions): Promise<GenerateTextResponse> => {
+    return getApiClient().post(API_ENDPOINTS.GENERATE_TEXT, request, options);
+  },
+
+  generateTextStream: (request: GenerateTextRequest, options?: StreamOptions): AsyncGenerator<GenerateTextStreamEvent> => {
+    return getApiClient().stream<GenerateTextStreamEvent>(API_ENDPOINTS.GENERATE_TEXT_STREAM, request, options);
   },
 
-  detailedHealthCheck: (): Promise<DetailedHealthResponse> => {
-    const client = createApiClient(process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000');
-    return client.get(API_ENDPOINTS.DETAILED_HEALTH_CHECK);
+  echoText: (request: EchoTextRequest, options?: RequestOptions): Promise<EchoTextResponse> => {
+    return getApiClient().post(API_ENDPOINTS.ECHO_TEXT, request, options);
   },
 
-  generateText: (request: GenerateTextRequest): Promise<GenerateTextResponse> => {
-    const client = createApiClient(process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000');
-    return client.post(API_ENDPOINTS.GENERATE_TEXT, request);
+  echoTextBatch: (request: EchoTextBatchRequest, options?: RequestOptions): Promise<EchoTextBatchResponse> => {
+    return getApiClient().post(API_ENDPOINTS.ECHO_TEXT_BATCH, request, options);
   },
 
-  echoText: (request: EchoTextRequest): Promise<EchoTextResponse> => {
-    const client = createApiClient(process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000');
-    return client.post(API_ENDPOINTS.ECHO_TEXT, request);
+  getWeather: (request: WeatherRequest, options?: RequestOptions): Promise<WeatherResponse> => {
+    return getApiClient().post(API_ENDPOINTS.GET_WEATHER, request, options);
   },
 
-  getWeather: (request: WeatherRequest): Promise<WeatherResponse> => {
-    const client = createApiClient(process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000');
-    return client.post(API_ENDPOINTS.GET_WEATHER, request);
+  getRandomQuote: (options?: RequestOptions): Promise<QuoteResponse> => {
+    return getApiClient().get(API_ENDPOINTS.GET_RANDOM_QUOTE, options);
   },
 
-  getRandomQuote: (): Promise<QuoteResponse> => {
-    const client = createApiClient(process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000');
-    return client.get(API_ENDPOINTS.GET_RANDOM_QUOTE);
+  getRandomFact: (options?: RequestOptions): Promise<FactResponse> => {
+    return getApiClient().get(API_ENDPOINTS.GET_RANDOM_FACT, options);
   },
 
-  getRandomFact: (): Promise<FactResponse> => {
-    const client = createApiClient(process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000');
-    return client.get(API_ENDPOINTS.GET_RANDOM_FACT);
+  getProgrammingJoke: (options?: RequestOptions): Promise<JokeResponse> => {
+    return getApiClient().get(API_ENDPOINTS.GET_PROGRAMMING_JOKE, options);
   },
 
-  getProgrammingJoke: (): Promise<JokeResponse> => {
-    const client = createApiClient(process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000');
-    return client.get(API_ENDPOINTS.GET_PROGRAMMING_JOKE);
+  fetchExternalBatch: (request: ExternalBatchRequest, options?: RequestOptions): Promise<ExternalBatchResponse> => {
+    return getApiClient().post(API_ENDPOINTS.FETCH_EXTERNAL_BATCH, request, options);
   },
 
-  generateTextLegacy: (request: GenerateTextRequest): Promise<GenerateTextResponse> => {
-    const client = createApiClient(process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000');
-    return client.post(API_ENDPOINTS.GENERATE_TEXT_LEGACY, request);
+  generateTextLegacy: (request: GenerateTextRequest, options?: RequestOptions): Promise<GenerateTextResponse> => {
+    return getApiClient().post(API_ENDPOINTS.GENERATE_TEXT_LEGACY, request, options);
   }
 } as const;
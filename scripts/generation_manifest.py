@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# generation_manifest.py
+"""
+コード生成マニフェスト管理モジュール
+
+source/openapi.yaml をセクション単位（スキーマ・パス・タグ）でハッシュ化し、
+生成スクリプトのバージョンと合わせて .cache/generation_manifest.json に記録します。
+前回の生成時から入力が変わった成果物だけを再生成するために使用します。
+"""
+
+import ast
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SPEC_PATH = PROJECT_ROOT / "source" / "openapi.yaml"
+MANIFEST_PATH = PROJECT_ROOT / ".cache" / "generation_manifest.json"
+SERVICES_DIR = PROJECT_ROOT / "app" / "services"
+SCRIPTS_DIR = PROJECT_ROOT / "scripts"
+
+# マニフェストの形式を変更した場合はインクリメントする（古いマニフェストは破棄される）
+MANIFEST_FORMAT_VERSION = 1
+
+HTTP_METHODS = ["get", "post", "put", "delete", "patch"]
+
+# 生成対象ごとの定義
+# - script: 成果物を生成するスクリプト（このスクリプトとimportするscripts/配下の
+#   モジュールの内容のハッシュをジェネレーターバージョンとする）
+# - depends_on: 依存するスペックのセクション
+# - outputs: 出力ファイル（プロジェクトルートからの相対パス）
+GENERATION_TARGETS: dict[str, dict[str, Any]] = {
+    "frontend": {
+        "script": "scripts/generate_frontend_code.py",
+        "depends_on": ["schemas", "paths"],
+        "outputs": ["scripts/generated/api-types.ts"],
+    },
+    "models": {
+        "script": "scripts/generate_backend_code.py",
+        "depends_on": ["schemas"],
+        "outputs": ["app/generated/generated_models.py"],
+    },
+    "router": {
+        "script": "scripts/generate_backend_code.py",
+        "depends_on": ["schema_names", "paths", "tags", "service_files"],
+        "outputs": ["app/generated/generated_router.py"],
+    },
+    "services": {
+        "script": "scripts/generate_backend_code.py",
+        "depends_on": ["paths", "service_files"],
+        "outputs": [],
+    },
+    "docs": {
+        "script": "scripts/generate_docs.py",
+        "depends_on": ["document"],
+        "outputs": [
+            "docs/generated/openapi.json",
+            "scripts/generated/docs/redoc.html",
+            "scripts/generated/docs/swagger.html",
+        ],
+    },
+}
+
+
+def hash_bytes(data: bytes) -> str:
+    """バイト列のSHA-256ハッシュを返します。"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_value(value: Any) -> str:
+    """YAMLから読み込んだ値を正規化したJSONでハッシュ化します。"""
+    canonical = json.dumps(
+        value, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str
+    )
+    return hash_bytes(canonical.encode("utf-8"))
+
+
+def hash_file(path: Path) -> Optional[str]:
+    """ファイル内容のハッシュを返します（存在しない場合はNone）。"""
+    try:
+        return hash_bytes(path.read_bytes())
+    except FileNotFoundError:
+        return None
+
+
+# すべての成果物の生成に使われるモジュール（マニフェストとインプロセス生成）
+COMMON_GENERATOR_MODULES = [
+    "scripts/generation_manifest.py",
+    "scripts/generation_pipeline.py",
+]
+
+
+def _local_imports(script: str) -> set[str]:
+    """スクリプトがimportするscripts/配下のモジュール（関数内のimportも含む）"""
+    try:
+        tree = ast.parse((PROJECT_ROOT / script).read_bytes())
+    except (FileNotFoundError, SyntaxError):
+        return set()
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names.add(node.module.split(".")[0])
+    return {
+        f"scripts/{name}.py" for name in names if (SCRIPTS_DIR / f"{name}.py").exists()
+    }
+
+
+def generator_modules(script: str) -> list[str]:
+    """生成スクリプトと、それが（間接的に）importするscripts/配下のモジュール"""
+    found = {script}
+    pending = [script]
+    while pending:
+        for module in _local_imports(pending.pop()) - found:
+            found.add(module)
+            # 共通のモジュールはすべての生成スクリプトをimportするため、その先はたどらない
+            if module not in COMMON_GENERATOR_MODULES:
+                pending.append(module)
+    return sorted(found)
+
+
+def target_generator_modules(name: str) -> list[str]:
+    """生成対象の成果物の内容に影響するモジュールの一覧を返します。"""
+    script = GENERATION_TARGETS[name]["script"]
+    return sorted({*generator_modules(script), *COMMON_GENERATOR_MODULES})
+
+
+def compute_generator_versions() -> dict[str, str]:
+    """生成に使われるモジュールごとの内容ハッシュをバージョンとして返します。"""
+    modules = sorted(
+        {
+            module
+            for name in GENERATION_TARGETS
+            for module in target_generator_modules(name)
+        }
+    )
+    return {module: hash_file(PROJECT_ROOT / module) or "" for module in modules}
+
+
+def list_service_files() -> list[str]:
+    """app/services配下のサービスファイル一覧を返します（ルーターのimport解決に影響）。"""
+    if not SERVICES_DIR.exists():
+        return []
+    return sorted(
+        str(path.relative_to(SERVICES_DIR)) for path in SERVICES_DIR.glob("*/*.py")
+    )
+
+
+def compute_section_hashes(spec: dict[str, Any]) -> dict[str, Any]:
+    """スペックをスキーマ・パス・タグ単位でハッシュ化します。"""
+    schemas = spec.get("components", {}).get("schemas", {}) or {}
+    paths = spec.get("paths", {}) or {}
+    tags = spec.get("tags", []) or []
+
+    return {
+        "schemas": {name: hash_value(schema) for name, schema in schemas.items()},
+        "schema_names": list(schemas.keys()),
+        "paths": {path: hash_value(methods) for path, methods in paths.items()},
+        "tags": {tag.get("name", ""): hash_value(tag) for tag in tags},
+        "document": hash_value(spec),
+        "service_files": list_service_files(),
+    }
+
+
+def compute_target_fingerprints(
+    sections: dict[str, Any], generator_versions: dict[str, str]
+) -> dict[str, str]:
+    """各生成対象の入力（依存セクション＋ジェネレーターバージョン）の指紋を計算します。"""
+    fingerprints = {}
+    for name, target in GENERATION_TARGETS.items():
+        inputs = {section: sections.get(section) for section in target["depends_on"]}
+        inputs["generators"] = {
+            module: generator_versions.get(module, "")
+            for module in target_generator_modules(name)
+        }
+        fingerprints[name] = hash_value(inputs)
+    return fingerprints
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> dict[str, Any]:
+    """マニフェストを読み込みます。存在しない・壊れている場合は空を返します。"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if manifest.get("format_version") != MANIFEST_FORMAT_VERSION:
+        return {}
+    return manifest
+
+
+def save_manifest(manifest: dict[str, Any], path: Path = MANIFEST_PATH) -> None:
+    """マニフェストを書き込みます（一時ファイル経由で置き換え）。"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    manifest["format_version"] = MANIFEST_FORMAT_VERSION
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False, sort_keys=True)
+    tmp_path.replace(path)
+
+
+def hash_outputs(target_name: str) -> dict[str, Optional[str]]:
+    """生成対象の出力ファイルの現在のハッシュを返します。"""
+    outputs = GENERATION_TARGETS[target_name]["outputs"]
+    return {output: hash_file(PROJECT_ROOT / output) for output in outputs}
+
+
+def outputs_intact(manifest: dict[str, Any], target_name: str) -> bool:
+    """出力ファイルが前回生成時から変更・削除されていないかを確認します。"""
+    recorded = manifest.get("targets", {}).get(target_name, {}).get("outputs")
+    if recorded is None:
+        return False
+    current = hash_outputs(target_name)
+    return all(
+        current[output] is not None and current[output] == recorded.get(output)
+        for output in current
+    )
+
+
+def is_up_to_date(
+    manifest: dict[str, Any], spec_hash: str, generator_versions: dict[str, str]
+) -> bool:
+    """YAMLを解析せずに、前回から何も変わっていないかを判定します（高速パス）。"""
+    if not manifest:
+        return False
+    if manifest.get("spec_sha256") != spec_hash:
+        return False
+    if manifest.get("generators") != generator_versions:
+        return False
+    if manifest.get("service_files") != list_service_files():
+        return False
+    return all(outputs_intact(manifest, name) for name in GENERATION_TARGETS)
+
+
+def find_stale_targets(
+    manifest: dict[str, Any], fingerprints: dict[str, str]
+) -> list[str]:
+    """入力の指紋が変わった、または出力が失われた生成対象を返します。"""
+    stale = []
+    recorded_targets = manifest.get("targets", {})
+    for name in GENERATION_TARGETS:
+        recorded = recorded_targets.get(name, {})
+        if recorded.get("fingerprint") != fingerprints[name]:
+            stale.append(name)
+        elif not outputs_intact(manifest, name):
+            stale.append(name)
+    return stale
+
+
+def diff_sections(
+    old_sections: dict[str, Any], new_sections: dict[str, Any]
+) -> dict[str, list[str]]:
+    """セクションごとに追加・変更・削除された要素名を返します（ログ表示用）。"""
+    changes: dict[str, list[str]] = {}
+    for section in ("schemas", "paths", "tags"):
+        old = old_sections.get(section, {}) or {}
+        new = new_sections.get(section, {}) or {}
+        changed = sorted(
+            name for name in set(old) | set(new) if old.get(name) != new.get(name)
+        )
+        if changed:
+            changes[section] = changed
+    return changes
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# generation_pipeline.py
+"""
+インプロセス生成パイプライン
+
+source/openapi.yaml を一度だけ読み込んで不変モデルに変換し、
+フロントエンド・バックエンド・ドキュメントの各生成処理をステージとして
+同一プロセス内（必要に応じてスレッド/プロセスプール）で実行します。
+ファイルへの書き込みは内容が変わった成果物のみ行い、整形は最後に一度だけ実行します。
+"""
+
+import time
+from collections.abc import Mapping
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import generate_backend_code as backend
+import generate_docs as docs
+import generate_frontend_code as frontend
+from generation_manifest import PROJECT_ROOT, hash_bytes, hash_file
+
+
+class FrozenDict(dict):
+    """変更操作を禁止した辞書（ステージ間で共有するスペック用）"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("生成パイプラインのスペックは変更できません")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        # プロセスプールへ渡す際に__setitem__を経由せず復元する
+        return (FrozenDict, (dict(self),))
+
+
+class FrozenList(tuple):
+    """変更不可のリスト（生成コード中の表記はlistと同じにする）"""
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+def freeze(value: Any) -> Any:
+    """YAMLから読み込んだ値を再帰的に変更不可な構造へ変換します。"""
+    if isinstance(value, Mapping):
+        return FrozenDict({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return FrozenList(freeze(item) for item in value)
+    return value
+
+
+@dataclass(frozen=True)
+class SpecModel:
+    """一度だけ解析された、全ステージで共有する不変のOpenAPIスペック"""
+
+    spec: FrozenDict
+    spec_sha256: str
+    source_path: Path
+
+
+def load_spec_model(
+    yaml_path: Path, spec: Optional[dict[str, Any]] = None
+) -> SpecModel:
+    """スペックを読み込んで不変モデルを作成します（解析済みの辞書も受け付けます）。"""
+    spec_bytes = yaml_path.read_bytes()
+    if spec is None:
+        spec = backend.load_openapi_spec(str(yaml_path))
+    return SpecModel(
+        spec=freeze(spec), spec_sha256=hash_bytes(spec_bytes), source_path=yaml_path
+    )
+
+
+# ステージ定義: 生成対象名 -> {出力パス: 描画関数}
+# 描画関数はスペックを受け取り、ファイル内容（文字列）を返す純粋関数
+RENDER_STAGES: dict[str, dict[str, Callable[[Mapping], str]]] = {
+    "frontend": {
+        "scripts/generated/api-types.ts": frontend.render_typescript_types,
+    },
+    "models": {
+        "app/generated/generated_models.py": backend.render_pydantic_models,
+    },
+    "router": {
+        "app/generated/generated_router.py": backend.render_router_stubs,
+    },
+    "docs": {
+        # アプリの起動時に読み込む生成済みスキーマ（OPENAPI_PREBUILT_PATH）
+        "docs/generated/openapi.json": docs.render_openapi_json,
+        "scripts/generated/docs/redoc.html": docs.render_redoc_html,
+        "scripts/generated/docs/swagger.html": docs.render_swagger_html,
+    },
+}
+
+
+def _render(render_fn: Callable[[Mapping], str], spec: Mapping) -> str:
+    """プロセスプールからも呼び出せるトップレベルの描画関数"""
+    return render_fn(spec)
+
+
+@dataclass
+class PipelineResult:
+    """パイプライン実行結果"""
+
+    # 生成対象ごとの描画結果ハッシュ（出力パス -> ハッシュ）
+    rendered: dict[str, dict[str, str]] = field(default_factory=dict)
+    # 実際に書き込まれたファイル
+    written: list[Path] = field(default_factory=list)
+    # サービス層で作成・更新されたファイル
+    service_files: list[Path] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+
+def create_executor(jobs: int, executor: str) -> Optional[Executor]:
+    """並列実行用のExecutorを作成します（jobs<=1の場合は逐次実行）。"""
+    if jobs <= 1:
+        return None
+    if executor == "process":
+        return ProcessPoolExecutor(max_workers=jobs)
+    return ThreadPoolExecutor(max_workers=jobs)
+
+
+def _snapshot_services() -> dict[Path, int]:
+    """サービス層のPythonファイルの更新時刻を記録します。"""
+    return {
+        path: path.stat().st_mtime_ns
+        for path in (PROJECT_ROOT / "app" / "services").rglob("*.py")
+    }
+
+
+def write_if_changed(
+    output: str,
+    content: str,
+    previous_rendered: Optional[str],
+    previous_file_hash: Optional[str],
+) -> bool:
+    """描画結果が前回と同じで、ファイルも手つかずなら書き込みをスキップします。
+
+    Pythonファイルは書き込み後に整形されるため、生成直後の内容ではなく
+    「前回の描画結果ハッシュ」と「前回整形後のファイルハッシュ」で比較します。
+    """
+    path = PROJECT_ROOT / output
+    rendered_hash = hash_bytes(content.encode("utf-8"))
+    if (
+        rendered_hash == previous_rendered
+        and previous_file_hash is not None
+        and hash_file(path) == previous_file_hash
+    ):
+        return False
+    if previous_file_hash is None and path.exists():
+        # マニフェストがない場合でも、同一内容なら書き込まない
+        if path.read_text(encoding="utf-8") == content:
+            return False
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return True
+
+
+def run_pipeline(
+    model: SpecModel,
+    targets: list[str],
+    previous_targets: Optional[dict[str, Any]] = None,
+    jobs: int = 1,
+    executor: str = "thread",
+) -> PipelineResult:
+    """指定された生成対象のステージを実行します。"""
+    started_at = time.perf_counter()
+    previous_targets = previous_targets or {}
+    result = PipelineResult()
+
+    # 描画ステージ（純粋関数）を並列実行
+    jobs_to_run = [
+        (target, output, render_fn)
+        for target in targets
+        for output, render_fn in RENDER_STAGES.get(target, {}).items()
+    ]
+    contents: dict[tuple[str, str], str] = {}
+    pool = create_executor(jobs, executor)
+    try:
+        if pool is None:
+            for target, output, render_fn in jobs_to_run:
+                try:
+                    contents[(target, output)] = render_fn(model.spec)
+                except Exception as e:
+                    result.failed[target] = f"{type(e).__name__}: {e}"
+        else:
+            futures = {
+                (target, output): pool.submit(_render, render_fn, model.spec)
+                for target, output, render_fn in jobs_to_run
+            }
+            for key, future in futures.items():
+                try:
+                    contents[key] = future.result()
+                except Exception as e:
+                    result.failed[key[0]] = f"{type(e).__name__}: {e}"
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    # 書き込みは逐次（内容が変わったファイルのみ）
+    for (target, output), content in contents.items():
+        if target in result.failed:
+            continue
+        previous = previous_targets.get(target, {})
+        changed = write_if_changed(
+            output,
+            content,
+            previous.get("rendered", {}).get(output),
+            previous.get("outputs", {}).get(output),
+        )
+        result.rendered.setdefault(target, {})[output] = hash_bytes(
+            content.encode("utf-8")
+        )
+        if changed:
+            result.written.append(PROJECT_ROOT / output)
+
+    # サービス層のスタブ生成は既存ファイルを参照するため、描画後に逐次実行する
+    if "services" in targets:
+        before = _snapshot_services()
+        try:
+            backend.generate_service_impls(model.spec)
+            backend.update_services_init_imports()
+        except Exception as e:
+            result.failed["services"] = f"{type(e).__name__}: {e}"
+        after = _snapshot_services()
+        result.service_files = sorted(
+            path for path, mtime in after.items() if before.get(path) != mtime
+        )
+        result.rendered.setdefault("services", {})
+
+    result.elapsed = time.perf_counter() - started_at
+    return result
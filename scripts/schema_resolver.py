@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# schema_resolver.py
+"""
+OpenAPIスキーマ参照（$ref）の解決モジュール
+
+コンポーネントスキーマ間の参照グラフを一度だけ構築し、以下を提供します。
+- JSONポインタによる$refの解決（結果はメモ化）
+- allOf / oneOf / anyOf を含む合成スキーマの依存関係の追跡
+- 循環参照の検出（強連結成分）
+- 依存先が先に来るモデル出力順（トポロジカル順序）
+- 成功レスポンスがストリーミング形式（SSE / NDJSON）かの判定
+
+バックエンド（Python型）・フロントエンド（TypeScript型）の両ジェネレーターから共有されます。
+"""
+
+from collections.abc import Mapping
+from typing import Any, Optional
+
+COMPONENT_SCHEMA_PREFIX = "#/components/schemas/"
+COMPOSITION_KEYWORDS = ("allOf", "oneOf", "anyOf")
+# 逐次送信するレスポンスのメディアタイプ
+STREAMING_MEDIA_TYPES = ("text/event-stream", "application/x-ndjson")
+
+
+class SchemaResolutionError(ValueError):
+    """解決できない$ref（外部ファイル参照・存在しないパスなど）"""
+
+
+def _unescape_pointer_token(token: str) -> str:
+    """JSONポインタのエスケープ（~1 -> /, ~0 -> ~）を戻します。"""
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+class SchemaResolver:
+    """スペック全体の参照グラフを保持し、スキーマ解決をメモ化するリゾルバー"""
+
+    def __init__(self, spec: Mapping[str, Any]):
+        self.spec = spec
+        self.schemas: Mapping[str, Any] = (
+            spec.get("components", {}).get("schemas", {}) or {}
+        )
+        self._resolved: dict[str, Any] = {}
+        self._merged: dict[str, dict[str, Any]] = {}
+        # 参照グラフ: スキーマ名 -> 直接参照しているコンポーネントスキーマ名
+        self.graph: dict[str, list[str]] = {
+            name: self.collect_refs(schema) for name, schema in self.schemas.items()
+        }
+        self.cycles = self._find_cycles()
+        self.cyclic_names = {name for cycle in self.cycles for name in cycle}
+
+    # ------------------------------------------------------------------
+    # $refの解決
+    # ------------------------------------------------------------------
+    @staticmethod
+    def ref_name(ref: str) -> Optional[str]:
+        """コンポーネントスキーマへの参照ならスキーマ名を返します。"""
+        if ref.startswith(COMPONENT_SCHEMA_PREFIX):
+            name = ref[len(COMPONENT_SCHEMA_PREFIX) :]
+            if "/" not in name:
+                return _unescape_pointer_token(name)
+        return None
+
+    def resolve_ref(self, ref: str) -> Any:
+        """$ref（ローカルJSONポインタ）が指す値を返します（メモ化）。"""
+        if ref in self._resolved:
+            return self._resolved[ref]
+        if not ref.startswith("#"):
+            raise SchemaResolutionError(f"外部ファイルへの$refには未対応です: {ref}")
+
+        node: Any = self.spec
+        for raw_token in ref[1:].split("/")[1:]:
+            token = _unescape_pointer_token(raw_token)
+            if isinstance(node, Mapping) and token in node:
+                node = node[token]
+            elif isinstance(node, (list, tuple)) and token.isdigit():
+                node = node[int(token)]
+            else:
+                raise SchemaResolutionError(f"$refの参照先が見つかりません: {ref}")
+        self._resolved[ref] = node
+        return node
+
+    def deref(self, schema: Mapping[str, Any]) -> Mapping[str, Any]:
+        """$refを辿って実体のスキーマを返します（多段参照・循環に対応）。"""
+        seen = set()
+        while isinstance(schema, Mapping) and "$ref" in schema:
+            ref = schema["$ref"]
+            if ref in seen:
+                raise SchemaResolutionError(f"$refが自分自身を参照しています: {ref}")
+            seen.add(ref)
+            schema = self.resolve_ref(ref)
+        return schema
+
+    # ------------------------------------------------------------------
+    # 参照グラフ
+    # ------------------------------------------------------------------
+    def collect_refs(self, schema: Any) -> list[str]:
+        """スキーマ内（入れ子・合成を含む）で参照しているコンポーネント名を集めます。"""
+        refs: list[str] = []
+        stack = [schema]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Mapping):
+                ref = node.get("$ref")
+                if isinstance(ref, str):
+                    name = self.ref_name(ref)
+                    if name is not None and name not in refs:
+                        refs.append(name)
+                stack.extend(reversed(list(node.values())))
+            elif isinstance(node, (list, tuple)):
+                stack.extend(reversed(node))
+        return refs
+
+    def _find_cycles(self) -> list[list[str]]:
+        """Tarjanのアルゴリズムで循環参照（強連結成分）を検出します。"""
+        index_of: dict[str, int] = {}
+        lowlink: dict[str, int] = {}
+        on_stack: set[str] = set()
+        stack: list[str] = []
+        cycles: list[list[str]] = []
+        counter = 0
+
+        for root in self.graph:
+            if root in index_of:
+                continue
+            # 再帰を使わず、(ノード, 次に調べる隣接インデックス)のスタックで走査する
+            work = [(root, 0)]
+            while work:
+                node, child_index = work.pop()
+                if child_index == 0:
+                    index_of[node] = lowlink[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack.add(node)
+                children = [c for c in self.graph.get(node, []) if c in self.graph]
+                if child_index < len(children):
+                    work.append((node, child_index + 1))
+                    child = children[child_index]
+                    if child not in index_of:
+                        work.append((child, 0))
+                    elif child in on_stack:
+                        lowlink[node] = min(lowlink[node], index_of[child])
+                    continue
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in self.graph.get(node, []):
+                        cycles.append(sorted(component))
+        return cycles
+
+    def emission_order(self, names: Optional[list[str]] = None) -> list[str]:
+        """依存先のスキーマが先になるよう並べたスキーマ名を返します。
+
+        依存関係のないスキーマはスペックの記述順を保ちます。
+        循環参照のあるスキーマは前方参照（文字列アノテーション）で出力されます。
+        """
+        targets = list(self.schemas) if names is None else names
+        target_set = set(targets)
+        ordered: list[str] = []
+        state: dict[str, int] = {}  # 1: 訪問中, 2: 完了
+
+        for root in targets:
+            if state.get(root) == 2:
+                continue
+            work = [(root, iter(self.graph.get(root, [])))]
+            state[root] = 1
+            while work:
+                node, children = work[-1]
+                for child in children:
+                    if child in target_set and state.get(child) is None:
+                        state[child] = 1
+                        work.append((child, iter(self.graph.get(child, []))))
+                        break
+                else:
+                    work.pop()
+                    state[node] = 2
+                    ordered.append(node)
+        return ordered
+
+    # ------------------------------------------------------------------
+    # 合成スキーマ
+    # ------------------------------------------------------------------
+    def is_object_schema(self, schema: Mapping[str, Any]) -> bool:
+        """モデルクラス/インターフェースとして出力すべきオブジェクト型か判定します。"""
+        if schema.get("type") == "object":
+            return True
+        all_of = schema.get("allOf")
+        if all_of:
+            return all(
+                self.is_object_schema(self.deref(part))
+                for part in all_of
+                if isinstance(part, Mapping)
+            )
+        return False
+
+    def merged_object(self, name: str) -> dict[str, Any]:
+        """allOfを展開し、プロパティと必須項目を統合したスキーマを返します（メモ化）。"""
+        if name in self._merged:
+            return self._merged[name]
+        merged = self._merge(self.schemas[name], set())
+        self._merged[name] = merged
+        return merged
+
+    def _merge(self, schema: Mapping[str, Any], visiting: set[str]) -> dict[str, Any]:
+        properties: dict[str, Any] = {}
+        required: list[str] = []
+        for part in schema.get("allOf", []) or []:
+            ref = part.get("$ref") if isinstance(part, Mapping) else None
+            name = self.ref_name(ref) if ref else None
+            if name is not None:
+                if name in visiting:
+                    continue  # allOfの循環は無視（無限展開を防ぐ）
+                sub = self._merge(self.schemas.get(name, {}), visiting | {name})
+            else:
+                sub = self._merge(self.deref(part), visiting)
+            properties.update(sub["properties"])
+            required.extend(r for r in sub["required"] if r not in required)
+        properties.update(schema.get("properties", {}) or {})
+        required.extend(
+            r for r in schema.get("required", []) or [] if r not in required
+        )
+        return {
+            "description": schema.get("description", ""),
+            "properties": properties,
+            "required": required,
+        }
+
+    def composition_bases(self, name: str) -> list[str]:
+        """allOf内で参照しているオブジェクト型のコンポーネント名（継承元）を返します。"""
+        bases = []
+        for part in self.schemas[name].get("allOf", []) or []:
+            ref = part.get("$ref") if isinstance(part, Mapping) else None
+            base = self.ref_name(ref) if ref else None
+            if base is not None and self.is_object_schema(self.schemas.get(base, {})):
+                bases.append(base)
+        return bases
+
+
+def is_nullable(schema: Mapping[str, Any]) -> bool:
+    """スキーマがnullを許容するか（3.0のnullable、3.1のtype配列/anyOf nullに対応）"""
+    if schema.get("nullable") is True:
+        return True
+    schema_type = schema.get("type")
+    if isinstance(schema_type, (list, tuple)) and "null" in schema_type:
+        return True
+    for keyword in ("anyOf", "oneOf"):
+        options = schema.get(keyword) or []
+        if any(
+            isinstance(option, Mapping) and option.get("type") == "null"
+            for option in options
+        ):
+            return True
+    return False
+
+
+def non_null_type(schema: Mapping[str, Any]) -> Any:
+    """type配列（例: ["string", "null"]）からnull以外の型を返します。"""
+    schema_type = schema.get("type")
+    if isinstance(schema_type, (list, tuple)):
+        types = [t for t in schema_type if t != "null"]
+        return types[0] if len(types) == 1 else (types or None)
+    return schema_type
+
+
+def streaming_media_types(operation: Mapping[str, Any]) -> list[str]:
+    """成功レスポンス（200）のうちストリーミング形式のメディアタイプを記述順に返します。"""
+    content = operation.get("responses", {}).get("200", {}).get("content", {})
+    return [media_type for media_type in content if media_type in STREAMING_MEDIA_TYPES]
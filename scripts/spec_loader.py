@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# spec_loader.py
+"""
+OpenAPI YAML仕様の高速ローダー
+
+- libyamlが利用可能な場合はCローダー（yaml.CSafeLoader）で解析します
+- 解析結果を .cache/spec_cache/ にpickleとして保存し、
+  ファイルの更新時刻・サイズ・内容ハッシュが同じ場合はYAML解析を省略します
+"""
+
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import yaml
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+CACHE_DIR = PROJECT_ROOT / ".cache" / "spec_cache"
+
+# キャッシュ形式を変更した場合はインクリメントする
+CACHE_FORMAT_VERSION = 1
+
+# libyamlが組み込まれていない環境では純Pythonのローダーにフォールバック
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+LOADER_NAME = SafeLoader.__name__
+
+
+def parse_yaml(data: bytes, loader: type = SafeLoader) -> Any:
+    """YAMLを解析します（既定はCローダー）。"""
+    return yaml.load(data, Loader=loader)
+
+
+def cache_path_for(yaml_path: Path, cache_dir: Path = CACHE_DIR) -> Path:
+    """仕様ファイルごとのキャッシュファイルのパスを返します。"""
+    key = hashlib.sha256(str(yaml_path.resolve()).encode("utf-8")).hexdigest()[:16]
+    return cache_dir / f"{yaml_path.stem}-{key}.pickle"
+
+
+def _read_cache(cache_path: Path) -> Optional[dict[str, Any]]:
+    """キャッシュを読み込みます。壊れている・形式が古い場合はNoneを返します。"""
+    try:
+        with open(cache_path, "rb") as f:
+            entry = pickle.load(f)
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError, AttributeError):
+        return None
+    if not isinstance(entry, dict) or entry.get("version") != CACHE_FORMAT_VERSION:
+        return None
+    return entry
+
+
+def _write_cache(cache_path: Path, entry: dict[str, Any]) -> None:
+    """キャッシュを書き込みます（一時ファイル経由で置き換え）。"""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(cache_path)
+    except OSError as e:
+        # キャッシュは最適化のためのものなので、書けなくても処理は継続する
+        print(f"⚠️  スペックキャッシュを書き込めませんでした: {e}")
+
+
+def load_openapi_spec(
+    yaml_path: Union[str, Path],
+    spec_bytes: Optional[bytes] = None,
+    use_cache: bool = True,
+    cache_dir: Path = CACHE_DIR,
+) -> dict[str, Any]:
+    """OpenAPI YAML仕様をロードします（キャッシュヒット時はYAML解析を省略）。
+
+    キャッシュは更新時刻とサイズが一致すればそのまま使用し、
+    一致しない場合も内容ハッシュが同じであれば再利用します（touchのみの変更など）。
+    """
+    yaml_path = Path(yaml_path)
+    stat = yaml_path.stat()
+    cache_path = cache_path_for(yaml_path, cache_dir)
+    entry = _read_cache(cache_path) if use_cache else None
+
+    if (
+        entry is not None
+        and spec_bytes is None
+        and entry["mtime_ns"] == stat.st_mtime_ns
+        and entry["size"] == stat.st_size
+    ):
+        return entry["spec"]
+
+    if spec_bytes is None:
+        spec_bytes = yaml_path.read_bytes()
+    digest = hashlib.sha256(spec_bytes).hexdigest()
+
+    if entry is not None and entry["sha256"] == digest:
+        spec = entry["spec"]
+    else:
+        spec = parse_yaml(spec_bytes)
+
+    if use_cache and (
+        entry is None
+        or entry["sha256"] != digest
+        or entry["mtime_ns"] != stat.st_mtime_ns
+    ):
+        _write_cache(
+            cache_path,
+            {
+                "version": CACHE_FORMAT_VERSION,
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha256": digest,
+                "spec": spec,
+            },
+        )
+    return spec
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# spec_watcher.py
+"""
+OpenAPI仕様ファイルの変更監視
+
+Linuxではinotify（ctypes経由、追加依存なし）でファイルを監視し、
+利用できない環境ではmtime/サイズのポーリングにフォールバックします。
+エディタの連続保存（一時ファイル作成→リネーム等）はデバウンスして1回の変更として扱います。
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+# inotifyのイベントマスク（<sys/inotify.h>）
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """inotifyで親ディレクトリを監視し、対象ファイルへの書き込みを検知します。
+
+    エディタはファイルを置き換えて保存することが多いため、
+    ファイル自体ではなくディレクトリを監視してファイル名で絞り込みます。
+    """
+
+    name = "inotify"
+
+    def __init__(self, path: Path, debounce: float = 0.15):
+        self.path = Path(path).resolve()
+        self.debounce = debounce
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or libc_name is None:
+            raise OSError("inotifyはLinuxでのみ利用できます")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1に失敗しました")
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        wd = self._libc.inotify_add_watch(
+            self._fd, str(self.path.parent).encode(), mask
+        )
+        if wd < 0:
+            os.close(self._fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watchに失敗しました")
+
+    def _drain(self) -> bool:
+        """溜まっているイベントを読み出し、対象ファイルのイベントがあればTrue"""
+        matched = False
+        target = self.path.name.encode()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return matched
+            offset = 0
+            while offset < len(data):
+                _wd, _mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                start = offset + _EVENT_HEADER.size
+                name = data[start : start + length].rstrip(b"\0")
+                if name == target:
+                    matched = True
+                offset = start + length
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """変更を待ちます。デバウンス後に変更があればTrueを返します。"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+            if ready and self._drain():
+                break
+        # 連続した保存イベントが落ち着くまで待つ
+        while select.select([self._fd], [], [], self.debounce)[0]:
+            self._drain()
+        return True
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """mtime/サイズのポーリングによる監視（inotifyが使えない環境用）"""
+
+    name = "polling"
+
+    def __init__(self, path: Path, debounce: float = 0.15, interval: float = 0.1):
+        self.path = Path(path).resolve()
+        self.debounce = debounce
+        self.interval = interval
+        self._last = self._signature()
+
+    def _signature(self) -> Optional[tuple[int, int]]:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """変更を待ちます。シグネチャがdebounce秒安定してからTrueを返します。"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._signature() == self._last:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(self.interval)
+        # 保存が落ち着く（シグネチャが変化しなくなる）まで待つ
+        current = self._signature()
+        while True:
+            time.sleep(self.debounce)
+            latest = self._signature()
+            if latest == current:
+                break
+            current = latest
+        self._last = current
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+def create_watcher(path: Path, debounce: float = 0.15, polling: bool = False):
+    """利用可能な最適な監視方式を選択します。"""
+    if not polling:
+        try:
+            return InotifyWatcher(path, debounce=debounce)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(path, debounce=debounce)
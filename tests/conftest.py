@@ -0,0 +1,9 @@
+"""pytest共通設定"""
+
+import sys
+from pathlib import Path
+
+# scripts/ 配下の生成スクリプトをモジュールとしてimportできるようにする
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
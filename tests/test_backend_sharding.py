@@ -0,0 +1,81 @@
+import backend_sharding
+from schema_resolver import SchemaResolver
+
+
+def _operation(tag, request, response):
+    return {
+        "tags": [tag],
+        "operationId": f"{tag}_{request.lower()}",
+        "requestBody": {
+            "content": {
+                "application/json": {
+                    "schema": {"$ref": f"#/components/schemas/{request}"}
+                }
+            }
+        },
+        "responses": {
+            "200": {
+                "content": {
+                    "application/json": {
+                        "schema": {"$ref": f"#/components/schemas/{response}"}
+                    }
+                }
+            }
+        },
+    }
+
+
+def _object(**refs):
+    return {
+        "type": "object",
+        "properties": {
+            name: {"$ref": f"#/components/schemas/{target}"}
+            for name, target in refs.items()
+        },
+    }
+
+
+SPEC = {
+    "tags": [{"name": "users"}, {"name": "orders"}],
+    "paths": {
+        "/api/v1/users/": {"post": _operation("users", "UserRequest", "Error")},
+        "/api/v1/orders/": {"post": _operation("orders", "OrderRequest", "Error")},
+    },
+    "components": {
+        "schemas": {
+            "UserRequest": _object(address="Address"),
+            "OrderRequest": _object(address="Address"),
+            "Address": {"type": "object", "properties": {"city": {"type": "string"}}},
+            "Error": {"type": "object", "properties": {"detail": {"type": "string"}}},
+            "Unused": {"type": "object", "properties": {}},
+        }
+    },
+}
+
+
+def test_partition_schemas_by_tag():
+    common, per_tag = backend_sharding.partition_schemas(SPEC, SchemaResolver(SPEC))
+
+    assert common == ["Address", "Error", "Unused"]
+    assert per_tag == {"users": ["UserRequest"], "orders": ["OrderRequest"]}
+
+
+def test_render_shards_import_only_own_and_common_models():
+    contents = backend_sharding.render_shards(SPEC)
+
+    assert sorted(contents) == [
+        "app/generated/common_models.py",
+        "app/generated/orders/__init__.py",
+        "app/generated/orders/models.py",
+        "app/generated/orders/router.py",
+        "app/generated/sharded_router.py",
+        "app/generated/users/__init__.py",
+        "app/generated/users/models.py",
+        "app/generated/users/router.py",
+    ]
+    users_router = contents["app/generated/users/router.py"]
+    assert "from app.generated.common_models import Error" in users_router
+    assert "from app.generated.users.models import UserRequest" in users_router
+    assert "OrderRequest" not in users_router
+    users_models = contents["app/generated/users/models.py"]
+    assert "from app.generated.common_models import Address" in users_models
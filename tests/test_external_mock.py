@@ -0,0 +1,51 @@
+import asyncio
+import random
+import statistics
+
+import pytest
+
+from app.services.external.mock import Latency, MockUpstream, load_mock_data
+
+
+def test_seeded_mock_is_reproducible_and_loads_datasets_from_files(tmp_path):
+    data_path = tmp_path / "mock.yaml"
+    data_path.write_text(
+        "quotes:\n"
+        "  - {quote: 'Make it work, then make it fast.', author: 'Kent Beck'}\n"
+        "weather_descriptions: [Snow]\n"
+    )
+    data = load_mock_data(data_path)
+    none = {name: Latency.parse("none") for name in ("weather", "quotes", "facts")}
+
+    async def sample(seed):
+        mock = MockUpstream(data, none, seed=seed)
+        weather = [await mock.get_weather("tokyo") for _ in range(5)]
+        facts = [await mock.get_random_fact() for _ in range(5)]
+        return weather, facts, await mock.get_random_quote()
+
+    first, second = asyncio.run(sample(7)), asyncio.run(sample(7))
+
+    assert first == second
+    weather, facts, quote = first
+    assert {response.description for response in weather} == {"Snow"}
+    assert weather[0].city == "Tokyo" and weather[0].is_mock
+    # ファイルにないデータセットは組み込みのデータ
+    assert len({fact.fact for fact in facts}) > 1
+    assert quote.author == "Kent Beck"
+    data_path.write_text("horoscopes: []\n")
+    with pytest.raises(ValueError):
+        load_mock_data(data_path)
+
+
+def test_latency_distributions():
+    rng = random.Random(0)
+    lognormal = Latency.parse("lognormal:20:200")
+    samples = sorted(lognormal.sample(rng) for _ in range(20000))
+
+    assert Latency.parse("none").sample(rng) == 0
+    assert Latency.parse("fixed:100").sample(rng) == 0.1
+    assert statistics.median(samples) == pytest.approx(0.020, rel=0.05)
+    assert samples[int(0.99 * len(samples))] == pytest.approx(0.200, rel=0.15)
+    for spec in ("fixed", "lognormal:200:20", "gamma:1", "none:5"):
+        with pytest.raises(ValueError):
+            Latency.parse(spec)
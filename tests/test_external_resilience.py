@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+from app.services.external.resilience import (
+    CLOSED,
+    HEDGE_MIN_SAMPLES,
+    OPEN,
+    BulkheadFullError,
+    CircuitOpenError,
+    UpstreamError,
+    UpstreamGuard,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_after_failures_and_closes_after_trial():
+    clock = FakeClock()
+    guard = UpstreamGuard(
+        "weather", failure_threshold=2, reset_timeout=30, max_concurrent=4, clock=clock
+    )
+    calls = 0
+
+    async def failing():
+        nonlocal calls
+        calls += 1
+        raise UpstreamError("weather", "エラー応答 503", status_code=503)
+
+    async def succeeding():
+        return "ok"
+
+    async def scenario():
+        for _ in range(2):
+            with pytest.raises(UpstreamError):
+                await guard.call(failing)
+        with pytest.raises(CircuitOpenError):
+            await guard.call(failing)  # 開いている間は上流を呼ばない
+        state_while_open = guard.breaker.state
+        clock.now = 31
+        return state_while_open, await guard.call(succeeding)
+
+    state_while_open, result = asyncio.run(scenario())
+
+    assert state_while_open == OPEN
+    assert calls == 2
+    assert result == "ok"
+    assert guard.stats()["state"] == CLOSED
+    assert guard.stats()["rejected_open"] == 1
+
+
+def test_unexpected_error_in_half_open_trial_does_not_wedge_the_breaker():
+    clock = FakeClock()
+    guard = UpstreamGuard(
+        "weather", failure_threshold=1, reset_timeout=30, max_concurrent=4, clock=clock
+    )
+
+    async def failing():
+        raise UpstreamError("weather", "エラー応答 503", status_code=503)
+
+    async def broken():
+        raise RuntimeError("Cannot send a request, as the client has been closed.")
+
+    async def succeeding():
+        return "ok"
+
+    async def scenario():
+        with pytest.raises(UpstreamError):
+            await guard.call(failing)
+        clock.now = 31
+        # half_openの試行で想定外の例外が起きても失敗として数えて開き直す
+        with pytest.raises(RuntimeError):
+            await guard.call(broken)
+        state_after_trial = guard.breaker.state
+        clock.now = 62
+        return state_after_trial, await guard.call(succeeding)
+
+    state_after_trial, result = asyncio.run(scenario())
+
+    assert state_after_trial == OPEN
+    assert result == "ok"
+    assert guard.stats()["state"] == CLOSED
+
+
+def test_bulkhead_rejects_calls_over_the_concurrency_limit():
+    guard = UpstreamGuard("weather", 5, 30, max_concurrent=2)
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    async def scenario():
+        return await asyncio.gather(
+            *(guard.call(slow) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+
+    assert results[:2] == ["ok", "ok"]
+    assert isinstance(results[2], BulkheadFullError)
+    assert guard.stats()["rejected_bulkhead"] == 1
+    # 4xxは上流の障害ではないためブレーカーを開かない
+    assert not UpstreamError("weather", "404", status_code=404).unavailable
+
+
+def test_hedged_request_wins_over_a_slow_attempt():
+    guard = UpstreamGuard("weather", 5, 30, max_concurrent=4, hedge_percentile=0.9)
+    attempts = 0
+
+    async def request():
+        nonlocal attempts
+        attempts += 1
+        # 応答時間を学習した後、1回目の試行だけが遅い
+        await asyncio.sleep(1.0 if attempts == HEDGE_MIN_SAMPLES + 1 else 0.001)
+        return attempts
+
+    async def scenario():
+        for _ in range(HEDGE_MIN_SAMPLES):
+            await guard.call(request)
+        started_at = asyncio.get_running_loop().time()
+        result = await guard.call(request)
+        return result, asyncio.get_running_loop().time() - started_at
+
+    result, elapsed = asyncio.run(scenario())
+
+    assert result == HEDGE_MIN_SAMPLES + 2
+    assert elapsed < 0.5
+    assert guard.stats()["hedged"] == 1
+    assert guard.stats()["hedge_wins"] == 1
@@ -0,0 +1,224 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.generated.generated_models import WeatherRequest
+from app.services.external import cache, upstream
+from app.services.external.providers import (
+    fetch_quote,
+    fetch_weather,
+    upstream_http_exception,
+)
+from app.services.external.resilience import UpstreamError
+from app.services.external.upstream import UpstreamClients, load_upstream_configs
+from main import app
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """外部APIの代役（接続元ポートを記録し、keep-aliveで応答する）"""
+
+    protocol_version = "HTTP/1.1"
+    ports: list[int] = []
+
+    def do_GET(self):
+        self.ports.append(self.client_address[1])
+        if self.path.startswith("/weather"):
+            status, body = (
+                200,
+                {
+                    "name": "Tokyo",
+                    "main": {"temp": 21.5, "humidity": 60},
+                    "weather": [{"description": "clear sky"}],
+                },
+            )
+        elif self.path.startswith("/slow"):
+            time.sleep(0.5)
+            status, body = 200, {}
+        else:
+            status, body = 500, {"error": "unavailable"}
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in_server():
+    StandInHandler.ports = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_upstream_client_reuses_pooled_connections(tmp_path, stand_in_server):
+    config = tmp_path / "config.yaml"
+    config.write_text(
+        "external_apis:\n"
+        f"  weather: {{mock_mode: false, base_url: '{stand_in_server}'}}\n"
+        f"  quotes: {{mock_mode: false, base_url: '{stand_in_server}'}}\n"
+        "  facts: {mock_mode: true, base_url: 'https://example.invalid'}\n"
+    )
+    clients = UpstreamClients(load_upstream_configs(config))
+
+    async def scenario():
+        try:
+            results = [
+                await fetch_weather(WeatherRequest(city="tokyo"), clients)
+                for _ in range(3)
+            ]
+            with pytest.raises(UpstreamError) as error:
+                await fetch_quote(clients)
+            return results, error.value
+        finally:
+            await clients.aclose()
+
+    results, error = asyncio.run(scenario())
+
+    assert clients.stats()["facts"] == "mock"
+    assert results[0].city == "Tokyo"
+    assert results[0].temperature == 21.5
+    assert not results[0].is_mock
+    assert error.status_code == 500
+    assert upstream_http_exception(error).status_code == 502
+    # weatherの3回は1本の接続（keep-alive）を再利用し、quotesは別のクライアントの接続
+    weather_ports, quote_port = StandInHandler.ports[:3], StandInHandler.ports[3]
+    assert len(set(weather_ports)) == 1
+    assert quote_port not in weather_ports
+
+
+def test_upstream_timeout_returns_504(tmp_path, stand_in_server):
+    config = tmp_path / "config.yaml"
+    config.write_text(
+        "external_apis:\n"
+        "  weather:\n"
+        "    mock_mode: false\n"
+        f"    base_url: '{stand_in_server}/slow'\n"
+        "    timeout_seconds: 0.1\n"
+    )
+    clients = UpstreamClients(load_upstream_configs(config))
+
+    async def scenario():
+        try:
+            await fetch_weather(WeatherRequest(city="tokyo"), clients)
+        finally:
+            await clients.aclose()
+
+    with pytest.raises(UpstreamError) as error:
+        asyncio.run(scenario())
+    assert error.value.timeout
+    assert upstream_http_exception(error.value).status_code == 504
+
+
+def test_mock_mode_serves_builtin_data_without_clients():
+    with TestClient(app) as client:
+        weather = client.post("/api/v1/external/weather", json={"city": "tokyo"})
+        health = client.get("/api/v1/health/detailed").json()
+
+    assert weather.status_code == 200
+    assert weather.json()["is_mock"]
+    assert health["services"]["external_apis"] == {
+        "weather": "mock",
+        "quotes": "mock",
+        "facts": "mock",
+    }
+
+
+def test_weather_responses_are_cached_by_normalized_city_and_country():
+    with TestClient(app) as client:
+        url = "/api/v1/external/weather"
+        first = client.post(url, json={"city": "Osaka", "country_code": "jp"})
+        same = client.post(url, json={"city": " ＯＳＡＫＡ ", "country_code": "JP"})
+        other = client.post(url, json={"city": "Osaka", "country_code": "US"})
+        invalid = client.post(url, json={"city": "Osaka", "country_code": "JPN"})
+        stats = client.get("/api/v1/health/detailed").json()["services"]["caches"]
+
+    # モックの気温は毎回ランダムなので、同じ値ならキャッシュから返している
+    assert same.json() == first.json()
+    assert other.status_code == 200
+    assert invalid.status_code == 422
+    assert stats["external_weather"]["hits"] >= 1
+
+
+def test_unavailable_upstream_falls_back_to_mock_data(
+    tmp_path, stand_in_server, monkeypatch
+):
+    config = tmp_path / "config.yaml"
+    config.write_text(
+        "external_apis:\n"
+        f"  weather: {{mock_mode: false, base_url: '{stand_in_server}/down'}}\n"
+    )
+    clients = UpstreamClients(load_upstream_configs(config))
+    monkeypatch.setattr(upstream, "_clients", clients)
+
+    async def scenario():
+        try:
+            return await cache.get_weather(WeatherRequest(city="Fallbackville"))
+        finally:
+            await clients.aclose()
+
+    response = asyncio.run(scenario())
+
+    assert response.is_mock
+    stats = clients.resilience_stats()["weather"]
+    assert stats["fallbacks"] == 1
+    assert stats["consecutive_failures"] == 1
+
+
+def test_batch_returns_partial_results_in_input_order(
+    tmp_path, stand_in_server, monkeypatch
+):
+    config = tmp_path / "config.yaml"
+    config.write_text(
+        "external_apis:\n"
+        f"  weather: {{mock_mode: false, base_url: '{stand_in_server}'}}\n"
+        f"  quotes: {{mock_mode: false, base_url: '{stand_in_server}/down'}}\n"
+        "  facts: {mock_mode: true, base_url: 'https://example.invalid'}\n"
+    )
+    clients = UpstreamClients(load_upstream_configs(config))
+    monkeypatch.setattr(upstream, "_clients", clients)
+    monkeypatch.setattr(cache, "_caches", {})
+    monkeypatch.setattr(settings, "external_fallback_to_mock", False)
+    batch = [
+        {"id": "a", "operation": "weather", "weather": {"city": "Tokyo"}},
+        {"id": "b", "operation": "weather", "weather": {"city": "TOKYO"}},
+        {"id": "c", "operation": "quote"},
+        {"id": "d", "operation": "fact"},
+        {"id": "e", "operation": "weather"},
+    ]
+
+    with TestClient(app) as client:
+        response = client.post("/api/v1/external/batch", json={"requests": batch})
+        empty = client.post("/api/v1/external/batch", json={"requests": []})
+        unknown = client.post(
+            "/api/v1/external/batch",
+            json={"requests": [*batch, {"id": "f", "operation": "horoscope"}]},
+        )
+    asyncio.run(clients.aclose())
+
+    body = response.json()
+    results = {result["id"]: result for result in body["results"]}
+    assert response.status_code == 200
+    assert [result["id"] for result in body["results"]] == list("abcde")
+    assert (body["succeeded"], body["failed"]) == (3, 2)
+    assert results["a"]["weather"] == results["b"]["weather"]
+    assert results["d"]["fact"]["fact"]
+    assert [results[id]["status"] for id in "ce"] == [502, 422]
+    # 同じ都市（表記揺れ）の天気は1回の上流呼び出しにまとまる
+    assert len(StandInHandler.ports) == 2
+    assert empty.status_code == 422
+    # specのenumにないoperationはリクエスト全体をバリデーションエラーにする
+    assert unknown.status_code == 422
+    assert unknown.json()["detail"][0]["loc"] == ["body", "requests", 5, "operation"]
@@ -0,0 +1,101 @@
+import copy
+
+import fragment_cache
+import generate_backend_code as backend
+import generate_frontend_code as frontend
+import pytest
+
+SPEC = {
+    "components": {
+        "schemas": {
+            "Quote": {
+                "type": "object",
+                "required": ["quote"],
+                "properties": {"quote": {"type": "string"}},
+            },
+            "Fact": {
+                "type": "object",
+                "properties": {"fact": {"type": "string"}},
+            },
+            "Joke": {
+                "type": "object",
+                "properties": {"joke": {"type": "string"}},
+            },
+        }
+    }
+}
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """テストごとに空の断片キャッシュを有効にします。"""
+    monkeypatch.setattr(fragment_cache, "_enabled", True)
+    monkeypatch.setattr(fragment_cache, "_fragments", {})
+    monkeypatch.setattr(fragment_cache, "_used", set())
+    monkeypatch.setattr(fragment_cache, "stats", {"hits": 0, "misses": 0})
+    return fragment_cache
+
+
+def _render_cycle(render, spec):
+    fragment_cache.begin_cycle()
+    content = render(spec)
+    fragment_cache.end_cycle()
+    return content, dict(fragment_cache.stats)
+
+
+def test_memoize_returns_the_cached_fragment_for_equal_arguments(cache):
+    calls = []
+
+    @fragment_cache.memoize
+    def render(name, schema):
+        calls.append(name)
+        return f"class {name}: {sorted(schema)}"
+
+    first = render("Quote", {"b": 1, "a": 2})
+    # 辞書のキーの順番が違っても同じ内容ならヒットする
+    assert render("Quote", {"a": 2, "b": 1}) == first
+    render("Quote", {"a": 3, "b": 1})
+    assert calls == ["Quote", "Quote"]
+    assert cache.stats == {"hits": 1, "misses": 2}
+
+
+def test_memoize_is_disabled_outside_watch_mode(monkeypatch, cache):
+    monkeypatch.setattr(fragment_cache, "_enabled", False)
+    backend.render_pydantic_models(SPEC)
+    assert cache.stats == {"hits": 0, "misses": 0}
+    assert not cache._fragments
+
+
+def test_only_the_edited_schema_is_rendered_again(cache):
+    before, stats = _render_cycle(backend.render_pydantic_models, SPEC)
+    assert stats == {"hits": 0, "misses": 3}
+
+    edited = copy.deepcopy(SPEC)
+    edited["components"]["schemas"]["Fact"]["properties"]["source"] = {"type": "string"}
+    after, stats = _render_cycle(backend.render_pydantic_models, edited)
+
+    assert stats == {"hits": 2, "misses": 1}
+    assert "source: Optional[str]" in after
+    assert "source: Optional[str]" not in before
+    # 同じ内容の再生成は描画し直さず、以前と同じ出力になる
+    assert _render_cycle(backend.render_pydantic_models, SPEC) == (
+        before,
+        {"hits": 2, "misses": 1},
+    )
+
+
+def test_end_cycle_prunes_unused_fragments_of_rendered_kinds_only(cache):
+    _render_cycle(backend.render_pydantic_models, SPEC)
+    _render_cycle(frontend.render_typescript_types, SPEC)
+    kinds = {kind for kind, _ in cache._fragments}
+    assert kinds == {"generate_model_class", "generate_typescript_interface"}
+
+    smaller = copy.deepcopy(SPEC)
+    del smaller["components"]["schemas"]["Joke"]
+    _render_cycle(backend.render_pydantic_models, smaller)
+
+    counts = {kind: 0 for kind in kinds}
+    for kind, _ in cache._fragments:
+        counts[kind] += 1
+    # 使われなくなったモデルの断片は破棄し、描画しなかったTypeScriptの断片は残す
+    assert counts == {"generate_model_class": 2, "generate_typescript_interface": 3}
@@ -0,0 +1,157 @@
+import json
+import re
+import shutil
+import subprocess
+
+import generate_frontend_code as frontend
+import pytest
+
+SPEC = {
+    "paths": {
+        "/quote": {"get": {"operationId": "get_quote", "responses": {}}},
+        "/reset": {"post": {"operationId": "reset_cache", "responses": {}}},
+    }
+}
+
+NODE = shutil.which("node")
+
+# 生成されたクライアントで使われている型注釈（引数・変数・戻り値）
+_TYPE = (
+    r"(?:[A-Z]\w*(?:<[^()\n]*?>)?|string|number|any|boolean|unknown|void)"
+    r"(?: \| (?:[A-Z]\w*|undefined|null))*"
+)
+_ANNOTATION = re.compile(rf"(?<=[\w)])\??: {_TYPE}(?![\w.(])")
+_CAST = re.compile(r"\s+as\s+[\w<>| ]+?(?=[;),])")
+_FIELD = re.compile(r"^(\s*)(\w+): [^;=\n]+;$", re.MULTILINE)
+
+
+def _strip_type_arguments(source: str) -> str:
+    """識別子の直後の型引数（`fetchJson<T>(`・`new Map<...>(`）を取り除きます。"""
+    output = []
+    index = 0
+    while index < len(source):
+        char = source[index]
+        if char == "<" and index and source[index - 1].isalnum():
+            depth, end = 0, index
+            while end < len(source):
+                depth += {"<": 1, ">": -1}.get(source[end], 0)
+                if depth == 0:
+                    break
+                end += 1
+            if source[end + 1 : end + 2] == "(":
+                index = end + 1
+                continue
+        output.append(char)
+        index += 1
+    return "".join(output)
+
+
+def client_javascript(content: str) -> str:
+    """生成されたTypeScriptからApiClientの部分を取り出し、型を取り除いたJavaScript"""
+    start = content.index("function withSignal")
+    end = content.index("// apiMethodsが共有するAPIクライアント")
+    source = re.sub(r"\b(?:export|private)\s+", "", content[start:end])
+    source = _strip_type_arguments(source)
+    source = _FIELD.sub(r"\1\2;", source)
+    source = _CAST.sub("", source)
+    return _ANNOTATION.sub("", source)
+
+
+# 呼び出し回数を数え、signalで中断できる偽のfetch（応答は20ミリ秒後）
+NODE_SCRIPT = """
+let calls = 0;
+let now = 1_000_000;
+Date.now = () => now;
+globalThis.fetch = (url, init) => new Promise((resolve, reject) => {
+  const n = ++calls;
+  const timer = setTimeout(() => resolve({ ok: true, json: async () => ({ n }) }), 20);
+  init.signal.addEventListener('abort', () => {
+    clearTimeout(timer);
+    reject(init.signal.reason);
+  });
+});
+
+const run = async () => {
+  const results = {};
+
+  let client = createApiClient('http://api');
+  const both = await Promise.all([client.get('/quote'), client.get('/quote')]);
+  results.dedup = { calls, values: both.map((value) => value.n) };
+
+  calls = 0;
+  client = createApiClient('http://api');
+  const controller = new AbortController();
+  const aborted = client.get('/quote', { signal: controller.signal });
+  const other = client.get('/quote');
+  controller.abort(new Error('aborted by caller'));
+  results.abort = {
+    aborted: await aborted.then(() => 'resolved', (error) => error.message),
+    other: (await other).n,
+    calls,
+  };
+
+  calls = 0;
+  client = createApiClient('http://api', { staleTime: 1000 });
+  const first = await client.get('/quote');
+  const cached = await client.get('/quote');
+  now += 1001;
+  const expired = await client.get('/quote');
+  results.staleTime = { values: [first.n, cached.n, expired.n], calls };
+
+  calls = 0;
+  client = createApiClient('http://api', { staleTime: 1000 });
+  const stale = client.get('/quote');
+  client.invalidate('/quote');
+  const fresh = client.get('/quote');
+  const values = [(await stale).n, (await fresh).n, (await client.get('/quote')).n];
+  results.invalidate = { values, calls };
+
+  console.log(JSON.stringify(results));
+};
+run();
+"""
+
+
+@pytest.fixture(scope="module")
+def client_results():
+    if NODE is None:
+        pytest.skip("nodeがありません")
+    script = client_javascript(frontend.render_typescript_types(SPEC)) + NODE_SCRIPT
+    completed = subprocess.run(
+        [NODE, "-e", script], capture_output=True, text=True, timeout=30, check=True
+    )
+    return json.loads(completed.stdout)
+
+
+def test_api_methods_share_one_lazy_client_and_accept_request_options():
+    content = frontend.render_typescript_types(SPEC)
+
+    assert "export function getApiClient(): ApiClient {" in content
+    assert "getQuote: (options?: RequestOptions): Promise<any> => {" in content
+    assert "getApiClient().get(API_ENDPOINTS.GET_QUOTE, options);" in content
+    # ボディのないPOSTはオプションをボディとして送らない
+    assert "getApiClient().post(API_ENDPOINTS.RESET_CACHE, undefined, options);" in (
+        content
+    )
+    assert "createApiClient(" not in content.split("export const apiMethods")[1]
+
+
+def test_concurrent_gets_share_one_fetch(client_results):
+    assert client_results["dedup"] == {"calls": 1, "values": [1, 1]}
+
+
+def test_aborting_one_caller_does_not_abort_the_shared_fetch(client_results):
+    assert client_results["abort"] == {
+        "aborted": "aborted by caller",
+        "other": 1,
+        "calls": 1,
+    }
+
+
+def test_get_is_cached_until_stale_time_expires(client_results):
+    assert client_results["staleTime"] == {"values": [1, 1, 2], "calls": 2}
+
+
+def test_invalidate_drops_in_flight_get_from_the_cache(client_results):
+    # 無効化前に始まった取得の応答はキャッシュされず、以降は新しい取得の応答を返す
+    assert client_results["invalidate"] == {"values": [1, 2, 2], "calls": 2}
@@ -0,0 +1,97 @@
+import pytest
+from generation_manifest import (
+    compute_generator_versions,
+    compute_section_hashes,
+    compute_target_fingerprints,
+    diff_sections,
+    find_stale_targets,
+    target_generator_modules,
+)
+from generation_pipeline import freeze
+
+SPEC = {
+    "openapi": "3.1.0",
+    "info": {"title": "test", "version": "1.0.0"},
+    "tags": [{"name": "health"}],
+    "paths": {
+        "/api/v1/health/": {
+            "get": {"tags": ["health"], "operationId": "health_check"},
+        },
+    },
+    "components": {
+        "schemas": {"HealthResponse": {"type": "object", "properties": {}}},
+    },
+}
+VERSIONS = {"scripts/generate_backend_code.py": "v1"}
+
+
+def _fingerprints(spec):
+    return compute_target_fingerprints(compute_section_hashes(spec), VERSIONS)
+
+
+def test_path_description_change_does_not_touch_models():
+    before = _fingerprints(SPEC)
+    changed = {
+        **SPEC,
+        "paths": {
+            "/api/v1/health/": {
+                "get": {
+                    "tags": ["health"],
+                    "operationId": "health_check",
+                    "description": "更新",
+                },
+            },
+        },
+    }
+    after = _fingerprints(changed)
+
+    assert before["models"] == after["models"]
+    assert before["router"] != after["router"]
+    assert before["docs"] != after["docs"]
+
+
+def test_info_change_only_affects_docs():
+    before = _fingerprints(SPEC)
+    after = _fingerprints({**SPEC, "info": {"title": "renamed", "version": "1.0.0"}})
+
+    changed = [name for name in before if before[name] != after[name]]
+    assert changed == ["docs"]
+
+
+def test_empty_manifest_marks_everything_stale():
+    fingerprints = _fingerprints(SPEC)
+    assert find_stale_targets({}, fingerprints) == list(fingerprints)
+
+
+def test_diff_sections_reports_changed_names():
+    old = compute_section_hashes(SPEC)
+    new_spec = {
+        **SPEC,
+        "components": {"schemas": {"HealthResponse": {"type": "object"}}},
+    }
+    assert diff_sections(old, compute_section_hashes(new_spec)) == {
+        "schemas": ["HealthResponse"]
+    }
+
+
+def test_frozen_spec_rejects_mutation_and_keeps_list_repr():
+    frozen = freeze(SPEC)
+    with pytest.raises(TypeError):
+        frozen["paths"] = {}
+    assert repr(freeze([1, 2])) == "[1, 2]"
+
+
+def test_renderer_modules_are_part_of_the_generator_version():
+    # 生成スクリプトがimportするモジュール（$refの解決など）の変更でも再生成する
+    assert "scripts/schema_resolver.py" in target_generator_modules("models")
+    assert "scripts/fragment_cache.py" in target_generator_modules("frontend")
+    assert "scripts/backend_sharding.py" in target_generator_modules("router")
+    assert "scripts/schema_resolver.py" not in target_generator_modules("docs")
+
+    versions = compute_generator_versions()
+    before = compute_target_fingerprints(compute_section_hashes(SPEC), versions)
+    changed = {**versions, "scripts/schema_resolver.py": "changed"}
+    after = compute_target_fingerprints(compute_section_hashes(SPEC), changed)
+
+    stale = [name for name in before if before[name] != after[name]]
+    assert stale == ["frontend", "models", "router", "services"]
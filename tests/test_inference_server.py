@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+import torch
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.generated.generated_models import GenerateTextRequest
+from app.services.text.backends import (
+    TINY_RANDOM_MODEL,
+    RemoteBackend,
+    TransformersBackend,
+)
+from app.services.text.generation import generate_text, get_backend
+from app.services.text.inference_server import start_server, worker_prefix_cache
+from app.services.text.prefix_cache import PrefixKVCache
+from main import app
+
+
+@pytest.fixture
+def restore_num_threads():
+    # start_serverは親プロセスを1スレッドにする（forkの前にスレッドプールを作らない）
+    num_threads = torch.get_num_threads()
+    yield
+    torch.set_num_threads(num_threads)
+
+
+def test_remote_backend_generates_through_shared_model_processes(
+    tmp_path, restore_num_threads
+):
+    address = str(tmp_path / "inference.sock")
+    backend = TransformersBackend(
+        TINY_RANDOM_MODEL, prefix_cache=PrefixKVCache(max_bytes=1 << 20)
+    )
+    server = start_server(backend, address, workers=2, authkey=b"secret")
+    try:
+        remote = RemoteBackend(address, TINY_RANDOM_MODEL, authkey=b"secret")
+        local = TransformersBackend(TINY_RANDOM_MODEL)
+        chunks = []
+
+        results = remote.generate_batch(["hello", "world"], 6, 0.0)
+        streamed = remote.generate_stream("hello", 6, 0.0, chunks.append)
+
+        assert [r.text for r in results] == [
+            r.text for r in local.generate_batch(["hello", "world"], 6, 0.0)
+        ]
+        assert "".join(chunks) == streamed.text == results[0].text
+        assert streamed.token_count == 6
+        assert remote.ping() in {process.pid for process in server.processes}
+        # 接頭辞KVキャッシュは親プロセスでは持たず、推論プロセスごとにfork後に作る
+        assert backend.prefix_cache is None
+        assert remote.generate("hello", 6, 0.0).prefix_cache is not None
+    finally:
+        server.close()
+
+
+def test_unreachable_inference_server_returns_503(tmp_path):
+    backend = RemoteBackend(str(tmp_path / "missing.sock"))
+    request = GenerateTextRequest(prompt="hello", max_length=8, temperature=0.7)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(generate_text(request, backend))
+
+    assert error.value.status_code == 503
+
+
+def test_prefix_cache_budget_is_split_across_inference_processes(monkeypatch):
+    monkeypatch.setattr(settings, "text_prefix_cache_max_bytes", 1 << 20)
+    assert worker_prefix_cache(4).max_bytes == 1 << 18
+
+
+def test_api_starts_when_the_inference_server_is_down(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "text_backend", "remote")
+    monkeypatch.setattr(settings, "text_warm_up", True)
+    monkeypatch.setattr(
+        settings, "text_inference_address", str(tmp_path / "missing.sock")
+    )
+    get_backend.cache_clear()
+    try:
+        with TestClient(app) as client:
+            assert client.get("/api/v1/health/").status_code == 200
+    finally:
+        get_backend.cache_clear()
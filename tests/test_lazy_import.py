@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from app.utils.lazy_import import LazyImpl
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_lazy_impl_resolves_on_first_call():
+    proxy = LazyImpl("json", "dumps")
+
+    assert not proxy.resolved
+    assert proxy({"a": 1}) == '{"a": 1}'
+    assert proxy.resolved
+
+
+def test_lazy_mode_defers_service_imports():
+    probe = (
+        "import sys, main; "
+        "print(sorted(m for m in sys.modules if m.startswith('app.services')))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=PROJECT_ROOT,
+        env=dict(os.environ, LAZY_SERVICE_IMPORTS="true"),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert completed.stdout.strip() == "[]"
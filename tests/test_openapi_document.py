@@ -0,0 +1,43 @@
+import json
+
+from generation_manifest import PROJECT_ROOT
+from generation_pipeline import RENDER_STAGES, load_spec_model
+
+from app.core.openapi_document import OpenAPIDocument, route_signature
+from main import create_application, customize_openapi_schema
+
+
+def test_prebuilt_schema_used_only_when_routes_match(tmp_path):
+    app = create_application()
+    paths = {}
+    for path, method in route_signature(app):
+        paths.setdefault(path, {})[method] = {"summary": "prebuilt"}
+    prebuilt = tmp_path / "openapi.json"
+    prebuilt.write_text(
+        json.dumps({"openapi": "3.1.0", "info": {"title": "t"}, "paths": paths}),
+        encoding="utf-8",
+    )
+
+    document = OpenAPIDocument(app, customize_openapi_schema, prebuilt)
+    schema = json.loads(document.asset.body)
+    assert document.source == str(prebuilt)
+    assert schema["servers"][0]["url"] == "http://localhost:8000"
+
+    # ルートが一致しない場合は実行中のルートからスキーマを構築する
+    del paths[next(iter(paths))]
+    prebuilt.write_text(json.dumps({"paths": paths}), encoding="utf-8")
+    other = OpenAPIDocument(create_application(), customize_openapi_schema, prebuilt)
+    assert other.asset.body
+    assert other.source == "routes"
+
+
+def test_docs_stage_writes_prebuilt_schema_matching_routes(tmp_path):
+    # docsステージが書き出すスキーマは実行中のルートと一致し、起動時にそのまま使われる
+    render = RENDER_STAGES["docs"]["docs/generated/openapi.json"]
+    model = load_spec_model(PROJECT_ROOT / "source" / "openapi.yaml")
+    prebuilt = tmp_path / "openapi.json"
+    prebuilt.write_text(render(model.spec), encoding="utf-8")
+
+    document = OpenAPIDocument(create_application(), customize_openapi_schema, prebuilt)
+    assert json.loads(document.asset.body)["paths"]
+    assert document.source == str(prebuilt)
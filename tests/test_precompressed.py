@@ -0,0 +1,60 @@
+import gzip
+import os
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.core.precompressed import PrecompressedAsset, parse_accept_encoding
+
+BODY = b'{"openapi":"3.1.0","paths":{}}' * 200
+
+
+def _client(asset: PrecompressedAsset) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/asset")
+    async def serve(request: Request):
+        return asset.response(request)
+
+    return TestClient(app)
+
+
+def test_parse_accept_encoding_with_quality():
+    assert parse_accept_encoding("gzip;q=0.5, br, identity;q=0") == {
+        "gzip": 0.5,
+        "br": 1.0,
+        "identity": 0.0,
+    }
+
+
+def test_serves_precompressed_variant_and_not_modified():
+    asset = PrecompressedAsset.from_bytes(BODY, "application/json", 0)
+    client = _client(asset)
+
+    response = client.get("/asset", headers={"accept-encoding": "gzip;q=1, br;q=0"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == asset.etag("gzip")
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.content == BODY  # httpxが展開する
+    assert gzip.decompress(asset.variants["gzip"]) == BODY
+
+    for etag in (asset.etag(), asset.etag("gzip")):
+        not_modified = client.get("/asset", headers={"if-none-match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+
+    identity = client.get("/asset", headers={"accept-encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.headers["etag"] == asset.etag()
+
+
+def test_file_asset_uses_mtime_for_if_modified_since(tmp_path):
+    path = tmp_path / "swagger.html"
+    path.write_bytes(b"<html>" + b"docs " * 500 + b"</html>")
+    os.utime(path, (1_700_000_000, 1_700_000_000))
+    client = _client(PrecompressedAsset.from_file(path, "text/html; charset=utf-8"))
+
+    response = client.get("/asset")
+    assert response.headers["last-modified"] == "Tue, 14 Nov 2023 22:13:20 GMT"
+    since = {"if-modified-since": response.headers["last-modified"]}
+    assert client.get("/asset", headers=since).status_code == 304
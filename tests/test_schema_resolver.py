@@ -0,0 +1,95 @@
+import generate_backend_code as backend
+import generate_frontend_code as frontend
+import pytest
+from pydantic import ValidationError
+from schema_resolver import SchemaResolver
+
+SPEC = {
+    "components": {
+        "schemas": {
+            "TreeNode": {
+                "type": "object",
+                "properties": {
+                    "children": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/TreeNode"},
+                    },
+                    "owner": {"$ref": "#/components/schemas/User"},
+                },
+            },
+            "Status": {"type": "string", "enum": ["active", "disabled"]},
+            "User": {
+                "type": "object",
+                "required": ["name"],
+                "properties": {
+                    "name": {"type": "string"},
+                    "status": {"$ref": "#/components/schemas/Status"},
+                },
+            },
+            "Admin": {
+                "allOf": [
+                    {"$ref": "#/components/schemas/User"},
+                    {
+                        "type": "object",
+                        "required": ["level"],
+                        "properties": {
+                            "level": {"type": "integer"},
+                            "contact": {
+                                "oneOf": [
+                                    {"$ref": "#/components/schemas/User"},
+                                    {"type": "string"},
+                                    {"type": "null"},
+                                ]
+                            },
+                        },
+                    },
+                ]
+            },
+        }
+    }
+}
+
+
+def test_graph_cycles_and_emission_order():
+    resolver = SchemaResolver(SPEC)
+
+    assert resolver.cycles == [["TreeNode"]]
+    # 参照先（User, Status）が参照元より先に並ぶ
+    assert resolver.emission_order() == ["Status", "User", "TreeNode", "Admin"]
+    merged = resolver.merged_object("Admin")
+    assert list(merged["properties"]) == ["name", "status", "level", "contact"]
+    assert merged["required"] == ["name", "level"]
+
+
+def test_generated_models_resolve_refs_and_compositions():
+    content = backend.render_pydantic_models(SPEC)
+    namespace: dict = {}
+    exec(compile(content, "generated_models.py", "exec"), namespace)
+
+    assert "TreeNode.model_rebuild()" in content
+    node = namespace["TreeNode"](children=[{"owner": {"name": "a"}}])
+    assert node.children[0].owner.name == "a"
+    admin = namespace["Admin"](name="root", level=1, contact="mail")
+    assert admin.contact == "mail"
+    assert namespace["User"](name="b", status="active").status == "active"
+
+
+def test_generated_models_restrict_enum_strings_to_literals():
+    content = backend.render_pydantic_models(SPEC)
+    namespace: dict = {}
+    exec(compile(content, "generated_models.py", "exec"), namespace)
+
+    assert 'status: Optional[Literal["active", "disabled"]] = None' in content
+    # Literalの引用符は前方参照として扱わない
+    assert "User.model_rebuild()" not in content
+    with pytest.raises(ValidationError):
+        namespace["User"](name="b", status="deleted")
+
+
+def test_typescript_types_resolve_refs_and_compositions():
+    content = frontend.render_typescript_types(SPEC)
+
+    assert "children?: TreeNode[];" in content
+    assert 'status?: "active" | "disabled";' in content
+    assert "export interface Admin {" in content
+    assert "contact?: User | string | null;" in content
@@ -0,0 +1,58 @@
+import pytest
+
+from app.services.text.script_detection import (
+    HAN,
+    HANGUL,
+    HIRAGANA,
+    KATAKANA,
+    LATIN,
+    count_scripts,
+    count_scripts_batch,
+    detect_language,
+    detect_languages,
+)
+
+
+@pytest.mark.parametrize(
+    ("text", "language"),
+    [
+        ("FastAPIでテキストを生成します", "ja"),
+        ("我们今天在公园里散步", "zh"),
+        ("오늘은 날씨가 좋습니다", "ko"),
+        ("The quick brown fox", "en"),
+        ("日本語とEnglishが半分ずつ mixed text here", "mixed"),
+        ("12345 !?", "unknown"),
+        ("𠀋𠀋𠀋", "zh"),
+    ],
+)
+def test_detects_language_from_unicode_scripts(text, language):
+    assert detect_language(text) == language
+
+
+def test_counts_script_ranges_and_stops_early_on_long_input():
+    counts = count_scripts("ひらがなカタカナ漢字ｶﾀｶﾅ Ｆｕｌｌ 한글", max_letters=None)
+    assert (counts[HIRAGANA], counts[KATAKANA], counts[HAN]) == (4, 8, 2)
+    assert (counts[LATIN], counts["latin_words"], counts[HANGUL]) == (4, 1, 2)
+
+    # 先頭の英語だけで打ち切るため、後半の日本語は数えない
+    long_text = "english words " * 1000 + "日本語" * 1000
+    assert count_scripts(long_text, max_letters=100)[HAN] == 0
+    assert detect_language(long_text) == "en"
+    assert detect_language(long_text, max_letters=None) == "mixed"
+
+
+def test_batch_detection_matches_single_text_detection():
+    texts = [
+        "FastAPIでテキストを生成します",
+        "",
+        "𠀋𠀋𠀋 and 한글",
+        "english words " * 1000 + "日本語" * 1000,
+        "!" * 5000 + "日本語" * 2000 + " english" * 100,
+        "オーバーラップ" * 300 + "word",
+    ]
+
+    assert count_scripts_batch(texts) == [count_scripts(text) for text in texts]
+    assert count_scripts_batch(texts, max_letters=None) == [
+        count_scripts(text, max_letters=None) for text in texts
+    ]
+    assert detect_languages(texts) == [detect_language(text) for text in texts]
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from app.generated.generated_models import WeatherRequest
+from app.utils.single_flight import SingleFlight, single_flight
+
+
+def test_concurrent_callers_share_one_call_and_survive_cancellation():
+    flights = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "晴れ"
+
+    async def scenario():
+        callers = [
+            asyncio.ensure_future(flights.do(("weather", "tokyo"), fetch))
+            for _ in range(500)
+        ]
+        await asyncio.sleep(0.01)
+        callers[0].cancel()  # 1人のクライアントが切断する
+        return await asyncio.gather(*callers, return_exceptions=True)
+
+    results = asyncio.run(scenario())
+
+    assert calls == 1
+    assert isinstance(results[0], asyncio.CancelledError)
+    assert results[1:] == [("晴れ", True)] * 499
+    assert flights.stats() == {"in_flight": 0, "calls": 1, "shared": 499}
+
+
+def test_decorator_coalesces_by_operation_and_normalized_request():
+    calls = []
+
+    @single_flight(key=lambda request: request.city.casefold())
+    async def get_weather(request: WeatherRequest) -> str:
+        calls.append(request.city)
+        await asyncio.sleep(0.01)
+        if request.city == "Nowhere":
+            raise LookupError(request.city)
+        return request.city
+
+    async def scenario():
+        same = await asyncio.gather(
+            get_weather(WeatherRequest(city="Tokyo")),
+            get_weather(WeatherRequest(city="TOKYO")),
+            get_weather(WeatherRequest(city="Osaka")),
+        )
+        failed = await asyncio.gather(
+            *(get_weather(WeatherRequest(city="Nowhere")) for _ in range(3)),
+            return_exceptions=True,
+        )
+        return same, failed
+
+    same, failed = asyncio.run(scenario())
+
+    assert same == ["Tokyo", "Tokyo", "Osaka"]
+    assert calls == ["Tokyo", "Osaka", "Nowhere"]
+    # 失敗は待っていた全員に同じ例外として届き、次の呼び出しは再実行する
+    assert all(isinstance(error, LookupError) for error in failed)
+    assert get_weather.flights.stats()["in_flight"] == 0
+    with pytest.raises(LookupError):
+        asyncio.run(get_weather(WeatherRequest(city="Nowhere")))
+    assert len(calls) == 4
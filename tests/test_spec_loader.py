@@ -0,0 +1,30 @@
+import os
+
+import spec_loader
+
+
+def test_cache_hit_skips_yaml_parsing(tmp_path, monkeypatch):
+    spec_path = tmp_path / "openapi.yaml"
+    spec_path.write_text("openapi: 3.1.0\npaths: {}\n", encoding="utf-8")
+    cache_dir = tmp_path / "cache"
+
+    first = spec_loader.load_openapi_spec(spec_path, cache_dir=cache_dir)
+
+    def fail_parse(data):
+        raise AssertionError("キャッシュヒット時はYAMLを解析しない")
+
+    monkeypatch.setattr(spec_loader, "parse_yaml", fail_parse)
+    # touchのみ（内容は同じ）の場合も内容ハッシュでキャッシュを再利用する
+    os.utime(spec_path, ns=(1, 1))
+    assert spec_loader.load_openapi_spec(spec_path, cache_dir=cache_dir) == first
+
+
+def test_content_change_invalidates_cache(tmp_path):
+    spec_path = tmp_path / "openapi.yaml"
+    cache_dir = tmp_path / "cache"
+    spec_path.write_text("info: {title: a}\n", encoding="utf-8")
+    spec_loader.load_openapi_spec(spec_path, cache_dir=cache_dir)
+
+    spec_path.write_text("info: {title: bb}\n", encoding="utf-8")
+    spec = spec_loader.load_openapi_spec(spec_path, cache_dir=cache_dir)
+    assert spec["info"]["title"] == "bb"
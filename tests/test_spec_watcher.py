@@ -0,0 +1,108 @@
+import threading
+import time
+
+import fragment_cache
+import generate_all
+import pytest
+import spec_watcher
+from spec_watcher import InotifyWatcher, PollingWatcher, create_watcher
+
+
+def _save_repeatedly(path, times=3, interval=0.05):
+    """エディタの連続保存のように、短い間隔でファイルを書き換えます。"""
+
+    def save():
+        for index in range(times):
+            time.sleep(interval)
+            path.write_text(f"openapi: 3.1.0\n# {'x' * index}\n", encoding="utf-8")
+
+    thread = threading.Thread(target=save)
+    thread.start()
+    return thread
+
+
+@pytest.fixture
+def spec_path(tmp_path):
+    path = tmp_path / "openapi.yaml"
+    path.write_text("openapi: 3.1.0\n", encoding="utf-8")
+    return path
+
+
+@pytest.fixture(params=["inotify", "polling"])
+def watcher(request, spec_path):
+    if request.param == "inotify":
+        try:
+            watcher = InotifyWatcher(spec_path, debounce=0.15)
+        except (OSError, AttributeError):
+            pytest.skip("inotifyが利用できません")
+    else:
+        watcher = PollingWatcher(spec_path, debounce=0.15, interval=0.01)
+    yield watcher
+    watcher.close()
+
+
+def test_consecutive_saves_are_debounced_into_one_change(watcher, spec_path):
+    thread = _save_repeatedly(spec_path)
+    assert watcher.wait(timeout=2)
+    thread.join()
+    # 連続した保存は1回の変更として扱い、後続の変更は残らない
+    assert not watcher.wait(timeout=0.3)
+
+
+def test_other_files_in_the_directory_are_ignored(watcher, spec_path):
+    (spec_path.parent / "other.yaml").write_text("x: 1\n", encoding="utf-8")
+    assert not watcher.wait(timeout=0.3)
+
+
+def test_falls_back_to_polling_when_inotify_is_unavailable(monkeypatch, spec_path):
+    assert isinstance(create_watcher(spec_path, polling=True), PollingWatcher)
+
+    def unavailable(*args, **kwargs):
+        raise OSError("inotifyはLinuxでのみ利用できます")
+
+    monkeypatch.setattr(spec_watcher, "InotifyWatcher", unavailable)
+    watcher = create_watcher(spec_path, debounce=0.05)
+    assert watcher.name == "polling"
+    assert watcher.debounce == 0.05
+
+
+class FakeWatcher:
+    name = "fake"
+
+    def __init__(self, changes):
+        self.changes = list(changes)
+        self.closed = False
+
+    def wait(self, timeout=None):
+        if not self.changes:
+            raise KeyboardInterrupt
+        return self.changes.pop(0)
+
+    def close(self):
+        self.closed = True
+
+
+def test_watch_ends_every_regeneration_cycle_even_when_it_fails(monkeypatch, spec_path):
+    fake = FakeWatcher([False, True, True])
+    monkeypatch.setattr(generate_all, "create_watcher", lambda *a, **k: fake)
+    outcomes = [ValueError("YAMLの構文エラー"), (0, {"spec_sha256": "new"}, True)]
+    manifests = []
+
+    def regenerate(project_root, yaml_path, args, manifest):
+        manifests.append(manifest)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    cycles = []
+    monkeypatch.setattr(generate_all, "regenerate", regenerate)
+    monkeypatch.setattr(fragment_cache, "end_cycle", lambda: cycles.append("end"))
+
+    args = generate_all.parse_args(["--watch", "--poll"])
+    assert generate_all.watch(spec_path.parent, spec_path, args, {}) == 0
+
+    # 変更のあった2回とも再生成し、失敗したサイクルでも断片を整理する
+    assert cycles == ["end", "end"]
+    assert manifests == [{}, {}]
+    assert fake.closed
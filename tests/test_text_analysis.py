@@ -0,0 +1,67 @@
+import asyncio
+import importlib
+import threading
+
+from fastapi.testclient import TestClient
+
+from app.generated.generated_models import EchoTextBatchRequest
+from app.services.text import analysis
+from app.services.text.analysis import analyze_text, analyze_texts
+from main import app
+
+
+def test_batch_echo_matches_single_echo_in_input_order():
+    client = TestClient(app)
+    texts = ["素晴らしい一日でした", "This is GREAT but awful", "12345", "カタカナ"]
+
+    batch = client.post("/api/v1/text/echo/batch", json={"texts": texts})
+    single = client.post("/api/v1/text/echo", json={"text": texts[0]}).json()
+
+    assert batch.status_code == 200
+    results = batch.json()["results"]
+    assert results == [analyze_text(text) for text in texts]
+    assert results[0] == single["analysis"]
+    assert [r["language"] for r in results] == ["ja", "en", "unknown", "ja"]
+    assert [r["sentiment"] for r in results] == [
+        "positive",
+        "negative",
+        "neutral",
+        "neutral",
+    ]
+    assert client.post("/api/v1/text/echo/batch", json={"texts": []}).status_code == 422
+    too_long = {"texts": ["a" * 10001]}
+    assert client.post("/api/v1/text/echo/batch", json=too_long).status_code == 422
+
+
+def test_batched_keyword_scan_keeps_matches_within_each_text():
+    # 連結してもテキストの境界をまたいだキーワードは照合しない
+    texts = ["goo", "d", "", "Bad\nGood", "素晴らし", "い", "excellent"]
+
+    assert analyze_texts(texts) == [analyze_text(text) for text in texts]
+    assert [r["sentiment"] for r in analyze_texts(texts)][:4] == [
+        "neutral",
+        "neutral",
+        "neutral",
+        "negative",
+    ]
+
+
+def test_batch_analysis_runs_outside_the_event_loop_thread(monkeypatch):
+    # パッケージは同名の関数を公開するため、モジュールはimportlibで取得する
+    impl = importlib.import_module("app.services.text.post_echo_text_batch_impl")
+    threads = []
+
+    def record_thread(texts):
+        threads.append(threading.current_thread())
+        return analysis.analyze_texts(texts)
+
+    monkeypatch.setattr(impl, "analyze_texts", record_thread)
+
+    async def scenario():
+        request = EchoTextBatchRequest(texts=["good"])
+        return await impl.post_echo_text_batch_impl(request)
+
+    response = asyncio.run(scenario())
+
+    assert response.results[0]["sentiment"] == "positive"
+    assert threads and threads[0] is not threading.main_thread()
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from app.services.text.backends import RuleBasedBackend
+from app.services.text.batching import BatchScheduler, QueueFullError
+
+
+class RecordingBackend(RuleBasedBackend):
+    def __init__(self):
+        super().__init__(seed=0)
+        self.batches: list[tuple[int, float, int]] = []
+
+    def generate_batch(self, prompts, max_length, temperature, stop=()):
+        self.batches.append((max_length, temperature, len(prompts)))
+        return super().generate_batch(prompts, max_length, temperature, stop)
+
+
+async def run_inline(func, *args):
+    return func(*args)
+
+
+def test_groups_concurrent_requests_by_parameters():
+    backend = RecordingBackend()
+    scheduler = BatchScheduler(backend, run_inline, max_batch_size=8, max_wait_ms=5)
+
+    async def submit_all():
+        return await asyncio.gather(
+            *(scheduler.submit(f"p{i}", 50, 0.7) for i in range(5)),
+            *(scheduler.submit(f"q{i}", 50, 1.0) for i in range(2)),
+        )
+
+    outcomes = asyncio.run(submit_all())
+
+    assert sorted(backend.batches) == [(50, 0.7, 5), (50, 1.0, 2)]
+    assert [outcome.batch_size for outcome in outcomes] == [5] * 5 + [2] * 2
+    assert "'p3'" in outcomes[3].result.text
+    assert scheduler.in_flight == 0
+
+
+def test_rejects_requests_when_queue_is_full():
+    scheduler = BatchScheduler(
+        RecordingBackend(), run_inline, max_wait_ms=50, max_queue_size=2
+    )
+
+    async def overflow():
+        waiting = [
+            asyncio.ensure_future(scheduler.submit("p", 10, 0.0)) for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFullError):
+            await scheduler.submit("p", 10, 0.0)
+        return await asyncio.gather(*waiting)
+
+    assert len(asyncio.run(overflow())) == 2
+
+
+def test_cancelled_waiters_keep_their_slot_until_the_batch_finishes():
+    backend = RecordingBackend()
+    release = asyncio.Event()
+    started = asyncio.Event()
+
+    async def run_blocking(func, *args):
+        started.set()
+        await release.wait()
+        return func(*args)
+
+    scheduler = BatchScheduler(
+        backend, run_blocking, max_batch_size=3, max_wait_ms=50, max_queue_size=4
+    )
+
+    async def cancel_during_batch():
+        waiting = [
+            asyncio.ensure_future(scheduler.submit(f"p{i}", 10, 0.0)) for i in range(3)
+        ]
+        await started.wait()
+        for task in waiting:
+            task.cancel()
+        await asyncio.gather(*waiting, return_exceptions=True)
+
+        # 推論中のバッチの3件は呼び出し元がキャンセルされても数える
+        assert scheduler.in_flight == 3
+        queued = asyncio.ensure_future(scheduler.submit("q", 10, 0.0))
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFullError):
+            await scheduler.submit("r", 10, 0.0)
+
+        release.set()
+        await queued
+        assert scheduler.in_flight == 0
+
+    asyncio.run(cancel_during_batch())
+    assert backend.batches == [(10, 0.0, 3), (10, 0.0, 1)]
+
+
+def test_waiter_cancelled_before_flush_releases_its_slot():
+    backend = RecordingBackend()
+    scheduler = BatchScheduler(backend, run_inline, max_wait_ms=10)
+
+    async def cancel_while_queued():
+        waiting = asyncio.ensure_future(scheduler.submit("p", 10, 0.0))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        assert scheduler.in_flight == 0
+        await asyncio.sleep(0.02)
+
+    asyncio.run(cancel_while_queued())
+    assert backend.batches == []
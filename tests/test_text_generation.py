@@ -0,0 +1,167 @@
+import asyncio
+
+import torch
+from fastapi.testclient import TestClient
+from transformers import DynamicCache
+
+from app.generated.generated_models import GenerateTextRequest
+from app.services.text.backends import (
+    STOP_LENGTH,
+    STOP_SEQUENCE,
+    TINY_RANDOM_MODEL,
+    RuleBasedBackend,
+    TransformersBackend,
+    build_tiny_random_model,
+)
+from app.services.text.generation import generate_text
+from app.services.text.prefix_cache import PrefixKVCache, kv_cache_nbytes
+from main import app
+
+
+def test_generate_endpoint_reports_generation_time():
+    client = TestClient(app)
+    response = client.post(
+        "/api/v1/text/generate",
+        json={"prompt": "こんにちは", "max_length": 40, "temperature": 0.7},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["input_prompt"] == "こんにちは"
+    assert len(body["generated_text"]) <= 40
+    assert body["metadata"]["method"] == "rule_based"
+    assert body["metadata"]["generation_time"] >= 0
+    assert client.get("/api/v1/health/").json()["status"] == "healthy"
+
+
+def test_tiny_random_model_generates_offline():
+    backend = TransformersBackend(TINY_RANDOM_MODEL)
+    request = GenerateTextRequest(prompt="hello", max_length=8, temperature=0.0)
+
+    response = asyncio.run(generate_text(request, backend))
+
+    assert backend.loaded
+    assert response.metadata["method"] == "llm"
+    assert response.metadata["token_count"] == 8
+    assert response.metadata["generation_time"] > 0
+
+
+def test_prompt_prefix_kv_is_reused_across_requests():
+    backend = TransformersBackend(
+        TINY_RANDOM_MODEL, prefix_cache=PrefixKVCache(max_bytes=1 << 20, min_tokens=8)
+    )
+    system = "You are a helpful assistant. Answer briefly and politely.\n"
+    first = backend.generate(system + "Q: hello", max_length=6, temperature=0.0)
+    second = backend.generate(system + "Q: weather?", max_length=6, temperature=0.0)
+    uncached = TransformersBackend(TINY_RANDOM_MODEL).generate(
+        system + "Q: weather?", max_length=6, temperature=0.0
+    )
+
+    assert first.prefix_cache["reused_tokens"] == 0
+    # 共通の接頭辞（システムプロンプト + "Q: "）の分だけプレフィルを省略する
+    assert second.prefix_cache["reused_tokens"] == len(system) + 3
+    assert second.prefix_cache["hit_rate"] == 0.5
+    assert second.prefix_cache["saved_prefill_tokens"] == len(system) + 3
+    assert second.text == uncached.text
+
+
+def _random_kv(length: int, layers: int = 2) -> DynamicCache:
+    past_key_values = DynamicCache()
+    for layer in range(layers):
+        past_key_values.update(
+            torch.randn(1, 2, length, 4), torch.randn(1, 2, length, 4), layer
+        )
+    return past_key_values
+
+
+def test_prefix_lookup_copies_only_the_matched_tokens():
+    cache = PrefixKVCache(max_bytes=1 << 20, min_tokens=4)
+    stored = _random_kv(20)
+    cache.store(list(range(20)), stored)
+
+    match = cache.lookup([*range(12), 99, 100])
+
+    assert match.reused_tokens == 12
+    reused = match.past_key_values
+    assert reused.get_seq_length() == 12
+    assert torch.equal(reused.layers[1].values, stored.layers[1].values[..., :12, :])
+    # 切り詰めた長さのテンソルだけを複製し、保存済みのKVは変更しない
+    nbytes = sum(
+        tensor.untyped_storage().nbytes()
+        for layer in reused.layers
+        for tensor in (layer.keys, layer.values)
+    )
+    assert nbytes == kv_cache_nbytes(reused) == kv_cache_nbytes(stored) * 12 // 20
+    assert stored.get_seq_length() == 20
+
+
+def test_prefix_cache_handles_the_cache_returned_by_the_model():
+    # ロックしたtransformersのモデルが返すCache（layers[i].keys/values）をそのまま扱う
+    tokenizer, model = build_tiny_random_model()
+    token_ids = tokenizer("You are a helpful assistant.", return_tensors="pt")
+    with torch.inference_mode():
+        stored = model(**token_ids, use_cache=True).past_key_values
+    prompt_ids = token_ids["input_ids"][0].tolist()
+    cache = PrefixKVCache(max_bytes=1 << 20, min_tokens=8)
+    cache.store(prompt_ids, stored)
+
+    match = cache.lookup([*prompt_ids[:10], 0, 0])
+
+    assert match.reused_tokens == 10
+    assert match.past_key_values.get_seq_length() == 10
+    assert cache.bytes == kv_cache_nbytes(stored) > 0
+    assert stored.get_seq_length() == len(prompt_ids)
+
+
+def test_prefix_lookup_only_matches_entries_sharing_the_first_block():
+    cache = PrefixKVCache(max_bytes=1 << 20, max_entries=2, min_tokens=4)
+    cache.store([1, 2, 3, 4, 5, 6], _random_kv(6))
+    cache.store([1, 2, 3, 4, 5, 6, 7, 8], _random_kv(8))
+    cache.store([9, 2, 3, 4, 5, 6, 7, 8], _random_kv(8))
+
+    # 最も古いエントリは追い出され、同じ先頭のブロックのうち最長の一致を使う
+    assert len(cache) == 2
+    assert cache.lookup([1, 2, 3, 4, 5, 6, 7, 0, 0]).reused_tokens == 7
+    assert cache.lookup([9, 2, 3, 4, 0]).reused_tokens == 4
+    # 先頭のブロックが異なる（min_tokens未満の一致）はミス
+    assert cache.lookup([1, 2, 3, 0, 5, 6, 7, 8, 0]).reused_tokens == 0
+    assert cache.lookup([1, 2, 3, 4]).reused_tokens == 0
+    assert cache.stats()["hits"] == 2
+
+    cache.clear()
+    assert cache.lookup([1, 2, 3, 4, 5, 6, 7, 0]).reused_tokens == 0
+
+
+def test_max_length_is_a_token_budget_and_stop_sequences_end_generation():
+    full = RuleBasedBackend(seed=0).generate(
+        "こんにちは", max_length=20, temperature=0.0
+    )
+    assert full.token_count == len(full.text) == 20
+    assert full.stop_reason == STOP_LENGTH
+
+    stop = full.text[5:8]
+    stopped = RuleBasedBackend(seed=0).generate("こんにちは", 20, 0.0, stop=[stop])
+    assert stopped.text == full.text[: full.text.index(stop)]
+    assert stopped.stop_reason == STOP_SEQUENCE
+
+    # 小さなモデルでも停止文字列で行の生成を止め、出力には含めない
+    llm = TransformersBackend(TINY_RANDOM_MODEL)
+    unstopped = llm.generate("hello world", 30, 0.0)
+    assert "!!" in unstopped.text
+    result = llm.generate("hello world", 30, 0.0, stop=["!!"])
+    streamed: list[str] = []
+    stream_result = llm.generate_stream(
+        "hello world", 30, 0.0, streamed.append, stop=["!!"]
+    )
+    expected = unstopped.text[: unstopped.text.index("!!")]
+    assert result.text == stream_result.text == "".join(streamed) == expected
+    assert result.stop_reason == stream_result.stop_reason == STOP_SEQUENCE
+    assert result.token_count < unstopped.token_count
+
+    request = GenerateTextRequest(
+        prompt="hello world", max_length=30, temperature=0.0, stop=["!!"]
+    )
+    response = asyncio.run(generate_text(request, llm))
+    assert response.generated_text == expected
+    assert response.metadata["stop_reason"] == STOP_SEQUENCE
+    assert response.metadata["token_count"] == result.token_count
@@ -0,0 +1,95 @@
+import asyncio
+import json
+import threading
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from generate_backend_code import render_router_stubs
+from spec_loader import load_openapi_spec
+
+from app.generated.generated_models import GenerateTextRequest
+from app.services.text.backends import TextGenerationBackend
+from app.services.text.generation import stream_text
+from main import app
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_streams_server_sent_events_until_done():
+    client = TestClient(app)
+    with client.stream(
+        "POST", "/api/v1/text/generate/stream", json={"prompt": "こんにちは"}
+    ) as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        frames = [frame for frame in response.read().decode().split("\n\n") if frame]
+
+    events = [json.loads(frame.split("data: ", 1)[1]) for frame in frames]
+    assert frames[0].startswith("event: token\n")
+    assert [event["event"] for event in events[:-1]] == ["token"] * (len(events) - 1)
+    done = events[-1]
+    assert done["event"] == "done"
+    assert "".join(event["token"] for event in events[:-1]) == done["generated_text"]
+    assert done["metadata"]["time_to_first_token"] >= 0
+
+
+def test_streams_ndjson_when_requested():
+    client = TestClient(app)
+    response = client.post(
+        "/api/v1/text/generate/stream",
+        json={"prompt": "hello", "max_length": 30},
+        headers={"Accept": "application/x-ndjson"},
+    )
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert events[-1]["event"] == "done"
+    assert events[-1]["metadata"]["length"] <= 30
+
+
+class DisconnectedBackend(TextGenerationBackend):
+    """最初のトークンの後、打ち切られるまで生成を続けてから失敗するバックエンド"""
+
+    name = "disconnected"
+    method = "llm"
+
+    def __init__(self):
+        self.stopped = threading.Event()
+
+    def generate_stream(
+        self, prompt, max_length, temperature, on_text, should_stop=None, stop=()
+    ):
+        on_text("こんにちは")
+        while not should_stop():
+            self.stopped.wait(0.01)
+        self.stopped.set()
+        raise RuntimeError("生成を打ち切りました")
+
+
+def test_client_disconnect_stops_and_reaps_the_generation():
+    backend = DisconnectedBackend()
+    unhandled = []
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        loop.set_exception_handler(lambda loop, context: unhandled.append(context))
+        events = stream_text(GenerateTextRequest(prompt="hello"), backend)
+        first = await events.__anext__()
+        # クライアントの切断と同じく、途中でイテレーションをやめる
+        await events.aclose()
+        return first, backend.stopped.is_set()
+
+    first, stopped = asyncio.run(scenario())
+
+    assert first == {"event": "token", "index": 0, "token": "こんにちは"}
+    # 閉じた時点で生成は終わっており、生成の例外は回収済み
+    assert stopped
+    assert unhandled == []
+
+
+def test_generated_router_declares_streaming_response():
+    spec = load_openapi_spec(PROJECT_ROOT / "source" / "openapi.yaml", use_cache=False)
+    router = render_router_stubs(spec)
+
+    assert "from fastapi.responses import StreamingResponse" in router
+    assert "response_class=StreamingResponse" in router
+    assert '"text/event-stream": {}' in router
@@ -0,0 +1,113 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.utils.ttl_cache import COALESCED, HIT, MISS, STALE, TTLCache
+from main import app
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_evicts_least_recently_used_by_entries_bytes_and_ttl():
+    clock = FakeClock()
+    cache = TTLCache(
+        "test_eviction", max_entries=3, max_bytes=10, ttl=60, sizeof=len, clock=clock
+    )
+    cache.set("a", "xxx")
+    cache.set("b", "xxx")
+    cache.set("c", "xxx")
+    assert cache.get("a") == "xxx"  # aを最近使ったものにする
+
+    cache.set("d", "xx")  # 11バイトになるため最も古いbを追い出す
+    assert cache.get("b") is None
+    assert cache.bytes == 8
+
+    clock.now = 61
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_coalesces_concurrent_computations():
+    cache = TTLCache("test_coalescing", max_entries=10, max_bytes=1000, ttl=60)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def scenario():
+        concurrent = await asyncio.gather(
+            *(cache.get_or_compute("key", compute) for _ in range(5))
+        )
+        return concurrent, await cache.get_or_compute("key", compute)
+
+    concurrent, later = asyncio.run(scenario())
+
+    assert calls == 1
+    sources = [source for _, source in concurrent]
+    assert sources.count(MISS) == 1
+    assert sources.count(COALESCED) == 4
+    assert later == ("result", HIT)
+
+
+def test_serves_stale_value_while_refreshing_once_in_background():
+    clock = FakeClock()
+    cache = TTLCache(
+        "test_stale", max_entries=10, max_bytes=1000, ttl=60, clock=clock, stale_ttl=60
+    )
+    versions = iter(["v1", "v2", "v3"])
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return next(versions)
+
+    async def scenario():
+        first = await cache.get_or_compute("key", compute)
+        clock.now = 90  # TTLは過ぎたが、古い値を返せる期間内
+        stale = await asyncio.gather(
+            *(cache.get_or_compute("key", compute) for _ in range(5))
+        )
+        await asyncio.sleep(0.05)  # 裏での再計算の完了を待つ
+        refreshed = await cache.get_or_compute("key", compute)
+        clock.now = 90 + 121  # 古い値を返せる期間も過ぎた
+        expired = await cache.get_or_compute("key", compute)
+        return first, stale, refreshed, expired
+
+    first, stale, refreshed, expired = asyncio.run(scenario())
+
+    assert first == ("v1", MISS)
+    assert stale == [("v1", STALE)] * 5
+    assert refreshed == ("v2", HIT)
+    assert expired == ("v3", MISS)
+    assert calls == 3
+    assert cache.stats()["refreshes"] == 1
+
+
+def test_deterministic_generate_requests_hit_the_cache():
+    client = TestClient(app)
+    payload = {"prompt": "キャッシュ", "max_length": 60, "temperature": 0}
+
+    first = client.post("/api/v1/text/generate", json=payload).json()
+    second = client.post("/api/v1/text/generate", json=payload).json()
+    sampled = client.post(
+        "/api/v1/text/generate", json={**payload, "temperature": 0.7}
+    ).json()
+
+    assert first["metadata"]["cache"] == MISS
+    assert second["metadata"]["cache"] == HIT
+    assert second["generated_text"] == first["generated_text"]
+    assert "cache" not in sampled["metadata"]
+    stats = client.get("/api/v1/health/detailed").json()["services"]["caches"]
+    assert stats["text_generation"]["hits"] >= 1